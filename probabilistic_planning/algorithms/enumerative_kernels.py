@@ -0,0 +1,73 @@
+"""Numeric kernels shared by the algorithms that solve an EnumerativeMDP.
+
+All kernels work on state and action indexes and on the 1-D value arrays of EnumerativeValueFunction, so every
+algorithm computes qualities, greedy actions and residuals in the same way. On ties, the greedy action is always
+the first one in the actions order of the MDP.
+"""
+
+import numpy as np
+
+def compute_state_qualities(state_index, mdp, gamma, values):
+    return mdp.compute_infinite_horizon_state_qualities(state_index, gamma, values)
+
+def compute_qualities(mdp, gamma, values, state_indexes = None):
+    """Computes Q(s, a) for the given states (all states if ommited) and all actions.
+
+    Returns:
+        qualities (numpy.ndarray): |A|xk array, with one column per state
+    """
+    if state_indexes is None:
+        return mdp.compute_infinite_horizon_qualities(gamma, values)
+
+    return mdp.compute_infinite_horizon_qualities_for_states(state_indexes, gamma, values)
+
+def compute_greedy_action_indexes(qualities, tolerance = 0.0):
+    """Picks the greedy action of each column of a qualities array.
+
+    Parameters:
+        qualities (numpy.ndarray): 1-D array of the qualities of a state or |A|xk array with one column per state
+        tolerance (float): qualities within this distance of the best one are ties
+
+    Returns:
+        action_indexes (numpy.ndarray or int): first action whose quality ties with the best one
+    """
+    if tolerance == 0.0:
+        return qualities.argmax(axis=0) # argmax keeps the first action on ties
+
+    return (qualities >= qualities.max(axis=0) - tolerance).argmax(axis=0)
+
+def compute_bellman_backup(state_index, mdp, gamma, values):
+    return compute_state_qualities(state_index, mdp, gamma, values).max()
+
+def compute_greedy_action_index(state_index, mdp, gamma, values):
+    return compute_greedy_action_indexes(compute_state_qualities(state_index, mdp, gamma, values))
+
+def compute_residual(state_index, mdp, gamma, values):
+    return abs(values[state_index] - compute_bellman_backup(state_index, mdp, gamma, values))
+
+def compute_maximum_residual(first_values, second_values):
+    return np.abs(first_values - second_values).max()
+
+def build_policy(mdp, action_indexes):
+    policy = {}
+
+    for state, action_index in zip(mdp.states, action_indexes):
+        policy[state] = mdp.actions[action_index]
+
+    return policy
+
+def compute_policy(mdp, gamma, values):
+    """Computes the greedy policy of a value function for all states at once.
+
+    Returns:
+        policy (dict): maps each state to its greedy action
+    """
+    return build_policy(mdp, compute_greedy_action_indexes(compute_qualities(mdp, gamma, values)))
+
+def get_transition_matrix_for_policy(mdp, policy_action_indexes):
+    number_of_states = len(mdp.states)
+
+    # row of each (state, policy[state]) in the stacked transition matrix
+    rows = policy_action_indexes * number_of_states + np.arange(number_of_states)
+
+    return mdp.stacked_transition_matrix()[rows]
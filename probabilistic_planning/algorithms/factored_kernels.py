@@ -0,0 +1,75 @@
+"""Symbolic kernels shared by the algorithms that solve a FactoredMDP.
+
+All kernels work on ADDs over the state variables of the MDP, so the states are never enumerated. On ties, the
+greedy action is always the first one in the actions order of the MDP.
+"""
+
+def compute_expected_next_values(mdp, action, value_function):
+    """Computes sum_s' P(s' | s, a) * V(s') as an ADD over the current state variables (regression of V through a).
+
+    The value function is primed and each primed variable in its support is summed out, one at a time in
+    the variable order, as P(x' = true | s) * V(x' = true) + P(x' = false | s) * V(x' = false). Summing the two
+    restrictions avoids building the product with the ADD of P(x' | s), where x' would be tested below every path of
+    the transition ADD. Primed variables that V does not test are never touched, as their probabilities sum to one.
+
+    Parameters:
+        mdp (FactoredMDP): factored Markov Decision Problem
+        action (str): action to regress V through
+        value_function (ADD): V over the current state variables
+
+    Returns:
+        expected_next_values (ADD): expected value of the next state of each state
+    """
+    # each primed variable is right below its current variable, so priming shifts all variables by one
+    expected_next_values = value_function.shift_variables(1)
+
+    for primed_variable in expected_next_values.support():
+        state_variable_index = primed_variable // 2
+        true_transition_add, false_transition_add = mdp.transition_function.get_transition_adds(action, state_variable_index)
+
+        expected_next_values = (
+            true_transition_add * expected_next_values.restrict(primed_variable, True) +
+            false_transition_add * expected_next_values.restrict(primed_variable, False)
+        )
+
+    return expected_next_values
+
+def compute_quality(mdp, gamma, action, value_function):
+    return mdp.reward_function + gamma * compute_expected_next_values(mdp, action, value_function)
+
+def compute_qualities(mdp, gamma, value_function):
+    return [ compute_quality(mdp, gamma, action, value_function) for action in mdp.actions ]
+
+def compute_bellman_backup(mdp, gamma, value_function):
+    """Computes max_a Q(s, a) as an ADD, maximizing over the actions one at a time."""
+    computed_value_function = None
+
+    for quality in compute_qualities(mdp, gamma, value_function):
+        computed_value_function = quality if computed_value_function is None else computed_value_function.maximum(quality)
+
+    return computed_value_function
+
+def compute_maximum_residual(first_value_function, second_value_function):
+    return max(abs(value) for value in (first_value_function - second_value_function).terminal_values())
+
+def compute_policy(mdp, gamma, value_function):
+    """Computes the greedy policy of a value function.
+
+    Returns:
+        policy (ADD): maps each state to the index of its greedy action in mdp.actions
+    """
+    policy = None
+    best_quality = None
+
+    for action_index, quality in enumerate(compute_qualities(mdp, gamma, value_function)):
+        if policy is None:
+            policy = mdp.create_value_function(action_index)
+            best_quality = quality
+            continue
+
+        # only a strictly better quality replaces the current action
+        improvement = quality.greater(best_quality)
+        policy = improvement * action_index + ~improvement * policy
+        best_quality = best_quality.maximum(quality)
+
+    return policy
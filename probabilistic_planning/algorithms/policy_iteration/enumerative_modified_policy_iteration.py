@@ -1,107 +1,92 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
+import numpy as np
 
-def compute_maximum_residual(mdp, first_value_function, second_value_function):
-    state_residual = lambda state: abs(first_value_function[state] - second_value_function[state])
-    residuals = map(state_residual, mdp.states)
-    return max(residuals)
+from ..enumerative_kernels import build_policy, compute_greedy_action_indexes, compute_qualities, get_transition_matrix_for_policy
 
-def compute_quality(state, action, mdp, gamma, value_function):
-    pondered_expected_values = []
+def compute_policy_values(mdp, gamma, policy_transition_matrix, values):
+    return mdp.reward_array() + gamma * policy_transition_matrix.dot(values)
 
-    for next_state in mdp.states:
-        pondered_expected_values.append(
-            mdp.transition(state, action, next_state) * value_function[next_state]
-        )
-
-    return mdp.reward(state) + gamma * sum(pondered_expected_values)
-
-def compute_bellman_backup(state, mdp, gamma, value_function):
-    qualities = []
-
-    for action in mdp.actions:
-        qualities.append(
-            compute_quality(state, action, mdp, gamma, value_function)
-        )
-
-    return max(qualities)
-
-def compute_policy(mdp, gamma, value_function):
-    policy = {}
-
-    for state in mdp.states:
-        max_value = float("-inf ")
-        best_action = None
-
-        for action in mdp.actions:
-            quality = compute_quality(state, action, mdp, gamma, value_function)
-
-            if quality > max_value:
-                max_value = quality
-                best_action = action
-
-        policy[state] = best_action
-
-    return policy
-
-def enumerative_modified_policy_iteration(mdp, gamma, epsilon, m, initial_value_function = None):
+def enumerative_modified_policy_iteration(mdp, gamma, epsilon, m, initial_value_function = None, adaptive = False):
     """Executes the Modified Policy Iteration algorithm.
 
+    Each iteration improves the policy with a Bellman backup of all states, V' = max_a Q(s, a), and then partially
+    evaluates the greedy policy by applying V <- R + gamma * P_pi V up to m times, each pass refining the values of
+    the previous one.
+
     Parameters:
     mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
     gamma (float): discount factor applied to solve this MDP
     epsilon (float): maximum residual allowed between V_k and V_{k+1}
-    m (int): number of times that a policy value function will be updated
+    m (int): number of times that a policy value function will be updated (maximum number, in adaptive mode)
     initial_value_function (EnumerativeValueFunction): initial value function to start the algorithm. If this value
                                                        is ommited, the algorithm will consider a initial value function that
                                                        that returns 0 (zero) for all states.
+    adaptive (bool): if True, the partial evaluation stops before m passes as soon as a pass changes the values by
+                     less than a tenth of the residual of the last improvement (or less than epsilon)
 
     Returns:
     policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
     value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
-    statistics (dict): dictionary containing some statistics about the algorithm execution. We have two statistics here:
-                      "iterations" that is equal to the number of iterations required to improve to the optimal policy and
-                      "maximum_residuals" that is the maximum residual found in each iteration.
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have four statistics here:
+                      "iterations" that is equal to the number of iterations required to improve to the optimal policy,
+                      "maximum_residuals" that is the maximum residual found in each iteration and "evaluation_backups"
+                      and "improvement_backups" that are the number of backups of the partial evaluation and of the
+                      improvement in each iteration.
     """
     value_function = initial_value_function
 
     if value_function is None:
-        value_function = EnumerativeValueFunction(mdp.states, lambda state: 0) # value function with zeroes
+        value_function = mdp.create_value_function() # value function with zeroes
+
+    values = value_function.values.copy()
+    number_of_states = len(mdp.states)
 
     iterations = 0
     maximum_residuals = []
+    evaluation_backups = []
+    improvement_backups = []
 
     while True:
-        computed_value_function = value_function.copy()
-        policy_value_function = value_function.copy()
-
-        # evaluate policy through value function
-        policy = compute_policy(mdp, gamma, value_function)
-
-        for i in range(0, m):
-            for state in mdp.states:
-                action = policy[state]
-                policy_value_function[state] = compute_quality(state, action, mdp, gamma, value_function)
-
-        # improve policy by applying bellman backups
-        for state in mdp.states:
-            computed_value_function[state] = compute_bellman_backup(state, mdp, gamma, policy_value_function)
+        # improve policy by applying bellman backups to all states and actions at once
+        qualities = compute_qualities(mdp, gamma, values)
+        policy_action_indexes = compute_greedy_action_indexes(qualities)
+        computed_values = qualities.max(axis=0)
 
-        iteration_residual = compute_maximum_residual(mdp, value_function, computed_value_function)
-        value_function = computed_value_function
+        iteration_residual = np.abs(computed_values - values).max()
+        values = computed_values
 
         # update statistics
         iterations = iterations + 1
         maximum_residuals.append(iteration_residual)
+        improvement_backups.append(number_of_states)
 
         if iteration_residual < epsilon:
+            evaluation_backups.append(0)
             break # end loop
 
-    # compute policy
-    policy = compute_policy(mdp, gamma, value_function)
+        # evaluate policy partially, each pass over the values of the previous one
+        policy_transition_matrix = get_transition_matrix_for_policy(mdp, policy_action_indexes)
+        evaluation_passes = 0
+
+        for _ in range(m):
+            evaluated_values = compute_policy_values(mdp, gamma, policy_transition_matrix, values)
+            evaluation_residual = np.abs(evaluated_values - values).max()
+            values = evaluated_values
+            evaluation_passes = evaluation_passes + 1
+
+            if adaptive and evaluation_residual < max(0.1 * iteration_residual, epsilon):
+                break
+
+        evaluation_backups.append(evaluation_passes * number_of_states)
+
+    computed_value_function = mdp.create_value_function(values)
+
+    policy = build_policy(mdp, policy_action_indexes)
 
     statistics = {
         "iterations": iterations,
-        "maximum_residuals": maximum_residuals
+        "maximum_residuals": maximum_residuals,
+        "evaluation_backups": evaluation_backups,
+        "improvement_backups": improvement_backups
     }
 
-    return policy, value_function, statistics
+    return policy, computed_value_function, statistics
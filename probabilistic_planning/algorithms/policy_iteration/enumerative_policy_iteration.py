@@ -1,112 +1,134 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
+import inspect
 
 import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
 
-def compute_quality(state, action, mdp, gamma, value_function):
-    pondered_expected_values = []
+from ..enumerative_kernels import build_policy, compute_greedy_action_indexes, compute_qualities, get_transition_matrix_for_policy
 
-    for next_state in mdp.states:
-        pondered_expected_values.append(
-            mdp.transition(state, action, next_state) * value_function[next_state]
-        )
+POLICY_EVALUATION_SOLVERS = ["direct", "gmres", "bicgstab"]
+IMPROVEMENT_TOLERANCE = 1e-12
 
-    return mdp.reward(state) + gamma * sum(pondered_expected_values)
+def evaluate_policy(policy_action_indexes, mdp, gamma, solver = "direct", tolerance = 1e-10, initial_values = None):
+    policy_rewards = mdp.reward_array()
+    policy_transition_matrix = get_transition_matrix_for_policy(mdp, policy_action_indexes)
+    identity_matrix = scipy.sparse.identity(len(mdp.states), format="csr")
 
-def get_transition_matrix_for_policy(mdp, policy):
-    state_count = len(mdp.states)
-    transition_matrix_for_policy = np.matrix(np.zeros((state_count, state_count)))
+    # compute value function as a sparse system of equations (I - gamma * P_pi) V = R
+    system_matrix = identity_matrix - gamma * policy_transition_matrix
 
-    for index, state in enumerate(mdp.states):
-        action = policy[state]
-        transition_matrix = mdp.transition_matrix(action)
-        transition_matrix_for_policy[index] = transition_matrix[index]
+    if solver == "direct":
+        values = scipy.sparse.linalg.spsolve(system_matrix.tocsc(), policy_rewards)
+    elif solver in ("gmres", "bicgstab"):
+        iterative_solver = scipy.sparse.linalg.gmres if solver == "gmres" else scipy.sparse.linalg.bicgstab
+        # scipy renamed the relative tolerance from "tol" to "rtol" in 1.12, so older versions only accept "tol"
+        tolerance_keyword = "rtol" if "rtol" in inspect.signature(iterative_solver).parameters else "tol"
+        solver_options = { "x0": initial_values, tolerance_keyword: tolerance, "atol": 0.0 }
 
-    return transition_matrix_for_policy
+        values, info = iterative_solver(system_matrix, policy_rewards, **solver_options)
 
-def evaluate_policy(policy, mdp, gamma):
-    policy_reward_matrix = mdp.reward_matrix()
-    policy_transition_matrix = get_transition_matrix_for_policy(mdp, policy)
-    identity_matrix = np.identity(len(mdp.states))
+        if info != 0:
+            raise ValueError(f"The {solver} solver did not converge to the tolerance {tolerance} (info = {info})")
+    else:
+        raise ValueError(f"Invalid policy evaluation solver [{solver}]. It should be one of {POLICY_EVALUATION_SOLVERS}")
 
-    # compute value function as a system of equations
-    value_function_matrix_for_policy = (identity_matrix - gamma * policy_transition_matrix).getI() * policy_reward_matrix
+    return mdp.create_value_function(np.asarray(values, dtype=np.float64))
 
-    computed_value_function = EnumerativeValueFunction(mdp.states)
+def find_affected_states(mdp, changed_states):
+    # Q(s, a) only depends on the values of the successors of s, so only the predecessors of changed states
+    # need their qualities computed again
+    number_of_states = len(mdp.states)
+    reaches_changed_state = mdp.stacked_transition_matrix().dot(changed_states.astype(np.float64)) > 0
 
-    for index, state in enumerate(mdp.states):
-        computed_value_function[state] = value_function_matrix_for_policy[index]
+    return np.flatnonzero(reaches_changed_state.reshape(-1, number_of_states).any(axis=0))
 
-    return computed_value_function
+def improve_policy(policy_action_indexes, qualities, state_indexes):
+    """Changes, in place, the action of the given states whose best quality is greater than the quality of their
+       current action (the first best action is taken on ties). Differences within rounding errors of the
+       evaluation are treated as ties, otherwise equivalent actions could be swapped forever.
 
-def improve_policy(policy, mdp, gamma, value_function):
-    improved_policy = dict(policy)
-
-    for state in mdp.states:
-        quality_for_best_action = float("-inf ")
-        best_action = None
-
-        for action in mdp.actions:
-            quality = compute_quality(state, action, mdp, gamma, value_function)
-
-            if quality > quality_for_best_action:
-                quality_for_best_action = quality
-                best_action = action
-
-        current_action = policy[state]
-        quality_for_current_action = compute_quality(state, current_action, mdp, gamma, value_function)
-
-        if quality_for_best_action > quality_for_current_action:
-            improved_policy[state] = best_action
-
-    return improved_policy
-
-def equal_policies(mdp, first_policy, second_policy):
-    for state in mdp.states:
-        first_action = first_policy[state]
-        second_action = second_policy[state]
+    Returns:
+        improved_states (int): number of states whose action changed
+    """
+    best_action_indexes = compute_greedy_action_indexes(qualities[:, state_indexes])
+    best_qualities = qualities[best_action_indexes, state_indexes]
+    current_qualities = qualities[policy_action_indexes[state_indexes], state_indexes]
 
-        if first_action != second_action:
-            return False
+    improved = best_qualities - current_qualities > IMPROVEMENT_TOLERANCE * (1.0 + np.abs(current_qualities))
+    policy_action_indexes[state_indexes[improved]] = best_action_indexes[improved]
 
-    return True
+    return int(improved.sum())
 
-def enumerative_policy_iteration(mdp, gamma, initial_policy = None):
+def enumerative_policy_iteration(mdp, gamma, initial_policy = None, solver = "direct", tolerance = 1e-10,
+                                 change_threshold = 0.0):
     """Executes the Policy Iteration algorithm.
 
     Parameters:
     mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
     gamma (float): discount factor applied to solve this MDP
     initial_policy (dict): arbitrary initial policy to start
+    solver (str): how each policy is evaluated: "direct" for a sparse LU factorisation, or "gmres" and "bicgstab" for
+                  iterative Krylov solvers warm-started from the values of the previous policy
+    tolerance (float): relative residual tolerance of the iterative solvers
+    change_threshold (float): after each evaluation, only the qualities of the predecessors of states whose value
+                              moved by more than this threshold are computed again. With 0 (zero) only the changes
+                              beyond the rounding errors of the evaluation count, and the result is the one of a full
+                              policy improvement.
 
     Returns:
     policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
     value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
-    statistics (dict): dictionary containing some statistics about the algorithm execution. We have one statistic here:
-                      "iterations" that is equal to the number of iterations required to improve to the optimal policy.
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have two statistics here:
+                      "iterations" that is equal to the number of iterations required to improve to the optimal policy and
+                      "changed_states" that is the number of states whose value moved by more than the change threshold
+                      in each iteration.
     """
-    policy = initial_policy
+    if solver not in POLICY_EVALUATION_SOLVERS:
+        raise ValueError(f"Invalid policy evaluation solver [{solver}]. It should be one of {POLICY_EVALUATION_SOLVERS}")
+
+    number_of_states = len(mdp.states)
+
+    # policy as the index of the action of each state, and Q(s, a) as a |A|x|S| table
+    if initial_policy is None:
+        policy_action_indexes = np.zeros(number_of_states, dtype=np.int64)
+    else:
+        policy_action_indexes = np.array([ mdp.action_index(initial_policy[state]) for state in mdp.states ], dtype=np.int64)
 
-    if policy is None:
-        first_action = mdp.actions[0]
-        policy = dict(map(lambda state: (state, first_action), mdp.states))
+    qualities = np.zeros((len(mdp.actions), number_of_states))
 
     iterations = 0
+    changed_states_per_iteration = []
+    value_function = None
 
     while True:
         iterations = iterations + 1
 
-        value_function_for_policy = evaluate_policy(policy, mdp, gamma)
-        improved_policy = improve_policy(policy, mdp, gamma, value_function_for_policy)
+        previous_values = value_function.values if value_function is not None else None
+        value_function = evaluate_policy(policy_action_indexes, mdp, gamma, solver, tolerance, previous_values)
+
+        if previous_values is None:
+            changed_states = np.ones(number_of_states, dtype=bool)
+        else:
+            # changes within the rounding errors of the evaluation are not changes, as in the policy improvement
+            rounding_tolerance = IMPROVEMENT_TOLERANCE * (1.0 + np.abs(previous_values))
+            changed_states = np.abs(value_function.values - previous_values) > np.maximum(change_threshold, rounding_tolerance)
+
+        affected_state_indexes = find_affected_states(mdp, changed_states)
+        qualities[:, affected_state_indexes] = compute_qualities(mdp, gamma, value_function.values, affected_state_indexes)
+
+        # only affected states have new qualities, so the others can not be improved
+        improved_states = improve_policy(policy_action_indexes, qualities, affected_state_indexes)
 
-        if equal_policies(mdp, policy, improved_policy):
-            break
+        changed_states_per_iteration.append(int(changed_states.sum()))
 
-        policy = improved_policy
+        if improved_states == 0:
+            break # value function is already the one of the final policy
 
-    value_function = evaluate_policy(policy, mdp, gamma)
+    policy = build_policy(mdp, policy_action_indexes)
 
     statistics = {
-        "iterations": iterations
+        "iterations": iterations,
+        "changed_states": changed_states_per_iteration
     }
 
     return policy, value_function, statistics
@@ -1,5 +1,6 @@
 from .enumerative_rtdp import enumerative_rtdp
 from .enumerative_lrtdp import enumerative_lrtdp
 from .enumerative_brtdp import enumerative_brtdp
+from .enumerative_heuristics import determinized_heuristic, reward_bound_heuristic
 
-__all__ = ["enumerative_rtdp", "enumerative_lrtdp", "enumerative_brtdp"]
+__all__ = ["enumerative_rtdp", "enumerative_lrtdp", "enumerative_brtdp", "determinized_heuristic", "reward_bound_heuristic"]
@@ -0,0 +1,145 @@
+"""Admissible initial value functions for the RTDP family of algorithms.
+
+Rewards are maximized, so an admissible heuristic is an upper bound of the optimal value function. Every heuristic
+here needs gamma < 1 and is computed once per MDP and discount factor, then cached while the MDP is alive. When the
+problem file of the MDP is given, the values are also stored next to its compiled problem (see compiled_cache), so
+they are reused by every MDP read from the same file until the file changes.
+"""
+
+import heapq
+import weakref
+
+import numpy as np
+
+from probabilistic_planning.problems import compiled_cache
+
+# maps a MDP to a dict of computed heuristic values, indexed by heuristic name and discount factor
+heuristic_cache = weakref.WeakKeyDictionary()
+
+def get_cached_values(mdp, heuristic_name, gamma, compute_values, problem_file = None, cache_directory = None):
+    mdp_cache = heuristic_cache.setdefault(mdp, {})
+    key = (heuristic_name, gamma)
+
+    if key in mdp_cache:
+        return mdp_cache[key]
+
+    if problem_file is None:
+        mdp_cache[key] = compute_values(mdp, gamma)
+        return mdp_cache[key]
+
+    compiled_problem_directory = compiled_cache.get_compiled_problem_directory(problem_file, cache_directory)
+    values_name = f"{heuristic_name}.{gamma!r}"
+    values = compiled_cache.read_compiled_values(compiled_problem_directory, values_name)
+
+    if values is None:
+        values = compute_values(mdp, gamma)
+        compiled_cache.write_compiled_values(mdp, compiled_problem_directory, values_name, values)
+
+    mdp_cache[key] = values
+    return values
+
+def check_discount_factor(gamma):
+    if not 0 <= gamma < 1:
+        raise ValueError(f"The heuristics need a discount factor in [0, 1), but received {gamma}")
+
+def compute_goal_distances(mdp, gamma):
+    """Computes discounted shortest-path distances to the goal states on the all-outcomes determinization, where
+       every outcome of every action is a deterministic edge.
+
+    The cost of a state s is c(s) = max R - R(s) >= 0 and the distance is D(s) = c(s) + gamma * min D(s') over the
+    successors s', with D = 0 in goal states. Paths that never reach a goal only cross non-goal states, so their
+    distance is at least c(s) + gamma * c_min / (1 - gamma), where c_min is the smallest cost of a non-goal state:
+    this is the initial label of every non-goal state, which also bounds states that cannot reach a goal.
+
+    The distances are found with the Dijkstra's algorithm over the predecessors. As the discount can make a label
+    smaller than the one that produced it, a state is reopened when its label improves after it was settled.
+
+    Parameters:
+        mdp (EnumerativeMDP): enumerative Markov Decision Problem
+        gamma (float): discount factor, in [0, 1)
+
+    Returns:
+        distances (numpy.ndarray): lower bound of the discounted cost of each state, relative to max R
+    """
+    rewards = mdp.reward_array()
+    costs = rewards.max() - rewards
+
+    goal_states = np.zeros(len(mdp.states), dtype=bool)
+    goal_states[[ mdp.state_index(state) for state in mdp.goal_states ]] = True
+
+    if np.all(goal_states):
+        return np.zeros(len(mdp.states))
+
+    minimum_cost = costs[~goal_states].min()
+    distances = np.where(goal_states, 0.0, costs + gamma * minimum_cost / (1 - gamma))
+
+    # only goal states can improve the initial labels of their predecessors at first
+    priority_queue = [ (distances[state_index], state_index) for state_index in np.flatnonzero(goal_states).tolist() ]
+    heapq.heapify(priority_queue)
+
+    while priority_queue:
+        distance, state_index = heapq.heappop(priority_queue)
+
+        if distance != distances[state_index]:
+            continue # outdated entry
+
+        predecessor_state_indexes, _ = mdp.predecessors(state_index)
+
+        for predecessor_state_index in predecessor_state_indexes.tolist():
+            if goal_states[predecessor_state_index]:
+                continue
+
+            computed_distance = costs[predecessor_state_index] + gamma * distance
+
+            if computed_distance < distances[predecessor_state_index]:
+                distances[predecessor_state_index] = computed_distance
+                heapq.heappush(priority_queue, (computed_distance, predecessor_state_index))
+
+    return distances
+
+def compute_determinized_values(mdp, gamma):
+    return mdp.reward_array().max() / (1 - gamma) - compute_goal_distances(mdp, gamma)
+
+def compute_reward_bound_values(mdp, gamma):
+    # the next states are relaxed to the best reward forever
+    return mdp.reward_array() + gamma * mdp.reward_array().max() / (1 - gamma)
+
+def determinized_heuristic(mdp, gamma, problem_file = None, cache_directory = None):
+    """Computes an admissible value function from the shortest paths to the goal states on the all-outcomes
+       determinization (see compute_goal_distances). The value of a state is max R / (1 - gamma) - D(s), an upper
+       bound of its optimal value because the best outcome of an action is never worse than its expectation.
+
+    Parameters:
+        mdp (EnumerativeMDP): enumerative Markov Decision Problem
+        gamma (float): discount factor, in [0, 1)
+        problem_file (str): (optional) path of the problem file of the MDP, whose compiled problem directory keeps the
+                            computed values
+        cache_directory (str): (optional) directory of the compiled problems, as in read_problem_file
+
+    Returns:
+        value_function (EnumerativeValueFunction): a new value function, that can be updated by the algorithms
+    """
+    check_discount_factor(gamma)
+    values = get_cached_values(mdp, "determinized", gamma, compute_determinized_values, problem_file, cache_directory)
+
+    return mdp.create_value_function(values.copy())
+
+def reward_bound_heuristic(mdp, gamma, problem_file = None, cache_directory = None):
+    """Computes an admissible value function relaxing the choice of actions and outcomes: after the reward of the
+       state, the best reward of the MDP is received forever. It does not look at the transitions, so it is cheaper
+       and looser than the determinized heuristic.
+
+    Parameters:
+        mdp (EnumerativeMDP): enumerative Markov Decision Problem
+        gamma (float): discount factor, in [0, 1)
+        problem_file (str): (optional) path of the problem file of the MDP, whose compiled problem directory keeps the
+                            computed values
+        cache_directory (str): (optional) directory of the compiled problems, as in read_problem_file
+
+    Returns:
+        value_function (EnumerativeValueFunction): a new value function, that can be updated by the algorithms
+    """
+    check_discount_factor(gamma)
+    values = get_cached_values(mdp, "reward_bound", gamma, compute_reward_bound_values, problem_file, cache_directory)
+
+    return mdp.create_value_function(values.copy())
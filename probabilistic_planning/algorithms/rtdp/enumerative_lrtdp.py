@@ -1,101 +1,78 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
-
 import numpy as np
 
-def compute_maximum_residual(mdp, first_value_function, second_value_function):
-    state_residual = lambda state: abs(first_value_function[state] - second_value_function[state])
-    residuals = map(state_residual, mdp.states)
-    return max(residuals)
-
-def compute_bellman_backup(state, mdp, gamma, value_function):
-    qualities = []
-
-    for action in mdp.actions:
-        qualities.append(
-            mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
-        )
-
-    return max(qualities)
-
-def compute_greedy_action(state, mdp, gamma, value_function):
-    policy = {}
-
-    best_action = None
-    max_value_for_best_action = float("-inf ")
-
-    for action in mdp.actions:
-        quality = mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
-
-        if quality > max_value_for_best_action:
-            max_value_for_best_action = quality
-            best_action = action
-
-    return best_action
-
-def compute_policy(mdp, gamma, value_function):
-    policy = {}
-
-    for state in mdp.states:
-        policy[state] = compute_greedy_action(state, mdp, gamma, value_function)
+from ..enumerative_kernels import (compute_bellman_backup, compute_greedy_action_index, compute_greedy_action_indexes, compute_policy,
+                                   compute_residual, compute_state_qualities)
 
-    return policy
+def initial_states_residuals(initial_state_indexes, mdp, gamma, values):
+    return [ compute_residual(initial_state_index, mdp, gamma, values) for initial_state_index in initial_state_indexes ]
 
-def all_states_solved(states, solved_states):
-    for state in states:
-        if state not in solved_states:
-            return False
+class LabelingArrays:
+    """Labels and work arrays of the LRTDP, indexed by state and allocated once.
 
-    return True
+    Attributes:
+        solved (numpy.ndarray): True for the states already labeled as solved
+        marks (numpy.ndarray): stamp of the last check_solved call that opened each state, so the open or closed
+                               membership is reset by incrementing the stamp instead of clearing the array
+        stamp (int): stamp of the current check_solved call
+        open_stack (numpy.ndarray): explicit stack of the depth first search
+        closed_states (numpy.ndarray): states closed by the current search, in closing order
+    """
 
-def residual(state, mdp, gamma, value_function):
-    action = compute_greedy_action(state, mdp, gamma, value_function)
-    quality = mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
+    def __init__(self, number_of_states):
+        self.solved = np.zeros(number_of_states, dtype=bool)
+        self.marks = np.zeros(number_of_states, dtype=np.int64)
+        self.stamp = 0
+        self.open_stack = np.zeros(number_of_states, dtype=np.int64)
+        self.closed_states = np.zeros(number_of_states, dtype=np.int64)
 
-    return abs(value_function[state] - quality)
+def check_solved(root_state_index, epsilon, labels, mdp, gamma, values):
+    solved = True
+    bellman_backups_done = 0
 
-def initial_states_residuals(mdp, gamma, value_function):
-    residuals = []
+    labels.stamp = labels.stamp + 1
+    marks = labels.marks
+    open_stack = labels.open_stack
+    closed_states = labels.closed_states
 
-    for initial_state in mdp.initial_states:
-        residuals.append(residual(initial_state, mdp, gamma, value_function))
+    open_size = 0
+    closed_size = 0
 
-    return residuals
+    if not labels.solved[root_state_index]:
+        open_stack[0] = root_state_index
+        open_size = 1
+        marks[root_state_index] = labels.stamp
 
-def check_solved(root_state, epsilon, solved_states, mdp, gamma, value_function):
-    solved = True
-    open_states = []
-    closed_states = []
-    bellman_backups_done = 0
+    while open_size != 0:
+        open_size = open_size - 1
+        state_index = open_stack[open_size]
 
-    if root_state not in solved_states:
-        open_states.append(root_state)
+        closed_states[closed_size] = state_index
+        closed_size = closed_size + 1
 
-    while len(open_states) != 0:
-        state = open_states.pop()
-        closed_states.append(state)
+        qualities = compute_state_qualities(state_index, mdp, gamma, values)
+        best_action_index = compute_greedy_action_indexes(qualities)
 
-        if residual(state, mdp, gamma, value_function) > epsilon:
+        if abs(values[state_index] - qualities[best_action_index]) > epsilon:
             solved = False
             continue
 
-        action = compute_greedy_action(state, mdp, gamma, value_function)
-
-        for next_state in mdp.reachable_states(state, action):
-            is_solved = next_state in solved_states
-            is_open = next_state in open_states
-            is_closed = next_state in closed_states
+        next_state_indexes, _, _ = mdp.successors(state_index, best_action_index)
 
-            if not (is_solved or is_closed or is_open):
-                open_states.append(next_state)
+        for next_state_index in next_state_indexes:
+            # a state is open or closed in this search when it has the current stamp
+            if not (labels.solved[next_state_index] or marks[next_state_index] == labels.stamp):
+                open_stack[open_size] = next_state_index
+                open_size = open_size + 1
+                marks[next_state_index] = labels.stamp
 
     if solved:
-        for closed_state in closed_states:
-            solved_states.append(closed_state)
+        labels.solved[closed_states[:closed_size]] = True
     else:
-        while len(closed_states) != 0:
-            closed_state = closed_states.pop()
+        while closed_size != 0:
+            closed_size = closed_size - 1
+            closed_state_index = closed_states[closed_size]
 
-            value_function[closed_state] = compute_bellman_backup(closed_state, mdp, gamma, value_function)
+            values[closed_state_index] = compute_bellman_backup(closed_state_index, mdp, gamma, values)
             bellman_backups_done = bellman_backups_done + 1
 
     return solved, bellman_backups_done
@@ -103,6 +80,9 @@ def check_solved(root_state, epsilon, solved_states, mdp, gamma, value_function)
 def enumerative_lrtdp(mdp, gamma, max_depth, epsilon, initial_value_function = None, seed = None):
     """Executes the Labeled Real Time Dynamic Programming algorithm.
 
+    States are handled by their indexes: the solved labels and the open and closed sets of check_solved are boolean
+    and stamp arrays, so each membership test is O(1), and the search uses an explicit array stack.
+
     Parameters:
     mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
     gamma (float): discount factor applied to solve this MDP (assumes infinite on indefinite horizon)
@@ -124,51 +104,56 @@ def enumerative_lrtdp(mdp, gamma, max_depth, epsilon, initial_value_function = N
     value_function = initial_value_function
 
     if value_function is None:
-        value_function = EnumerativeValueFunction(mdp.states, lambda state: 0) # value function with zeroes
+        value_function = mdp.create_value_function() # value function with zeroes
 
     if seed is not None:
         np.random.seed(seed)
 
-    solved_states = []
+    values = value_function.values
+    initial_state_indexes = np.array([ mdp.state_index(state) for state in mdp.initial_states ], dtype=np.int64)
+
+    goal_states = np.zeros(len(mdp.states), dtype=bool)
+    goal_states[[ mdp.state_index(state) for state in mdp.goal_states ]] = True
+
+    labels = LabelingArrays(len(mdp.states))
+
     bellman_backups_done = 0
     trials = 0
     maximum_residuals = []
 
-    while not all_states_solved(mdp.initial_states, solved_states):
+    while not labels.solved[initial_state_indexes].all():
         trials = trials + 1
         visited_states = []
-        initial_state = np.random.choice(mdp.initial_states)
-
-        state = initial_state
+        state_index = initial_state_indexes[np.random.choice(len(initial_state_indexes))]
 
-        while state not in solved_states:
-            visited_states.append(state)
+        while not labels.solved[state_index]:
+            visited_states.append(state_index)
 
-            if state in mdp.goal_states:
+            if goal_states[state_index]:
                 break
 
-            value_function[state] = compute_bellman_backup(state, mdp, gamma, value_function)
+            values[state_index] = compute_bellman_backup(state_index, mdp, gamma, values)
             bellman_backups_done = bellman_backups_done + 1
 
-            next_action = compute_greedy_action(state, mdp, gamma, value_function)
-            state = mdp.sample_state(state, next_action)
+            next_action_index = compute_greedy_action_index(state_index, mdp, gamma, values)
+            state_index = mdp.sample_state_index(state_index, next_action_index)
 
             if len(visited_states) > max_depth:
                 break
 
         while len(visited_states) != 0:
-            state = visited_states.pop()
+            state_index = visited_states.pop()
 
-            solved, bellman_backups = check_solved(state, epsilon, solved_states, mdp, gamma, value_function)
+            solved, bellman_backups = check_solved(state_index, epsilon, labels, mdp, gamma, values)
             bellman_backups_done = bellman_backups_done + bellman_backups
 
             if not solved:
                 break
 
-        maximum_residuals.append(max(initial_states_residuals(mdp, gamma, value_function)))
+        maximum_residuals.append(max(initial_states_residuals(initial_state_indexes, mdp, gamma, values)))
 
     # compute policy
-    policy = compute_policy(mdp, gamma, value_function)
+    policy = compute_policy(mdp, gamma, values)
 
     statistics = {
         "iterations": trials,
@@ -1,69 +1,104 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
+import time
 
 import numpy as np
 
-def compute_maximum_residual(mdp, first_value_function, second_value_function):
-    state_residual = lambda state: abs(first_value_function[state] - second_value_function[state])
-    residuals = map(state_residual, mdp.states)
-    return max(residuals)
+from ..enumerative_kernels import compute_bellman_backup, compute_greedy_action_indexes, compute_policy, compute_qualities, compute_residual, compute_state_qualities
 
-def compute_bellman_backup(state, mdp, gamma, value_function):
-    qualities = []
+class ResidualCache:
+    """Bellman residuals of the states, kept while the values they depend on do not change.
 
-    for action in mdp.actions:
-        qualities.append(
-            mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
-        )
+    Every change of values gets a new stamp. The residual of a state is recorded with the stamp of its computation
+    and it is only recomputed when the state or one of its successors (under any action) changed after that.
 
-    return max(qualities)
+    Attributes:
+        residuals (numpy.ndarray): last computed residual of each state
+        computed_stamps (numpy.ndarray): stamp of the computation of each residual (-1 if never computed)
+        changed_stamps (numpy.ndarray): stamp of the last change of the value of each state
+        stamp (int): current stamp
+    """
+
+    def __init__(self, mdp):
+        number_of_states = len(mdp.states)
+
+        self.residuals = np.zeros(number_of_states)
+        self.computed_stamps = np.full(number_of_states, -1, dtype=np.int64)
+        self.changed_stamps = np.zeros(number_of_states, dtype=np.int64)
+        self.stamp = 0
+
+        self._mdp = mdp
+        self._dependencies = {}
+
+    def record_backup(self, state_index, value_changed, residual):
+        self.stamp = self.stamp + 1
 
-def compute_greedy_action(state, mdp, gamma, value_function):
-    policy = {}
+        if value_changed:
+            self.changed_stamps[state_index] = self.stamp
 
-    best_action = None
-    max_value_for_best_action = float("-inf ")
+        self.residuals[state_index] = residual
+        self.computed_stamps[state_index] = self.stamp
 
-    for action in mdp.actions:
-        quality = mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
+    def record_changes(self, state_indexes):
+        self.stamp = self.stamp + 1
+        self.changed_stamps[state_indexes] = self.stamp
 
-        if quality > max_value_for_best_action:
-            max_value_for_best_action = quality
-            best_action = action
+    def dependencies(self, state_index):
+        # the state itself and its successors under all actions, the values used by its residual
+        if state_index not in self._dependencies:
+            number_of_states = len(self._mdp.states)
+            rows = np.arange(len(self._mdp.actions)) * number_of_states + state_index
+            successor_state_indexes = self._mdp.stacked_transition_matrix()[rows].indices
 
-    return best_action
+            self._dependencies[state_index] = np.unique(np.append(successor_state_indexes, state_index))
 
-def compute_policy(mdp, gamma, value_function):
-    policy = {}
+        return self._dependencies[state_index]
 
-    for state in mdp.states:
-        policy[state] = compute_greedy_action(state, mdp, gamma, value_function)
+    def residual(self, state_index, gamma, values):
+        last_change = self.changed_stamps[self.dependencies(state_index)].max()
 
-    return policy
+        if last_change > self.computed_stamps[state_index]:
+            self.residuals[state_index] = compute_residual(state_index, self._mdp, gamma, values)
+            self.computed_stamps[state_index] = self.stamp
 
-def residual(state, mdp, gamma, value_function):
-    action = compute_greedy_action(state, mdp, gamma, value_function)
-    quality = mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
+        return self.residuals[state_index]
 
-    return abs(value_function[state] - quality)
+    def maximum_residual(self, state_indexes, gamma, values):
+        return max(self.residual(state_index, gamma, values) for state_index in state_indexes)
 
-def initial_states_residuals(mdp, gamma, value_function):
-    residuals = []
+def batched_trials(mdp, gamma, max_depth, batch_size, initial_state_indexes, goal_states, values, residual_cache):
+    """Runs batch_size trials in lock-step. At each depth, the states of all trajectories that are still running are
+       backed up with one sparse product and their next states are sampled at once. The states whose values change
+       are recorded in the residual cache.
 
-    for initial_state in mdp.initial_states:
-        residuals.append(residual(initial_state, mdp, gamma, value_function))
+    Returns:
+        bellman_backups_done (int): number of Bellman backups executed
+    """
+    state_indexes = initial_state_indexes[np.random.choice(len(initial_state_indexes), size=batch_size)]
+    bellman_backups_done = 0
+    depth = 0
 
-    return residuals
+    while True:
+        state_indexes = state_indexes[~goal_states[state_indexes]]
 
-def all_initial_states_converged(mdp, gamma, value_function, epsilon):
-    residuals = initial_states_residuals(mdp, gamma, value_function)
+        if len(state_indexes) == 0 or depth > max_depth:
+            break
 
-    for residual in residuals:
-        if residual > epsilon:
-            return False
+        # do bellman update for the states of all running trajectories
+        qualities = compute_qualities(mdp, gamma, values, state_indexes)
 
-    return True
+        greedy_action_indexes = compute_greedy_action_indexes(qualities)
+        computed_values = qualities[greedy_action_indexes, np.arange(len(state_indexes))]
 
-def enumerative_rtdp(mdp, gamma, max_trials, max_depth, epsilon = None, initial_value_function = None, seed = None):
+        residual_cache.record_changes(state_indexes[computed_values != values[state_indexes]])
+        values[state_indexes] = computed_values
+        bellman_backups_done = bellman_backups_done + len(state_indexes)
+
+        state_indexes = mdp.sample_state_indexes(state_indexes, greedy_action_indexes)
+        depth = depth + 1
+
+    return bellman_backups_done
+
+def enumerative_rtdp(mdp, gamma, max_trials, max_depth, epsilon = None, initial_value_function = None, seed = None,
+                     batch_size = None):
     """Executes the Real Time Dynamic Programming algorithm.
 
     Parameters:
@@ -76,61 +111,94 @@ def enumerative_rtdp(mdp, gamma, max_trials, max_depth, epsilon = None, initial_
                                                        is ommited, the algorithm will consider a initial value function that
                                                        that returns 0 (zero) for all states.
     seed (int): optional seed used to initialize random number generator
+    batch_size (int): optional number of trials run in lock-step, with the backups of each depth step batched into
+                      one vectorized call. The greedy action of a state is the one of its backup. If ommited, trials
+                      run one at a time.
 
     Returns:
     policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
     value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
-    statistics (dict): dictionary containing some statistics about the algorithm execution. We have three statistics here:
-                      "iterations" that is equal to the horizon parameter, "bellman_backups_done" that is the overall
-                      number of Bellman backups executed and "maximum_residuals" that is the maximum residual found in
-                      each iteration.
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have four statistics here:
+                      "iterations" that is the number of trials, "bellman_backups_done" that is the overall number of
+                      Bellman backups executed, "maximum_residuals" that is the maximum residual of the initial states
+                      found after each trial (after each batch, in batched mode) and "trials_per_second" that is the
+                      throughput of the trials.
     """
     value_function = initial_value_function
 
     if value_function is None:
-        value_function = EnumerativeValueFunction(mdp.states, lambda state: 0) # value function with zeroes
+        value_function = mdp.create_value_function() # value function with zeroes
 
     if seed is not None:
         np.random.seed(seed)
 
+    values = value_function.values
+
+    initial_state_indexes = np.array([ mdp.state_index(state) for state in mdp.initial_states ], dtype=np.int64)
+
+    goal_states = np.zeros(len(mdp.states), dtype=bool)
+    goal_states[[ mdp.state_index(state) for state in mdp.goal_states ]] = True
+
+    # residuals recorded by the backups and recomputed only when a successor value changes
+    residual_cache = ResidualCache(mdp)
+
     bellman_backups_done = 0
     trials = 0
     maximum_residuals = []
+    start_time = time.perf_counter()
 
     while True:
-        trials = trials + 1
-        visited_states = []
-        initial_state = np.random.choice(mdp.initial_states)
+        if batch_size is not None:
+            # the last batch only runs the trials left to reach max_trials (when there is no epsilon)
+            current_batch_size = batch_size if epsilon is not None else min(batch_size, max_trials - trials)
 
-        state = initial_state
+            bellman_backups_done = bellman_backups_done + batched_trials(
+                mdp, gamma, max_depth, current_batch_size, initial_state_indexes, goal_states, values, residual_cache
+            )
+            trials = trials + current_batch_size
+        else:
+            trials = trials + 1
+            visited_states = 0
+            state_index = initial_state_indexes[np.random.choice(len(initial_state_indexes))]
 
-        while state not in mdp.goal_states:
-            visited_states.append(state)
+            while not goal_states[state_index]:
+                visited_states = visited_states + 1
 
-            value_function[state] = compute_bellman_backup(state, mdp, gamma, value_function)
-            bellman_backups_done = bellman_backups_done + 1
+                # do bellman update
+                computed_value = compute_bellman_backup(state_index, mdp, gamma, values)
+                value_changed = computed_value != values[state_index]
+                values[state_index] = computed_value
+                bellman_backups_done = bellman_backups_done + 1
 
-            next_action = compute_greedy_action(state, mdp, gamma, value_function)
-            state = mdp.sample_state(state, next_action)
+                # the greedy action on the updated values also gives the residual after the backup
+                qualities = compute_state_qualities(state_index, mdp, gamma, values)
+                next_action_index = compute_greedy_action_indexes(qualities)
+                residual_cache.record_backup(state_index, value_changed, abs(computed_value - qualities[next_action_index]))
 
-            if len(visited_states) > max_depth:
-                break
+                state_index = mdp.sample_state_index(state_index, next_action_index)
 
-        maximum_residuals.append(max(initial_states_residuals(mdp, gamma, value_function)))
+                if visited_states > max_depth:
+                    break
+
+        maximum_residual = residual_cache.maximum_residual(initial_state_indexes, gamma, values)
+        maximum_residuals.append(maximum_residual)
 
         if trials >= max_trials and epsilon is None:
             break
 
-        if epsilon is not None and all_initial_states_converged(mdp, gamma, value_function, epsilon):
+        if epsilon is not None and maximum_residual <= epsilon:
             break
 
+    elapsed_time = time.perf_counter() - start_time
+
     # compute policy
-    policy = compute_policy(mdp, gamma, value_function)
+    policy = compute_policy(mdp, gamma, values)
 
     statistics = {
         "iterations": trials,
         "bellman_backups_done": bellman_backups_done,
-        "maximum_residuals": maximum_residuals
+        "maximum_residuals": maximum_residuals,
+        "trials_per_second": trials / elapsed_time if elapsed_time > 0 else float("inf")
     }
 
     return policy, value_function, statistics
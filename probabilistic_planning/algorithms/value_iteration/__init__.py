@@ -1,5 +1,9 @@
 from .enumerative_infinite_horizon_value_iteration import enumerative_infinite_horizon_value_iteration
 from .enumerative_finite_horizon_value_iteration import enumerative_finite_horizon_value_iteration
+from .enumerative_prioritized_value_iteration import enumerative_prioritized_value_iteration
+from .enumerative_topological_value_iteration import enumerative_topological_value_iteration
+from .enumerative_interval_value_iteration import enumerative_interval_value_iteration
+from .factored_value_iteration import factored_value_iteration
 
 def enumerative_value_iteration(mdp, **parameters):
     parameter_names = set(parameters.keys())
@@ -13,12 +17,17 @@ def enumerative_value_iteration(mdp, **parameters):
         gamma = parameters["gamma"]
         epsilon = parameters["epsilon"]
         initial_value_function = parameters.get("initial_value_function", None)
-        return enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_value_function)
+        vectorized = parameters.get("vectorized", False)
+        in_place = parameters.get("in_place", False)
+        state_order = parameters.get("state_order", None)
+        return enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_value_function, vectorized,
+                                                            in_place, state_order)
 
     raise ValueError(
         ("Invalid parameter configuration."
          " Should receive a gamma and a horizon to run in finite horizon mode or"
-         " a gamma, an epsion and a optional initial value function to run on infinite horizon mode.")
+         " a gamma, an epsion, a optional initial value function, optional vectorized or in place flags and a optional state order to run on infinite horizon mode.")
     )
 
-__all__ = ["enumerative_value_iteration"]
+__all__ = ["enumerative_value_iteration", "enumerative_prioritized_value_iteration", "enumerative_topological_value_iteration",
+           "enumerative_interval_value_iteration", "factored_value_iteration"]
@@ -1,42 +1,34 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
+import numpy as np
 
-def compute_quality(state, action, mdp, gamma, value_function):
-    pondered_expected_values = []
+from ..enumerative_kernels import compute_qualities
 
-    for next_state in mdp.states:
-        pondered_expected_values.append(
-            mdp.transition(state, action, next_state) * value_function[next_state]
-        )
+def backward_induction(mdp, gamma, horizon):
+    """Computes the optimal values and the non-stationary optimal policy of a finite horizon MDP.
 
-    return mdp.reward(state) + gamma * sum(pondered_expected_values)
-
-def compute_bellman_backup(state, mdp, gamma, value_function):
-    qualities = []
-
-    for action in mdp.actions:
-        qualities.append(
-            compute_quality(state, action, mdp, gamma, value_function)
-        )
-
-    return max(qualities)
-
-def compute_policy(mdp, gamma, value_function):
-    policy = {}
+    Parameters:
+    mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
+    gamma (float): discount factor applied to solve this MDP
+    horizon (int): number of steps that can be done in this MDP
 
-    for state in mdp.states:
-        max_value = float("-inf ")
-        best_action = None
+    Returns:
+    stage_values (numpy.ndarray): (H+1)x|S| array where row t holds V_t, the values with H - t steps to go
+                                  (the last row, V_H, is zero)
+    stage_policies (numpy.ndarray): Hx|S| array where row t holds the index (in mdp.actions) of the best action
+                                    of each state at stage t
+    """
+    number_of_states = len(mdp.states)
 
-        for action in mdp.actions:
-            quality = compute_quality(state, action, mdp, gamma, value_function)
+    stage_values = np.zeros((horizon + 1, number_of_states))
+    stage_policies = np.zeros((horizon, number_of_states), dtype=np.int64)
 
-            if quality > max_value:
-                max_value = quality
-                best_action = action
+    for stage in range(horizon - 1, -1, -1): # range from H - 1 to 0
+        # do bellman update for all states and actions at once, over the values of the next stage
+        qualities = compute_qualities(mdp, gamma, stage_values[stage + 1])
 
-        policy[state] = best_action
+        stage_policies[stage] = qualities.argmax(axis=0) # argmax keeps the first action on ties
+        stage_values[stage] = qualities[stage_policies[stage], np.arange(number_of_states)]
 
-    return policy
+    return stage_values, stage_policies
 
 def enumerative_finite_horizon_value_iteration(mdp, gamma, horizon):
     """Executes the Value Iteration algorithm for finite horizon MDPs.
@@ -47,32 +39,30 @@ def enumerative_finite_horizon_value_iteration(mdp, gamma, horizon):
     horizon (int): number of steps that can be done in this MDP
 
     Returns:
-    policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
+    policy (dict): resulting policy computed for a mdp at stage 0, represented as a dict that maps a state to an action
     value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
-    statistics (dict): dictionary containing some statistics about the algorithm execution. We have two statistics here:
-                      "iterations" that is equal to the horizon parameter and "bellman_backups_done" that is the overall
-                      number of Bellman backups executed.
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have four statistics here:
+                      "iterations" that is equal to the horizon parameter, "bellman_backups_done" that is the overall
+                      number of Bellman backups executed, "stage_policies" that is a Hx|S| array with the index
+                      (in mdp.actions) of the best action of each state at each stage and "stage_values" that is a
+                      (H+1)x|S| array with the value of each state at each stage.
     """
-    last_horizon_value_function = EnumerativeValueFunction(mdp.states, lambda state: 0) # value function with zeroes
+    stage_values, stage_policies = backward_induction(mdp, gamma, horizon)
 
-    bellman_backups_done = 0
+    value_function = mdp.create_value_function(stage_values[0].copy())
 
-    for n in range(horizon - 1, -1, -1): # range from H - 1 to 0
-        current_horizon_value_function = EnumerativeValueFunction(mdp.states, lambda state: 0)
-
-        # do bellman update
-        for state in mdp.states:
-            current_horizon_value_function[state] = compute_bellman_backup(state, mdp, gamma, last_horizon_value_function)
-            bellman_backups_done = bellman_backups_done + 1
-
-        last_horizon_value_function = current_horizon_value_function
+    # policy of the first stage
+    policy = {}
 
-    # compute policy
-    policy = compute_policy(mdp, gamma, last_horizon_value_function)
+    if horizon > 0:
+        for state, action_index in zip(mdp.states, stage_policies[0]):
+            policy[state] = mdp.actions[action_index]
 
     statistics = {
         "iterations": horizon,
-        "bellman_backups_done": bellman_backups_done
+        "bellman_backups_done": horizon * len(mdp.states),
+        "stage_policies": stage_policies,
+        "stage_values": stage_values
     }
 
-    return policy, last_horizon_value_function, statistics
+    return policy, value_function, statistics
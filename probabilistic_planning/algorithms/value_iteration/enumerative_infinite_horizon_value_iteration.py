@@ -1,39 +1,136 @@
-from probabilistic_planning.structures import EnumerativeValueFunction
+import numpy as np
 
-def compute_maximum_residual(mdp, first_value_function, second_value_function):
-    state_residual = lambda state: abs(first_value_function[state] - second_value_function[state])
-    residuals = map(state_residual, mdp.states)
-    return max(residuals)
+from ..enumerative_kernels import compute_bellman_backup, compute_maximum_residual, compute_policy, compute_qualities
 
-def compute_bellman_backup(state, mdp, gamma, value_function):
-    qualities = []
+def vectorized_value_iteration(mdp, gamma, epsilon, value_function):
+    values = value_function.values.copy()
 
-    for action in mdp.actions:
-        qualities.append(
-            mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
-        )
+    iterations = 0
+    maximum_residuals = []
+    bellman_backups_done = 0
+
+    while True:
+        # do bellman update for all states and actions at once
+        qualities = compute_qualities(mdp, gamma, values)
+        computed_values = qualities.max(axis=0)
+        bellman_backups_done = bellman_backups_done + len(mdp.states)
+
+        iteration_residual = np.abs(computed_values - values).max()
+        values = computed_values
+
+        # update statistics
+        iterations = iterations + 1
+        maximum_residuals.append(iteration_residual)
+
+        if iteration_residual < epsilon:
+            break # end loop
+
+    computed_value_function = mdp.create_value_function(values)
+
+    # compute policy
+    policy = compute_policy(mdp, gamma, values)
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "bellman_backups_done": bellman_backups_done
+    }
+
+    return policy, computed_value_function, statistics
+
+def compute_reverse_topological_order(mdp):
+    """Orders the states backwards from the goal states: goal states first, then their predecessors and so on,
+       in breadth-first order over the predecessors of all actions. States that cannot reach a goal state come last.
+       In acyclic MDPs the successors of a state are usually backed up before it."""
+
+    visited = np.zeros(len(mdp.states), dtype=bool)
+    order = []
+
+    for goal_state in mdp.goal_states:
+        goal_state_index = mdp.state_index(goal_state)
+
+        if not visited[goal_state_index]:
+            visited[goal_state_index] = True
+            order.append(goal_state_index)
+
+    position = 0
+    while position < len(order):
+        predecessor_state_indexes, _ = mdp.predecessors(order[position])
+
+        for predecessor_state_index in predecessor_state_indexes:
+            if not visited[predecessor_state_index]:
+                visited[predecessor_state_index] = True
+                order.append(predecessor_state_index)
+
+        position = position + 1
+
+    order.extend(np.flatnonzero(~visited))
+
+    return np.array(order, dtype=np.int64)
 
-    return max(qualities)
+def compute_state_order(mdp, state_order):
+    if state_order is None:
+        return np.arange(len(mdp.states))
 
-def compute_policy(mdp, gamma, value_function):
-    policy = {}
+    if isinstance(state_order, str):
+        if state_order == "reverse_topological":
+            return compute_reverse_topological_order(mdp)
 
-    for state in mdp.states:
-        max_value = float("-inf")
-        best_action = None
+        raise ValueError(f"Unknown state order [{state_order}]")
 
-        for action in mdp.actions:
-            quality = mdp.compute_infinite_horizon_quality(state, action, gamma, value_function)
+    order = np.array([ mdp.state_index(state) for state in state_order ], dtype=np.int64)
 
-            if quality > max_value:
-                max_value = quality
-                best_action = action
+    if len(order) != len(mdp.states) or len(np.unique(order)) != len(mdp.states):
+        raise ValueError("The state order should have each state of the MDP exactly once")
 
-        policy[state] = best_action
+    return order
 
-    return policy
+def in_place_value_iteration(mdp, gamma, epsilon, value_function, state_order):
+    # a single buffer updated as the sweep goes, so each backup already sees the values computed before it
+    values = value_function.values.copy()
+    order = compute_state_order(mdp, state_order)
 
-def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_value_function = None):
+    iterations = 0
+    maximum_residuals = []
+    bellman_backups_done = 0
+
+    while True:
+        iteration_residual = 0.0
+
+        # do bellman update, in place
+        for state_index in order:
+            computed_value = compute_bellman_backup(state_index, mdp, gamma, values)
+
+            residual = abs(computed_value - values[state_index])
+            if residual > iteration_residual:
+                iteration_residual = residual
+
+            values[state_index] = computed_value
+
+        bellman_backups_done = bellman_backups_done + len(order)
+
+        # update statistics
+        iterations = iterations + 1
+        maximum_residuals.append(iteration_residual)
+
+        if iteration_residual < epsilon:
+            break # end loop
+
+    computed_value_function = mdp.create_value_function(values)
+
+    # compute policy
+    policy = compute_policy(mdp, gamma, values)
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "bellman_backups_done": bellman_backups_done
+    }
+
+    return policy, computed_value_function, statistics
+
+def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_value_function = None, vectorized = False,
+                                                 in_place = False, state_order = None):
     """Executes the Value Iteration algorithm for infinite or indefinite horizon MDPs.
 
     Parameters:
@@ -43,6 +140,13 @@ def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_va
     initial_value_function (EnumerativeValueFunction): initial value function to start the algorithm. If this value
                                                        is ommited, the algorithm will consider a initial value function that
                                                        that returns 0 (zero) for all states.
+    vectorized (bool): if True, each sweep computes the qualities of all states and actions at once with sparse
+                       matrix-vector products, instead of backing up one state at a time
+    in_place (bool): if True, runs Gauss-Seidel sweeps that update a single value function as states are backed up,
+                     so later backups of the same sweep use the new values and no copy is made per iteration
+    state_order (str or list): (optional) order of the states in each in-place sweep. It can be a list with every
+                               state of the MDP or "reverse_topological", that starts from the goal states and
+                               follows their predecessors. If ommited, the order of mdp.states is used.
 
     Returns:
     policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
@@ -55,22 +159,33 @@ def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_va
     value_function = initial_value_function
 
     if value_function is None:
-        value_function = EnumerativeValueFunction(mdp.states, lambda state: 0) # value function with zeroes
+        value_function = mdp.create_value_function() # value function with zeroes
+
+    if vectorized and in_place:
+        raise ValueError("The vectorized and in place modes can not be used together")
+
+    if vectorized:
+        return vectorized_value_iteration(mdp, gamma, epsilon, value_function)
+
+    if in_place:
+        return in_place_value_iteration(mdp, gamma, epsilon, value_function, state_order)
 
     iterations = 0
     maximum_residuals = []
     bellman_backups_done = 0
 
+    values = value_function.values.copy()
+
     while True:
-        computed_value_function = value_function.copy()
+        computed_values = values.copy()
 
         # do bellman update
-        for state in mdp.states:
-            computed_value_function[state] = compute_bellman_backup(state, mdp, gamma, value_function)
+        for state_index in range(len(mdp.states)):
+            computed_values[state_index] = compute_bellman_backup(state_index, mdp, gamma, values)
             bellman_backups_done = bellman_backups_done + 1
 
-        iteration_residual = compute_maximum_residual(mdp, value_function, computed_value_function)
-        value_function = computed_value_function
+        iteration_residual = compute_maximum_residual(values, computed_values)
+        values = computed_values
 
         # update statistics
         iterations = iterations + 1
@@ -79,8 +194,10 @@ def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_va
         if iteration_residual < epsilon:
             break # end loop
 
+    computed_value_function = mdp.create_value_function(values)
+
     # compute policy
-    policy = compute_policy(mdp, gamma, value_function)
+    policy = compute_policy(mdp, gamma, values)
 
     statistics = {
         "iterations": iterations,
@@ -88,4 +205,4 @@ def enumerative_infinite_horizon_value_iteration(mdp, gamma, epsilon, initial_va
         "bellman_backups_done": bellman_backups_done
     }
 
-    return policy, value_function, statistics
+    return policy, computed_value_function, statistics
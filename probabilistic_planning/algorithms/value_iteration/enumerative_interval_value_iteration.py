@@ -0,0 +1,126 @@
+import numpy as np
+
+from ..enumerative_kernels import build_policy, compute_greedy_action_indexes
+
+def compute_extreme_probabilities(bmdp, values, pessimistic = True):
+    """Chooses, for every (state, action) pair at once, the distribution within the probability bounds that
+       minimizes (pessimistic) or maximizes (optimistic) the expected next value.
+
+    Each transition starts at its lower bound and the remaining mass, 1 - sum of the lower bounds, is given to the
+    successors in order of value (worst first when pessimistic), each one up to its upper bound. This greedy choice
+    is optimal for the inner problem and only needs to sort the successors of each pair, O(k log k), instead of
+    solving a linear program. The successors of all pairs are sorted together, grouped by their row.
+
+    Parameters:
+        bmdp (EnumerativeBMDP): enumerative Bounded-parameter Markov Decision Process
+        values (numpy.ndarray): 1-D array with V(s) for each state, following the states order
+        pessimistic (bool): if True, the distributions are the worst ones for the values, otherwise the best ones
+
+    Returns:
+        probabilities (numpy.ndarray): chosen probability of each transition, aligned with the transition bounds
+    """
+    indptr, indices, lower_probabilities, upper_probabilities = bmdp.stacked_transition_bounds()
+    rows = bmdp.transition_rows()
+    number_of_rows = len(indptr) - 1
+
+    next_values = values[indices]
+    order = np.lexsort((next_values if pessimistic else -next_values, rows))
+
+    # slack of each transition in the order it receives the remaining mass, and the slack given before it in its row
+    gaps = upper_probabilities[order] - lower_probabilities[order]
+    cumulative_gaps = np.cumsum(gaps)
+    row_start_gaps = np.concatenate(([0.0], cumulative_gaps))[indptr[:-1]]
+    previous_gaps = cumulative_gaps - gaps - row_start_gaps[rows]
+
+    remaining_mass = 1.0 - np.bincount(rows, weights=lower_probabilities, minlength=number_of_rows)
+    extra_probabilities = np.clip(remaining_mass[rows] - previous_gaps, 0.0, gaps)
+
+    probabilities = np.empty(len(indices))
+    probabilities[order] = lower_probabilities[order] + extra_probabilities
+
+    return probabilities
+
+def compute_interval_qualities(bmdp, gamma, values, pessimistic = True):
+    """Computes Q(s, a) = R(s) + gamma * sum_s' P(s' | s, a) * V(s') for every state and action at once, where P is
+       the extreme distribution within the bounds (see compute_extreme_probabilities).
+
+    Returns:
+        qualities (numpy.ndarray): |A|x|S| array where row i holds the qualities of the i-th action
+    """
+    _, indices, _, _ = bmdp.stacked_transition_bounds()
+    number_of_states = len(bmdp.states)
+    number_of_actions = len(bmdp.actions)
+
+    probabilities = compute_extreme_probabilities(bmdp, values, pessimistic)
+
+    pondered_sums = np.bincount(
+        bmdp.transition_rows(), weights=probabilities * values[indices], minlength=number_of_actions * number_of_states
+    )
+    pondered_sums = pondered_sums.reshape(number_of_actions, number_of_states)
+
+    return bmdp.reward_array() + gamma * pondered_sums
+
+def enumerative_interval_value_iteration(bmdp, gamma, epsilon, initial_value_function = None, pessimistic = True):
+    """Executes the Interval Value Iteration algorithm for Bounded-parameter MDPs.
+
+    Each Bellman backup takes the best action for the worst distribution within the probability bounds (or the
+    best distribution, in optimistic mode), so the result is the lower (or upper) bound of the values of all MDPs
+    described by the bounds.
+
+    Parameters:
+    bmdp (EnumerativeBMDP): enumerative Bounded-parameter Markov Decison Problem to be solved
+    gamma (float): discount factor applied to solve this BMDP (assumes infinite on indefinite horizon)
+    epsilon (float): maximum residual allowed between V_k and V_{k+1}
+    initial_value_function (EnumerativeValueFunction): initial value function to start the algorithm. If this value
+                                                       is ommited, the algorithm will consider a initial value function that
+                                                       that returns 0 (zero) for all states.
+    pessimistic (bool): if True, the backups use the worst distributions within the bounds, otherwise the best ones
+
+    Returns:
+    policy (dict): resulting policy computed for a bmdp, represented as a dict that maps a state to an action
+    value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have three statistics here:
+                      "iterations" that is the number of sweeps, "bellman_backups_done" that is the overall number of
+                      Bellman backups executed and "maximum_residuals" that is the maximum residual found in each
+                      iteration.
+    """
+    value_function = initial_value_function
+
+    if value_function is None:
+        value_function = bmdp.create_value_function() # value function with zeroes
+
+    values = value_function.values.copy()
+
+    iterations = 0
+    maximum_residuals = []
+    bellman_backups_done = 0
+
+    while True:
+        # do bellman update for all states and actions at once
+        qualities = compute_interval_qualities(bmdp, gamma, values, pessimistic)
+        computed_values = qualities.max(axis=0)
+        bellman_backups_done = bellman_backups_done + len(bmdp.states)
+
+        iteration_residual = np.abs(computed_values - values).max()
+        values = computed_values
+
+        # update statistics
+        iterations = iterations + 1
+        maximum_residuals.append(iteration_residual)
+
+        if iteration_residual < epsilon:
+            break # end loop
+
+    computed_value_function = bmdp.create_value_function(values)
+
+    # compute policy
+    qualities = compute_interval_qualities(bmdp, gamma, values, pessimistic)
+    policy = build_policy(bmdp, compute_greedy_action_indexes(qualities))
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "bellman_backups_done": bellman_backups_done
+    }
+
+    return policy, computed_value_function, statistics
@@ -0,0 +1,102 @@
+import heapq
+
+import numpy as np
+
+from ..enumerative_kernels import compute_bellman_backup, compute_policy, compute_qualities
+
+def enumerative_prioritized_value_iteration(mdp, gamma, epsilon, initial_value_function = None):
+    """Executes the Prioritized Sweeping Value Iteration algorithm for infinite or indefinite horizon MDPs.
+
+    Instead of sweeping all states, it backs up the state with the largest priority, an upper bound of its
+    Bellman residual. After a backup that changes V(s) by delta, the priority of each predecessor s' of s grows by
+    gamma * max_a P(s | s', a) * delta, so only the predecessors of states that changed are backed up again.
+    The algorithm stops when every priority is below epsilon, the same criterion of the Value Iteration.
+
+    Parameters:
+    mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
+    gamma (float): discount factor applied to solve this MDP (assumes infinite on indefinite horizon)
+    epsilon (float): maximum residual allowed for every state
+    initial_value_function (EnumerativeValueFunction): initial value function to start the algorithm. If this value
+                                                       is ommited, the algorithm will consider a initial value function that
+                                                       that returns 0 (zero) for all states.
+
+    Returns:
+    policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
+    value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have three statistics here:
+                      "iterations" that is the number of states taken from the priority queue and backed up,
+                      "bellman_backups_done" that is the overall number of Bellman backups executed (including the
+                      ones that compute the initial residuals) and "maximum_residuals" that is the largest priority
+                      taken from the queue in every |S| backups.
+    """
+    value_function = initial_value_function
+
+    if value_function is None:
+        value_function = mdp.create_value_function() # value function with zeroes
+
+    values = value_function.values.copy()
+    number_of_states = len(mdp.states)
+
+    # initial priorities are the exact residuals, computed with one backup of all states
+    qualities = compute_qualities(mdp, gamma, values)
+    priorities = np.abs(qualities.max(axis=0) - values)
+    bellman_backups_done = number_of_states
+
+    # max-heap by negating the priorities. Outdated entries are kept and skipped when popped
+    priority_queue = [ (-priority, state_index) for state_index, priority in enumerate(priorities) if priority >= epsilon ]
+    heapq.heapify(priority_queue)
+
+    iterations = 0
+    maximum_residuals = []
+    maximum_residual = 0.0
+
+    while priority_queue:
+        negated_priority, state_index = heapq.heappop(priority_queue)
+        priority = -negated_priority
+
+        if priority != priorities[state_index]:
+            continue # outdated entry
+
+        if priority < epsilon:
+            break # every residual is below epsilon
+
+        # do bellman update
+        computed_value = compute_bellman_backup(state_index, mdp, gamma, values)
+        bellman_backups_done = bellman_backups_done + 1
+
+        delta = abs(computed_value - values[state_index])
+        values[state_index] = computed_value
+        priorities[state_index] = 0.0
+
+        if delta > 0.0:
+            predecessor_state_indexes, maximum_probabilities = mdp.predecessors(state_index)
+
+            for predecessor_state_index, maximum_probability in zip(predecessor_state_indexes, maximum_probabilities):
+                priorities[predecessor_state_index] += gamma * maximum_probability * delta
+
+                if priorities[predecessor_state_index] >= epsilon:
+                    heapq.heappush(priority_queue, (-priorities[predecessor_state_index], predecessor_state_index))
+
+        # update statistics
+        iterations = iterations + 1
+        maximum_residual = max(maximum_residual, priority)
+
+        if iterations % number_of_states == 0:
+            maximum_residuals.append(maximum_residual)
+            maximum_residual = 0.0
+
+    if maximum_residual > 0.0:
+        maximum_residuals.append(maximum_residual)
+
+    computed_value_function = mdp.create_value_function(values)
+
+    # compute policy
+    policy = compute_policy(mdp, gamma, values)
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "bellman_backups_done": bellman_backups_done
+    }
+
+    return policy, computed_value_function, statistics
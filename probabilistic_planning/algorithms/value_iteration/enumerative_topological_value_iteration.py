@@ -0,0 +1,195 @@
+import numpy as np
+import scipy.sparse
+
+from ..enumerative_kernels import compute_bellman_backup, compute_policy
+
+def build_state_graph(mdp):
+    """Builds the union of the action graphs: a |S|x|S| CSR pattern with an edge s -> s' if P(s' | s, a) > 0 for some action."""
+
+    number_of_states = len(mdp.states)
+    state_graph = scipy.sparse.csr_matrix((number_of_states, number_of_states))
+
+    for action in mdp.actions:
+        state_graph = state_graph + mdp.transition_matrix(action)
+
+    state_graph = state_graph.tocsr()
+    state_graph.sort_indices()
+
+    return state_graph
+
+def find_strongly_connected_components(state_graph):
+    """Finds the strongly connected components of a graph with the Tarjan's algorithm, without recursion.
+
+    Parameters:
+        state_graph (scipy.sparse.csr_matrix): adjacency pattern of the graph
+
+    Returns:
+        components (list): list of arrays with the state indexes of each component. A component is always
+                           listed after every component reachable from it (reverse topological order)
+    """
+    number_of_states = state_graph.shape[0]
+    indptr = state_graph.indptr.tolist()
+    indices = state_graph.indices.tolist()
+
+    discovery_indexes = [-1] * number_of_states
+    lowlinks = [0] * number_of_states
+    on_stack = [False] * number_of_states
+    component_stack = []
+    components = []
+    next_discovery_index = 0
+
+    for root_state_index in range(number_of_states):
+        if discovery_indexes[root_state_index] != -1:
+            continue
+
+        # each frame holds a state and the position of the next edge to visit
+        call_stack = [(root_state_index, indptr[root_state_index])]
+        discovery_indexes[root_state_index] = lowlinks[root_state_index] = next_discovery_index
+        next_discovery_index = next_discovery_index + 1
+        component_stack.append(root_state_index)
+        on_stack[root_state_index] = True
+
+        while call_stack:
+            state_index, edge_position = call_stack[-1]
+
+            if edge_position < indptr[state_index + 1]:
+                call_stack[-1] = (state_index, edge_position + 1)
+                next_state_index = indices[edge_position]
+
+                if discovery_indexes[next_state_index] == -1:
+                    discovery_indexes[next_state_index] = lowlinks[next_state_index] = next_discovery_index
+                    next_discovery_index = next_discovery_index + 1
+                    component_stack.append(next_state_index)
+                    on_stack[next_state_index] = True
+                    call_stack.append((next_state_index, indptr[next_state_index]))
+                elif on_stack[next_state_index]:
+                    lowlinks[state_index] = min(lowlinks[state_index], discovery_indexes[next_state_index])
+
+                continue
+
+            # every edge visited, return to the caller
+            call_stack.pop()
+
+            if call_stack:
+                caller_state_index = call_stack[-1][0]
+                lowlinks[caller_state_index] = min(lowlinks[caller_state_index], lowlinks[state_index])
+
+            if lowlinks[state_index] == discovery_indexes[state_index]:
+                component = []
+
+                while True:
+                    component_state_index = component_stack.pop()
+                    on_stack[component_state_index] = False
+                    component.append(component_state_index)
+
+                    if component_state_index == state_index:
+                        break
+
+                components.append(np.array(component, dtype=np.int64))
+
+    return components
+
+def solve_single_state_component(mdp, gamma, epsilon, state_index, has_self_loop, values):
+    sweeps = 0
+    residual = 0.0
+
+    while True:
+        computed_value = compute_bellman_backup(state_index, mdp, gamma, values)
+
+        residual = abs(computed_value - values[state_index])
+        values[state_index] = computed_value
+        sweeps = sweeps + 1
+
+        # without a self loop, the successors are already solved and one backup is enough
+        if not has_self_loop or residual < epsilon:
+            return sweeps, residual
+
+def solve_component(mdp, gamma, epsilon, component, values):
+    number_of_states = len(mdp.states)
+    number_of_actions = len(mdp.actions)
+
+    # rows of every (state, action) of this component, grouped by action
+    rows = (np.arange(number_of_actions)[:, np.newaxis] * number_of_states + component).ravel()
+    component_transition_matrix = mdp.stacked_transition_matrix()[rows]
+    component_rewards = mdp.reward_array()[component]
+
+    sweeps = 0
+    maximum_residuals = []
+
+    while True:
+        pondered_sums = component_transition_matrix.dot(values).reshape(number_of_actions, len(component))
+        computed_values = (component_rewards + gamma * pondered_sums).max(axis=0)
+
+        residual = np.abs(computed_values - values[component]).max()
+        values[component] = computed_values
+
+        sweeps = sweeps + 1
+        maximum_residuals.append(residual)
+
+        if residual < epsilon:
+            return sweeps, maximum_residuals
+
+def enumerative_topological_value_iteration(mdp, gamma, epsilon, initial_value_function = None):
+    """Executes the Topological Value Iteration algorithm for infinite or indefinite horizon MDPs.
+
+    The strongly connected components of the graph formed by all actions are found with the Tarjan's algorithm and
+    solved one at a time, each one to epsilon, in reverse topological order. When a component is solved, all the
+    components reachable from it are already solved, so their values are not backed up again.
+
+    Parameters:
+    mdp (EnumerativeMDP): enumerative Markov Decison Problem to be solved
+    gamma (float): discount factor applied to solve this MDP (assumes infinite on indefinite horizon)
+    epsilon (float): maximum residual allowed between V_k and V_{k+1} inside each component
+    initial_value_function (EnumerativeValueFunction): initial value function to start the algorithm. If this value
+                                                       is ommited, the algorithm will consider a initial value function that
+                                                       that returns 0 (zero) for all states.
+
+    Returns:
+    policy (dict): resulting policy computed for a mdp, represented as a dict that maps a state to an action
+    value_function (dict): value function found by this algorithm, represented as a dict that maps a state to a float
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have four statistics here:
+                      "iterations" that is the overall number of sweeps over the components, "bellman_backups_done"
+                      that is the overall number of Bellman backups executed, "maximum_residuals" that is the maximum
+                      residual found in each sweep of the components with more than one state and
+                      "strongly_connected_components" that is the number of components.
+    """
+    value_function = initial_value_function
+
+    if value_function is None:
+        value_function = mdp.create_value_function() # value function with zeroes
+
+    values = value_function.values.copy()
+
+    state_graph = build_state_graph(mdp)
+    components = find_strongly_connected_components(state_graph)
+    self_loops = state_graph.diagonal() > 0
+
+    iterations = 0
+    maximum_residuals = []
+    bellman_backups_done = 0
+
+    for component in components:
+        if len(component) == 1:
+            state_index = component[0]
+            sweeps, _ = solve_single_state_component(mdp, gamma, epsilon, state_index, self_loops[state_index], values)
+        else:
+            sweeps, component_maximum_residuals = solve_component(mdp, gamma, epsilon, component, values)
+            maximum_residuals.extend(component_maximum_residuals)
+
+        # update statistics
+        iterations = iterations + sweeps
+        bellman_backups_done = bellman_backups_done + sweeps * len(component)
+
+    computed_value_function = mdp.create_value_function(values)
+
+    # compute policy
+    policy = compute_policy(mdp, gamma, values)
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "bellman_backups_done": bellman_backups_done,
+        "strongly_connected_components": len(components)
+    }
+
+    return policy, computed_value_function, statistics
@@ -0,0 +1,116 @@
+from ..factored_kernels import compute_bellman_backup, compute_maximum_residual, compute_policy
+
+# number of sweeps without improving the residual by epsilon after which the approximate mode stops
+STALLED_ITERATIONS = 10
+
+def factored_value_iteration(mdp, gamma, epsilon, initial_value_function = None, approximation_tolerance = 0.0,
+                             maximum_value_function_size = None):
+    """Executes the SPUDD algorithm, a Value Iteration with symbolic Bellman backups for factored MDPs.
+
+    The value function is an ADD and each backup regresses it through the transition ADDs of each action (see
+    compute_expected_next_values), adds the reward and maximizes over the actions, so the states are never enumerated
+    and each sweep costs in the size of the ADDs instead of the number of states.
+
+    With an approximation_tolerance or a maximum_value_function_size, it executes APRICODD instead: after each backup
+    the leaves of the value function within the tolerance are merged (see ADD.approximate), raising the tolerance
+    until the value function has at most maximum_value_function_size nodes. It stops when the residual is below
+    epsilon, as the exact mode. As the approximation errors d may keep the residual above epsilon (in the worst case,
+    up to a floor of (1 + gamma) * d / (1 - gamma) for the largest error so far), it also stops when the residual is
+    below epsilon plus this floor and the last STALLED_ITERATIONS sweeps did not lower the best residual by epsilon.
+    It reports the bound on the distance between the returned value function and the optimal one:
+    d + gamma * residual / (1 - gamma).
+
+    Parameters:
+    mdp (FactoredMDP): factored Markov Decison Problem to be solved
+    gamma (float): discount factor applied to solve this MDP (assumes infinite on indefinite horizon)
+    epsilon (float): maximum residual allowed between V_k and V_{k+1}
+    initial_value_function (ADD): initial value function to start the algorithm. If this value is ommited, the
+                                  algorithm will consider a initial value function that returns 0 (zero) for all states.
+    approximation_tolerance (float): maximum difference between the values merged into one leaf of the value function
+    maximum_value_function_size (int): (optional) maximum number of nodes of the value function
+
+    Returns:
+    policy (ADD): resulting policy computed for a mdp, represented as an ADD that maps a state to the index of its
+                  action in mdp.actions
+    value_function (ADD): value function found by this algorithm, represented as an ADD that maps a state to a float
+    statistics (dict): dictionary containing some statistics about the algorithm execution. We have seven statistics
+                      here: "iterations" that is the number of sweeps, "maximum_residuals" that is the maximum residual
+                      found in each iteration, "value_function_sizes" that is the number of nodes of the value function
+                      after each iteration, "manager_nodes" that is the number of nodes kept by the ADD manager at the
+                      end of each iteration (before its garbage collection), "memory_usages" that is the estimated
+                      bytes used by the ADD manager at the same point (see ADDManager.memory_usage),
+                      "approximation_errors" that is the error of the approximation in each iteration and "error_bound"
+                      that is the maximum distance between the returned value function and the optimal one.
+    """
+    approximate = approximation_tolerance > 0 or maximum_value_function_size is not None
+
+    if approximate and gamma >= 1:
+        raise ValueError(f"The approximate value iteration needs a discount factor below 1, but received {gamma}")
+
+    value_function = initial_value_function
+
+    if value_function is None:
+        value_function = mdp.create_value_function() # value function with zeroes
+
+    iterations = 0
+    maximum_residuals = []
+    value_function_sizes = []
+    manager_nodes = []
+    memory_usages = []
+    approximation_errors = []
+
+    while True:
+        # do a symbolic bellman update for all states and actions at once
+        computed_value_function = compute_bellman_backup(mdp, gamma, value_function)
+
+        iteration_residual = compute_maximum_residual(computed_value_function, value_function)
+        approximation_error = 0.0
+
+        if approximate:
+            computed_value_function, approximation_error = computed_value_function.approximate(
+                approximation_tolerance, maximum_value_function_size)
+
+        value_function = computed_value_function
+
+        # update statistics
+        iterations = iterations + 1
+        maximum_residuals.append(iteration_residual)
+        value_function_sizes.append(value_function.size())
+        manager_nodes.append(mdp.manager.number_of_nodes())
+        memory_usages.append(mdp.manager.memory_usage())
+        approximation_errors.append(approximation_error)
+
+        # the ADDs of the previous iterations are not reached anymore
+        mdp.manager.collect_garbage_if_needed()
+
+        if iteration_residual < epsilon:
+            break # end loop
+
+        if approximate and iterations > STALLED_ITERATIONS:
+            # the residual that the approximation errors allow to reach in the worst case
+            residual_floor = (1 + gamma) * max(approximation_errors) / (1 - gamma)
+            previous_best_residual = min(maximum_residuals[:-STALLED_ITERATIONS])
+            best_residual = min(maximum_residuals[-STALLED_ITERATIONS:])
+
+            if iteration_residual < epsilon + residual_floor and best_residual > previous_best_residual - epsilon:
+                break # the approximation errors stalled the residual
+
+    # compute policy
+    policy = compute_policy(mdp, gamma, value_function)
+
+    if gamma < 1:
+        error_bound = approximation_errors[-1] + gamma * maximum_residuals[-1] / (1 - gamma)
+    else:
+        error_bound = float("inf") # no bound without discount
+
+    statistics = {
+        "iterations": iterations,
+        "maximum_residuals": maximum_residuals,
+        "value_function_sizes": value_function_sizes,
+        "manager_nodes": manager_nodes,
+        "memory_usages": memory_usages,
+        "approximation_errors": approximation_errors,
+        "error_bound": error_bound
+    }
+
+    return policy, value_function, statistics
@@ -0,0 +1,164 @@
+"""Compiled cache for enumerative problem files.
+
+A parsed problem is stored as a set of .npy files (state names, action names, rewards, the CSR arrays of the stacked
+transition matrix and initial and goal state indexes) inside a directory named "<file name>.<path key>.<cache key>",
+where the path key is a hash of the absolute problem file path and the cache key also hashes its modification time and
+size. Loading a compiled problem memory-maps these arrays instead of parsing the text file again.
+
+Values derived from a problem, such as the heuristics of the RTDP algorithms, can be stored in the same directory as
+"values.<values name>.npy" files, so they are reused while the problem file is the same and removed with its stale
+compiled versions.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import scipy.sparse
+
+from probabilistic_planning.structures import EnumerativeMDP
+
+COMPILED_CACHE_VERSION = 1
+
+def build_path_key(problem_file):
+    return hashlib.sha1(os.path.abspath(problem_file).encode("utf-8")).hexdigest()
+
+def build_cache_key(problem_file):
+    file_status = os.stat(problem_file)
+    key = f"{os.path.abspath(problem_file)}|{file_status.st_mtime_ns}|{file_status.st_size}|{COMPILED_CACHE_VERSION}"
+
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def get_compiled_problem_directory(problem_file, cache_directory=None):
+    """Returns the directory where the compiled version of a problem file is stored.
+
+    Parameters:
+        problem_file (str): path of the problem file
+        cache_directory (str): (optional) directory that holds the compiled problems. If ommited, a ".cache"
+                               directory next to the problem file is used.
+
+    Returns:
+        compiled_problem_directory (str): directory of the compiled problem (that may not exist yet)
+    """
+    if cache_directory is None:
+        cache_directory = os.path.join(os.path.dirname(os.path.abspath(problem_file)), ".cache")
+
+    file_name = os.path.basename(problem_file)
+    return os.path.join(cache_directory, f"{file_name}.{build_path_key(problem_file)}.{build_cache_key(problem_file)}")
+
+def remove_stale_compiled_problems(compiled_problem_directory):
+    """Removes the older compiled versions of the same problem file, that share the file name and the path key of the
+       compiled problem directory (the problems of other files with the same name have other path keys)."""
+    cache_directory, compiled_problem_name = os.path.split(compiled_problem_directory)
+    problem_file_prefix = compiled_problem_name.rsplit(".", 1)[0]
+
+    for entry in os.listdir(cache_directory):
+        entry_path = os.path.join(cache_directory, entry)
+
+        if entry.rsplit(".", 1)[0] == problem_file_prefix and entry_path != compiled_problem_directory:
+            shutil.rmtree(entry_path, ignore_errors=True)
+
+def write_compiled_problem(mdp, compiled_problem_directory):
+    """Writes an enumerative MDP as a compiled problem.
+
+    Parameters:
+        mdp (EnumerativeMDP): MDP to be compiled
+        compiled_problem_directory (str): directory where the compiled problem will be written
+    """
+    stacked_transition_matrix = mdp.stacked_transition_matrix()
+
+    arrays = {
+        "states": np.array(mdp.states),
+        "actions": np.array(mdp.actions),
+        "rewards": mdp.reward_array(),
+        "transition_indptr": stacked_transition_matrix.indptr,
+        "transition_indices": stacked_transition_matrix.indices,
+        "transition_probabilities": stacked_transition_matrix.data,
+        "initial_states": np.array([ mdp.state_index(state) for state in mdp.initial_states ], dtype=np.int64),
+        "goal_states": np.array([ mdp.state_index(state) for state in mdp.goal_states ], dtype=np.int64)
+    }
+
+    cache_directory = os.path.dirname(compiled_problem_directory)
+    os.makedirs(cache_directory, exist_ok=True)
+
+    # write in a temporary directory and move it at once, so a partially written problem is never read
+    temporary_directory = tempfile.mkdtemp(dir=cache_directory)
+
+    for array_name, array in arrays.items():
+        np.save(os.path.join(temporary_directory, f"{array_name}.npy"), array)
+
+    try:
+        os.replace(temporary_directory, compiled_problem_directory)
+    except OSError:
+        # another process already compiled this problem
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    remove_stale_compiled_problems(compiled_problem_directory)
+
+def read_compiled_problem(compiled_problem_directory):
+    """Reads a compiled problem, memory-mapping its arrays.
+
+    Parameters:
+        compiled_problem_directory (str): directory of the compiled problem
+
+    Returns:
+        mdp (EnumerativeMDP): the compiled MDP
+    """
+    load_array = lambda array_name: np.load(os.path.join(compiled_problem_directory, f"{array_name}.npy"), mmap_mode="r")
+
+    states = load_array("states").tolist()
+    actions = load_array("actions").tolist()
+
+    stacked_transition_matrix = scipy.sparse.csr_matrix(
+        (load_array("transition_probabilities"), load_array("transition_indices"), load_array("transition_indptr")),
+        shape=(len(actions) * len(states), len(states)),
+        copy=False
+    )
+    stacked_transition_matrix.has_sorted_indices = True
+
+    return EnumerativeMDP.from_indexed_arrays(
+        states, actions, load_array("rewards"), stacked_transition_matrix,
+        load_array("initial_states"), load_array("goal_states")
+    )
+
+def get_compiled_values_file(compiled_problem_directory, values_name):
+    return os.path.join(compiled_problem_directory, f"values.{values_name}.npy")
+
+def read_compiled_values(compiled_problem_directory, values_name):
+    """Reads values stored next to a compiled problem.
+
+    Parameters:
+        compiled_problem_directory (str): directory of the compiled problem
+        values_name (str): name of the stored values
+
+    Returns:
+        values (numpy.ndarray): the stored values, or None if they were not stored yet
+    """
+    values_file = get_compiled_values_file(compiled_problem_directory, values_name)
+
+    if not os.path.isfile(values_file):
+        return None
+
+    return np.load(values_file)
+
+def write_compiled_values(mdp, compiled_problem_directory, values_name, values):
+    """Stores values next to a compiled problem, compiling the MDP first if it was not compiled yet.
+
+    Parameters:
+        mdp (EnumerativeMDP): MDP of the problem file, compiled when its directory does not exist
+        compiled_problem_directory (str): directory of the compiled problem
+        values_name (str): name of the stored values
+        values (numpy.ndarray): values to be stored
+    """
+    if not os.path.isdir(compiled_problem_directory):
+        write_compiled_problem(mdp, compiled_problem_directory)
+
+    # write in a temporary file and move it at once, so partially written values are never read
+    file_descriptor, temporary_file = tempfile.mkstemp(dir=compiled_problem_directory, suffix=".npy")
+
+    with os.fdopen(file_descriptor, "wb") as file:
+        np.save(file, values)
+
+    os.replace(temporary_file, get_compiled_values_file(compiled_problem_directory, values_name))
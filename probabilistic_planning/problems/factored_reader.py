@@ -0,0 +1,324 @@
+"""Reader for factored problems in the SPUDD format (the .net, .spudd and .dat files in files/factored).
+
+A problem file has the sections:
+    variables (c1 c2 ...)                 boolean state variables, in the order of the ADD variables (also
+                                          written as "state_variables c1 c2 ... endstate_variables")
+    action <name> ... endaction           one "<state variable> <tree>" line per state variable, where the tree
+                                          gives the probability of the state variable being true in the next state
+    reward <tree>                         reward of each state
+    initial (c1 c2) ... endinitial        (optional) initial states, each one its list of true state variables
+    goal (c1 c2 c3) ... endgoal           (optional) goal states, in the same format
+
+A tree is "(<state variable> <true tree> <false tree>)" or a leaf "(<number>)" or "([<expression>])", where the
+expression is a sum of products of numbers and parameters, such as "[0.666667*p1]". The parameters p1..pn of the
+imprecise (MDP-IP) problems are replaced by the given values, and the constraints over them, the discount, the
+tolerance and the approximation sections (basisFunctions and factoredReward) are ignored.
+
+The file is read in chunks and split into tokens, and each tree is parsed without recursion straight into the nodes of
+an ADDManager, so no intermediate representation of the trees is built and equal subtrees share their nodes.
+"""
+
+import re
+
+from probabilistic_planning.structures import FactoredMDP
+from probabilistic_planning.structures.decision_diagram import ADD, ADDManager
+from probabilistic_planning.structures.factored.factored_transition_function import current_variable
+
+# number of characters read from the problem file at a time
+CHUNK_SIZE = 1 << 16
+
+# a parenthesis, a leaf expression between brackets (possibly cut at the end of a chunk) or a word
+TOKEN_PATTERN = re.compile(r"[()]|\[[^\]]*\]?|[^\s()\[\]]+")
+
+EXPRESSION_TOKEN_PATTERN = re.compile(r"\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|[A-Za-z_]\w*|[-+*]|\S")
+
+# sections whose content is skipped until their end token
+SKIPPED_SECTIONS = {
+    "basisFunctions": "endbasis",
+    "factoredReward": "endfactoredReward"
+}
+
+def read_tokens(file, chunk_size = CHUNK_SIZE):
+    """Splits a file into tokens, reading a chunk at a time. A token that reaches the end of a chunk is only
+       yielded with the next chunk, as it may continue there."""
+    buffer = ""
+
+    while True:
+        chunk = file.read(chunk_size)
+        buffer = buffer + chunk
+        position = 0
+
+        for match in TOKEN_PATTERN.finditer(buffer):
+            if chunk and match.end() == len(buffer):
+                break
+
+            yield match.group()
+            position = match.end()
+
+        buffer = buffer[position:]
+
+        if not chunk:
+            return
+
+def next_token(tokens, expected_token_description):
+    token = next(tokens, None)
+
+    if token is None:
+        raise ValueError(f"Unexpected end of file, expecting {expected_token_description}")
+
+    return token
+
+def expect_token(tokens, expected_token):
+    token = next_token(tokens, f"[{expected_token}]")
+
+    if token != expected_token:
+        raise ValueError(f"Expecting [{expected_token}] but found [{token}]")
+
+def evaluate_leaf_expression(expression, parameters):
+    """Evaluates a sum of products of numbers and parameters, such as "0.666667*p1" or "1 - p2"."""
+    total = 0.0
+    product = None
+    sign = 1.0
+    expecting_factor = True
+
+    for token in EXPRESSION_TOKEN_PATTERN.findall(expression):
+        if expecting_factor:
+            if token in "+-" and product is None:
+                sign = -sign if token == "-" else sign
+                continue
+
+            if token[0].isalpha() or token[0] == "_":
+                if token not in parameters:
+                    raise ValueError(f"The parameter [{token}] in leaf [{expression}] should have a value")
+
+                factor = float(parameters[token])
+            else:
+                try:
+                    factor = float(token)
+                except ValueError:
+                    raise ValueError(f"Invalid leaf expression [{expression}]")
+
+            product = factor if product is None else product * factor
+            expecting_factor = False
+        elif token == "*":
+            expecting_factor = True
+        elif token in "+-":
+            total = total + sign * product
+            product = None
+            sign = -1.0 if token == "-" else 1.0
+            expecting_factor = True
+        else:
+            raise ValueError(f"Invalid leaf expression [{expression}]")
+
+    if expecting_factor:
+        raise ValueError(f"Invalid leaf expression [{expression}]")
+
+    return total + sign * product
+
+def read_leaf_value(token, parameters):
+    if token.startswith("["):
+        if not token.endswith("]"):
+            raise ValueError(f"Leaf [{token}] without its closing bracket")
+
+        return evaluate_leaf_expression(token[1:-1], parameters)
+
+    try:
+        return float(token)
+    except ValueError:
+        return None # not a number, so a state variable
+
+def read_decision_diagram(tokens, indexed_state_variables, parameters, manager, leaf_cache):
+    """Reads a tree into the nodes of an ADD, without recursion: each open inner node is a frame in a stack with its
+       ADD variable and the nodes of the children read so far, and becomes a node once its closing parenthesis is read.
+
+    A state variable with more than two children, as found in the traffic problems, keeps the first two (true and
+    false) and ignores the others.
+
+    Parameters:
+        tokens (iterator): tokens of the problem file, positioned at the opening parenthesis of the tree
+        indexed_state_variables (dict): maps each state variable to its index
+        parameters (dict): maps each parameter to its value
+        manager (ADDManager): manager of the nodes
+        leaf_cache (dict): maps each leaf token to its node, shared by the trees of a file
+
+    Returns:
+        node (int): root node of the ADD
+    """
+    stack = []
+    expect_token(tokens, "(")
+
+    while True:
+        # a "(" was just read, so a leaf or an inner node starts here
+        token = next_token(tokens, "a leaf or a state variable")
+
+        if token in indexed_state_variables:
+            stack.append((current_variable(indexed_state_variables[token]), []))
+            expect_token(tokens, "(")
+            continue
+
+        node = leaf_cache.get(token)
+
+        if node is None:
+            value = read_leaf_value(token, parameters)
+
+            if value is None:
+                raise ValueError(f"Unrecognized state variable [{token}] in decision diagram")
+
+            node = manager.constant(value)
+            leaf_cache[token] = node
+
+        expect_token(tokens, ")")
+
+        # link the complete subtree to its parent, closing every parent whose children were all read
+        while True:
+            if not stack:
+                return node
+
+            stack[-1][1].append(node)
+            token = next_token(tokens, "[(] or [)]")
+
+            if token == "(":
+                break
+
+            if token != ")":
+                raise ValueError(f"Expecting [(] or [)] but found [{token}]")
+
+            variable, children = stack.pop()
+
+            if len(children) < 2:
+                raise ValueError("The inner nodes of a decision diagram must have a true and a false branch")
+
+            node = manager.if_then_else(variable, children[0], children[1])
+
+def read_variables_section(tokens):
+    expect_token(tokens, "(")
+    state_variables = []
+
+    while True:
+        token = next_token(tokens, "a state variable or [)]")
+
+        if token == ")":
+            return state_variables
+
+        state_variables.append(token)
+
+def read_state_variables_section(tokens):
+    state_variables = []
+
+    while True:
+        token = next_token(tokens, "[endstate_variables]")
+
+        if token == "endstate_variables":
+            return state_variables
+
+        state_variables.append(token)
+
+def read_action_section(tokens, indexed_state_variables, parameters, manager, leaf_cache):
+    action_name = next_token(tokens, "an action name")
+    transition_adds = {}
+
+    while True:
+        token = next_token(tokens, "[endaction]")
+
+        if token == "endaction":
+            return action_name, transition_adds
+
+        if token not in indexed_state_variables:
+            raise ValueError(f"Unrecognized state variable [{token}] in action [{action_name}]")
+
+        node = read_decision_diagram(tokens, indexed_state_variables, parameters, manager, leaf_cache)
+        transition_adds[token] = ADD(manager, node)
+
+def read_state_list_section(tokens, end_token):
+    states = []
+
+    while True:
+        token = next_token(tokens, f"[{end_token}]")
+
+        if token == end_token:
+            return states
+
+        if token != "(":
+            raise ValueError(f"Expecting [(] or [{end_token}] but found [{token}]")
+
+        state = []
+
+        while True:
+            token = next_token(tokens, "a state variable or [)]")
+
+            if token == ")":
+                break
+
+            state.append(token)
+
+        states.append(state)
+
+def skip_parenthesized_section(tokens):
+    expect_token(tokens, "(")
+    depth = 1
+
+    while depth > 0:
+        token = next_token(tokens, "[)]")
+
+        if token == "(":
+            depth = depth + 1
+        elif token == ")":
+            depth = depth - 1
+
+def skip_section(tokens, end_token):
+    while next_token(tokens, f"[{end_token}]") != end_token:
+        pass
+
+def read_factored_problem_file(problem_file, parameters = None, manager = None):
+    """Reads a factored problem file in the SPUDD format.
+
+    Parameters:
+        problem_file (str): path of the problem file
+        parameters (dict): (optional) maps each parameter of the leaves (p1..pn) to its value
+        manager (ADDManager): (optional) manager of the ADDs. If ommited, a new manager is created
+
+    Returns:
+        mdp (FactoredMDP): a factored Markov Decision Process
+    """
+    if parameters is None:
+        parameters = {}
+
+    if manager is None:
+        manager = ADDManager()
+
+    state_variables = None
+    indexed_state_variables = None
+    reward_function = None
+    transition_function = {}
+    initial_states = None
+    goal_states = None
+    leaf_cache = {}
+
+    with open(problem_file, "r") as file:
+        tokens = read_tokens(file)
+
+        for token in tokens:
+            if token in ("variables", "state_variables"):
+                state_variables = read_variables_section(tokens) if token == "variables" else read_state_variables_section(tokens)
+                indexed_state_variables = { state_variable: index for index, state_variable in enumerate(state_variables) }
+            elif token in ("action", "reward") and state_variables is None:
+                raise ValueError(f"The variables section should come before the [{token}] section")
+            elif token == "action":
+                action_name, transition_adds = read_action_section(tokens, indexed_state_variables, parameters, manager, leaf_cache)
+                transition_function[action_name] = transition_adds
+            elif token == "reward":
+                reward_function = ADD(manager, read_decision_diagram(tokens, indexed_state_variables, parameters, manager, leaf_cache))
+            elif token == "initial":
+                initial_states = read_state_list_section(tokens, "endinitial")
+            elif token == "goal":
+                goal_states = read_state_list_section(tokens, "endgoal")
+            elif token == "constraints":
+                skip_parenthesized_section(tokens)
+            elif token in ("discount", "tolerance"):
+                next_token(tokens, f"the {token} value")
+            elif token in SKIPPED_SECTIONS:
+                skip_section(tokens, SKIPPED_SECTIONS[token])
+            else:
+                raise ValueError(f"Unknown section [{token}]")
+
+    return FactoredMDP(state_variables, reward_function, transition_function, initial_states, goal_states)
@@ -0,0 +1,118 @@
+"""Reader for problems stored as numeric matrix files, one directory per problem.
+
+Each action is stored in an "Action_<name>.txt" file with one "from to probability" triplet per line, where states
+are 1-based indexes, and the cost of each state is stored in "Cost.txt", one value per line. The river_traversal
+environments (river_traversal/Ambiente1, 2 and 3) use this format.
+"""
+
+import os
+
+import numpy as np
+
+from probabilistic_planning.structures import EnumerativeMDP
+
+ACTION_FILE_PREFIX = "Action_"
+COST_FILE = "Cost.txt"
+
+RIVER_TRAVERSAL_ACTIONS = {
+    "Norte": "move-north",
+    "Sul": "move-south",
+    "Leste": "move-east",
+    "Oeste": "move-west"
+}
+
+mark_agent_location = "agent_at_x%02d_y%02d"
+
+def read_numeric_file(file_path, columns):
+    # bulk parsing of the whole file, without handling each line in Python
+    data = np.loadtxt(file_path, dtype=np.float64, ndmin=2)
+
+    if data.shape[1] != columns:
+        raise ValueError(f"The file [{file_path}] should have {columns} column(s) per line")
+
+    return data
+
+def read_state_indexes(column, number_of_states, file_path):
+    state_indexes = column.astype(np.int64)
+
+    if np.any(state_indexes != column) or np.any(state_indexes < 1) or np.any(state_indexes > number_of_states):
+        raise ValueError(f"The file [{file_path}] should only have state indexes between 1 and {number_of_states}")
+
+    return state_indexes - 1
+
+def read_matrix_problem_directory(problem_directory, state_names = None, action_names = None,
+                                  initial_states = None, goal_states = None):
+    """Reads a problem stored as numeric matrix files.
+
+    Parameters:
+        problem_directory (str): directory with the "Action_<name>.txt" and "Cost.txt" files
+        state_names (list): (optional) name of each state, following the state indexes. If ommited, the states
+                            are named "state<index>"
+        action_names (dict): (optional) maps the <name> of an action file to the action name used in the MDP
+        initial_states (list): (optional) named states considered initial states
+        goal_states (list): (optional) named states considered goal states
+
+    Returns:
+        mdp (EnumerativeMDP): an enumerative Markov Decision Process, where the reward of each state is its negated cost
+    """
+    costs = read_numeric_file(os.path.join(problem_directory, COST_FILE), 1)[:, 0]
+    number_of_states = len(costs)
+
+    if state_names is None:
+        state_names = [ f"state{index}" for index in range(1, number_of_states + 1) ]
+    elif len(state_names) != number_of_states:
+        raise ValueError(f"There should be one state name per line of [{COST_FILE}]")
+
+    if action_names is None:
+        action_names = {}
+
+    transition_arrays = {}
+
+    for file_name in sorted(os.listdir(problem_directory)):
+        if not (file_name.startswith(ACTION_FILE_PREFIX) and file_name.endswith(".txt")):
+            continue
+
+        file_path = os.path.join(problem_directory, file_name)
+        action_file_name = file_name[len(ACTION_FILE_PREFIX):-len(".txt")]
+        action_name = action_names.get(action_file_name, action_file_name)
+
+        transitions = read_numeric_file(file_path, 3)
+
+        transition_arrays[action_name] = (
+            state_names,
+            read_state_indexes(transitions[:, 0], number_of_states, file_path),
+            read_state_indexes(transitions[:, 1], number_of_states, file_path),
+            transitions[:, 2]
+        )
+
+    reward_function = dict(zip(state_names, (-costs).tolist()))
+
+    return EnumerativeMDP.from_transition_arrays(state_names, reward_function, transition_arrays, initial_states, goal_states)
+
+def read_river_traversal_directory(problem_directory, width):
+    """Reads a river_traversal environment stored as numeric matrix files (Ambiente1, 2 or 3).
+
+    The states are indexed column by column, so the state index i is the cell x = (i - 1) // height + 1 and
+    y = (i - 1) % height + 1. The agent starts at (1, 1) and its goal is the cell (width, 1), on the other
+    margin of the river. States and actions are named as in the river_traversal .net files.
+
+    Parameters:
+        problem_directory (str): directory of the environment
+        width (int): number of columns of the grid (5 for Ambiente1, 20 for Ambiente2 and 50 for Ambiente3)
+
+    Returns:
+        mdp (EnumerativeMDP): an enumerative Markov Decision Process
+    """
+    number_of_states = len(read_numeric_file(os.path.join(problem_directory, COST_FILE), 1))
+
+    if width < 1 or number_of_states % width != 0:
+        raise ValueError(f"The number of states ({number_of_states}) should be a multiple of the width ({width})")
+
+    height = number_of_states // width
+
+    state_names = [ mark_agent_location % (x, y) for x in range(1, width + 1) for y in range(1, height + 1) ]
+
+    initial_states = [ mark_agent_location % (1, 1) ]
+    goal_states = [ mark_agent_location % (width, 1) ]
+
+    return read_matrix_problem_directory(problem_directory, state_names, RIVER_TRAVERSAL_ACTIONS, initial_states, goal_states)
@@ -1,4 +1,9 @@
-from probabilistic_planning.structures import EnumerativeMDP
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from probabilistic_planning.structures import EnumerativeBMDP, EnumerativeMDP
+from . import compiled_cache
 
 def clean_string(value, remove_tabs = False, remove_spaces = False, remove_line_breaks = False):
     if remove_tabs:
@@ -27,11 +32,26 @@ def read_state_section(file):
         if line.startswith("endstates"):
             return states
 
-def read_action_section(file, line):
-    transition_probabilities = {}
-
+def read_action_name(line):
     data = line.split(" ")
-    action_name = clean_string(data[1], remove_line_breaks = True)
+    return clean_string(data[1], remove_line_breaks = True)
+
+def read_action_transitions(file, state_ids):
+    """Reads the transitions of an action section until its endaction token, interning each state name to an
+       integer id as it is read.
+
+    Parameters:
+        file (file): problem file, positioned after the action header line
+        state_ids (dict): maps state names to ids, new names are added with the next free id
+
+    Returns:
+        from_state_ids (array): id of the origin state of each transition
+        to_state_ids (array): id of the destination state of each transition
+        probabilities (array): probability of each transition
+    """
+    from_state_ids = array("i")
+    to_state_ids = array("i")
+    probabilities = array("d")
 
     while True:
         line = file.readline()
@@ -40,16 +60,79 @@ def read_action_section(file, line):
             raise Exception("endaction token not found")
 
         if line.startswith("endaction"):
-            return action_name, transition_probabilities
+            return from_state_ids, to_state_ids, probabilities
+
+        data = line.split()
+        if not data: continue # blank line
+
+        from_state_ids.append(state_ids.setdefault(data[0], len(state_ids)))
+        to_state_ids.append(state_ids.setdefault(data[1], len(state_ids)))
+        probabilities.append(float(data[2]))
+
+def read_interval_action_transitions(file, state_ids):
+    """Reads the transitions of an action section with probability bounds ("from to lower upper" lines) until its
+       endaction token, interning each state name to an integer id as it is read.
+
+    Returns:
+        from_state_ids (array): id of the origin state of each transition
+        to_state_ids (array): id of the destination state of each transition
+        lower_probabilities (array): lower probability bound of each transition
+        upper_probabilities (array): upper probability bound of each transition
+    """
+    from_state_ids = array("i")
+    to_state_ids = array("i")
+    lower_probabilities = array("d")
+    upper_probabilities = array("d")
 
-        line = clean_string(line, remove_tabs = True)
-        data = line.split(" ")
+    while True:
+        line = file.readline()
+
+        if not line:
+            raise Exception("endaction token not found")
+
+        if line.startswith("endaction"):
+            return from_state_ids, to_state_ids, lower_probabilities, upper_probabilities
+
+        data = line.split()
+        if not data: continue # blank line
 
-        from_state = data[0]
-        to_state = data[1]
-        probability = float(data[2])
+        if len(data) != 4:
+            raise ValueError(f"Invalid transition [{line.strip()}]. It should have an origin, a destination, a lower and an upper probability")
 
-        transition_probabilities[(from_state, to_state)] = probability
+        from_state_ids.append(state_ids.setdefault(data[0], len(state_ids)))
+        to_state_ids.append(state_ids.setdefault(data[1], len(state_ids)))
+        lower_probabilities.append(float(data[2]))
+        upper_probabilities.append(float(data[3]))
+
+def read_action_section(file, line, state_ids):
+    action_name = read_action_name(line)
+    return action_name, read_action_transitions(file, state_ids)
+
+def read_action_section_at(problem_file, action_name, position):
+    """Reads the transitions of an action section in a separate process, from a position given by tell()
+       right after the action header line.
+
+    Returns:
+        action_name (str): name of the action
+        transition_arrays (tuple): state names read in this section and the transition arrays that index them
+    """
+    state_ids = {}
+
+    with open(problem_file, "r") as file:
+        file.seek(position)
+        from_state_ids, to_state_ids, probabilities = read_action_transitions(file, state_ids)
+
+    return action_name, (list(state_ids), from_state_ids, to_state_ids, probabilities)
+
+def skip_action_section(file):
+    while True:
+        line = file.readline()
+
+        if not line:
+            raise Exception("endaction token not found")
+
+        if line.startswith("endaction"):
+            return
 
 def read_reward_section(file):
     reward = {}
@@ -101,13 +184,104 @@ def read_goal_state_section(file):
         state = clean_string(line, remove_tabs = True, remove_spaces = True, remove_line_breaks = True)
         goal_states.append(state)
 
-def read_problem_file(problem_file):
+def parse_problem_file(problem_file, workers = None):
+    states = None
+    reward_function = None
+    transition_arrays = {}
+    initial_states = None
+    goal_states = []
+
+    # state names read in action sections are shared by all actions parsed in this process
+    state_ids = {}
+    serial_sections = {}
+    parallel_sections = []
+    executor = ProcessPoolExecutor(max_workers = workers) if workers is not None and workers > 1 else None
+
+    try:
+        with open(problem_file, "r") as file:
+            while True:
+                line = file.readline()
+                if not line: break # end of file
+
+                if line.startswith("states"):
+                    states = read_state_section(file)
+                elif line.startswith("action"):
+                    if executor is not None:
+                        position = file.tell()
+                        parallel_sections.append(executor.submit(read_action_section_at, problem_file, read_action_name(line), position))
+                        skip_action_section(file)
+                    else:
+                        action_name, transitions = read_action_section(file, line, state_ids)
+                        serial_sections[action_name] = transitions
+                elif line.startswith("reward"):
+                    reward_function = read_reward_section(file)
+                elif line.startswith("initialstate"):
+                    initial_states = read_initial_state_section(file)
+                elif line.startswith("goalstate"):
+                    goal_states = read_goal_state_section(file)
+
+        for parallel_section in parallel_sections:
+            action_name, transitions = parallel_section.result()
+            transition_arrays[action_name] = transitions
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    state_names = list(state_ids)
+    for action_name, transitions in serial_sections.items():
+        transition_arrays[action_name] = (state_names, ) + transitions
+
+    return EnumerativeMDP.from_transition_arrays(states, reward_function, transition_arrays, initial_states, goal_states)
+
+def read_problem_file(problem_file, use_cache = False, cache_directory = None, workers = None):
+    """Reads an enumerative problem file.
+
+    Parameters:
+        problem_file (str): path of the problem file
+        use_cache (bool): if True, the parsed problem is compiled to a binary cache on the first read and the
+                          following reads memory-map it, while the file path, modification time and size are the same
+        cache_directory (str): (optional) directory of the compiled problems, defaults to a ".cache" directory next
+                               to the problem file
+        workers (int): (optional) number of worker processes that parse the action sections in parallel, if
+                       greater than 1
+
+    Returns:
+        mdp (EnumerativeMDP): an enumerative Markov Decision Process
+    """
+    if not use_cache:
+        return parse_problem_file(problem_file, workers)
+
+    compiled_problem_directory = compiled_cache.get_compiled_problem_directory(problem_file, cache_directory)
+
+    if os.path.isdir(compiled_problem_directory):
+        return compiled_cache.read_compiled_problem(compiled_problem_directory)
+
+    mdp = parse_problem_file(problem_file, workers)
+    compiled_cache.write_compiled_problem(mdp, compiled_problem_directory)
+
+    return mdp
+
+def read_interval_problem_file(problem_file):
+    """Reads an enumerative problem file whose transitions have lower and upper probability bounds, as written by
+       the navigation_bmdp and triangle_tireworld_bmdp generators. Other sections follow the format read by
+       read_problem_file, and the cost and discount factor sections are ignored.
+
+    Parameters:
+        problem_file (str): path of the problem file
+
+    Returns:
+        bmdp (EnumerativeBMDP): an enumerative Bounded-parameter Markov Decision Process
+    """
     states = None
     reward_function = None
-    transition_function = {}
+    transition_arrays = {}
     initial_states = None
     goal_states = []
 
+    # state names read in action sections are shared by all actions
+    state_ids = {}
+    state_names = []
+
     with open(problem_file, "r") as file:
         while True:
             line = file.readline()
@@ -116,8 +290,7 @@ def read_problem_file(problem_file):
             if line.startswith("states"):
                 states = read_state_section(file)
             elif line.startswith("action"):
-                action_name, transition_probabilities = read_action_section(file, line)
-                transition_function[action_name] = transition_probabilities
+                transition_arrays[read_action_name(line)] = (state_names, ) + read_interval_action_transitions(file, state_ids)
             elif line.startswith("reward"):
                 reward_function = read_reward_section(file)
             elif line.startswith("initialstate"):
@@ -125,4 +298,6 @@ def read_problem_file(problem_file):
             elif line.startswith("goalstate"):
                 goal_states = read_goal_state_section(file)
 
-    return EnumerativeMDP(states, reward_function, transition_function, initial_states, goal_states)
+    state_names.extend(state_ids)
+
+    return EnumerativeBMDP.from_transition_arrays(states, reward_function, transition_arrays, initial_states, goal_states)
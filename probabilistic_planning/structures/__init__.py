@@ -1,11 +1,13 @@
 """Structures to represent different types of MDP.
 
 EnumerativeMDP: represents a MDP with enumerable states
+EnumerativeBMDP: represents a MDP with enumerable states and bounded transition probabilities
 FactoredMDP: represents a MDP factored by state variables
 """
 
 from .enumerative.enumerative_mdp import EnumerativeMDP
+from .enumerative.enumerative_bmdp import EnumerativeBMDP
 from .enumerative.enumerative_value_function import EnumerativeValueFunction
 from .factored.factored_mdp import FactoredMDP
 
-__all__ = ["EnumerativeMDP", "EnumerativeValueFunction", "FactoredMDP"]
+__all__ = ["EnumerativeMDP", "EnumerativeBMDP", "EnumerativeValueFunction", "FactoredMDP"]
@@ -1,10 +1,9 @@
 """Structures to handle decision digrams, usually used to handle symbolic representations (like factored MDP).
 
 ADD: represents an algebraic decision diagram, commonly used to represent factored functions
+ADDManager: stores the unique nodes of a set of ADDs and caches the operations over them
 """
 
-# for now, I'm masking the use of pyddlib for tests purposes
+from .algebraic_decision_diagram import ADD, ADDManager
 
-from pyddlib.add import ADD
-
-__all__ = ["ADD"]
+__all__ = ["ADD", "ADDManager"]
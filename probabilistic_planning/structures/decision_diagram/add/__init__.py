@@ -11,16 +11,19 @@
 from ....helpers import validate_defined_argument
 from .. import ADD
 
-def read_add_from_tuples(tuple_value, state_variables):
+def read_add_from_tuples(tuple_value, state_variables, manager = None):
     validate_defined_argument(tuple_value, "tuples")
     validate_defined_argument(state_variables, "state_variables")
 
-    return convert_tuple_to_add(tuple_value, state_variables)
+    return convert_tuple_to_add(tuple_value, state_variables, [], manager)
+
+def convert_tuple_to_add(add_as_tuple, state_variables, trajectory = None, manager = None):
+    if trajectory is None:
+        trajectory = []
 
-def convert_tuple_to_add(add_as_tuple, state_variables, trajectory = []):
     # leaf node on ADD
     if type(add_as_tuple) is float or type(add_as_tuple) is int:
-        return ADD.constant(add_as_tuple)
+        return ADD.constant(add_as_tuple, manager)
 
     if type(add_as_tuple) is not tuple:
         raise ValueError("The ADD representation must be a tuple!")
@@ -42,25 +45,19 @@ def convert_tuple_to_add(add_as_tuple, state_variables, trajectory = []):
 
     high, low = high_and_low
 
-    state_variable_index = state_variables.index(state_variable)
+    # each state variable is followed by its primed copy in the variable order, as in FactoredMDP
+    state_variable_index = 2 * state_variables.index(state_variable)
 
     if state_variable in trajectory:
         # creates prime variable
-        state_variable_index = state_variable_index + len(state_variables)
+        state_variable_index = state_variable_index + 1
 
     trajectory.append(state_variable)
 
-    variable = ADD.variable(state_variable_index)
-
-    # build truthy branch
-    high_add = convert_tuple_to_add(high, state_variables, trajectory)
-    high_var = variable * high_add
-
-    # build falsy branch
-    low_add = convert_tuple_to_add(low, state_variables, trajectory)
-    low_var = ~variable * low_add
+    high_add = convert_tuple_to_add(high, state_variables, trajectory, manager)
+    low_add = convert_tuple_to_add(low, state_variables, trajectory, manager)
 
-    # merge both into a single ADD
-    return low_var + high_var
+    # links both branches in a single node, only applying operations when the branches test earlier variables
+    return ADD.if_then_else(state_variable_index, high_add, low_add)
 
 __all__ = ["read_add_from_tuples"]
@@ -0,0 +1,718 @@
+"""Module with a native implementation of Algebraic Decision Diagrams (ADDs).
+
+Every node lives in an ADDManager, that stores the nodes in parallel arrays and keeps them reduced and unique
+(hash-consing): two ADDs that represent the same function always have the same node. Variables are integers and a
+smaller variable is always closer to the root.
+"""
+
+from collections import OrderedDict
+import operator
+import sys
+import weakref
+
+# level of the terminal nodes, below every variable
+TERMINAL_LEVEL = sys.maxsize
+
+# size of the operation cache of a new manager
+DEFAULT_CACHE_SIZE = 1 << 18
+
+# number of nodes of a manager before its first garbage collection
+DEFAULT_GARBAGE_COLLECTION_THRESHOLD = 1 << 20
+
+# number of bisection steps that ADD.approximate uses to find the smallest tolerance within its maximum size
+APPROXIMATION_BISECTION_STEPS = 8
+
+# binary operations supported by apply, applied to the values of the terminal nodes
+OPERATIONS = {
+    "sum": operator.add,
+    "difference": operator.sub,
+    "product": operator.mul,
+    "quotient": operator.truediv,
+    "maximum": max,
+    "minimum": min,
+    "greater": lambda first_value, second_value: float(first_value > second_value)
+}
+
+COMMUTATIVE_OPERATIONS = {"sum", "product", "maximum", "minimum"}
+
+class ADDManager:
+    """Stores the nodes of a set of ADDs and the operations over them.
+
+    The node i is a terminal node if variables[i] is TERMINAL_LEVEL, with its value in values[i], otherwise it tests
+    variables[i] and continues in highs[i] when the variable is true and in lows[i] when it is false. The unique table
+    maps (variable, high, low) and the terminal values to their node, and the results of apply are memoised in an
+    operation cache with least recently used eviction, so its memory is bounded by cache_size.
+
+    Nodes are never removed while operations run. Between operations, collect_garbage removes the nodes that no live
+    ADD handle reaches and renumbers the nodes of the live handles.
+
+    Attributes:
+        variables (list): variable tested by each node
+        highs (list): node reached by each node when its variable is true
+        lows (list): node reached by each node when its variable is false
+        values (list): value of each terminal node (None for inner nodes)
+        cache_size (int): maximum number of results kept in the operation cache
+    """
+
+    def __init__(self, cache_size = DEFAULT_CACHE_SIZE):
+        if cache_size < 0:
+            raise ValueError(f"The operation cache size must be non-negative, but received {cache_size}")
+
+        self.variables = []
+        self.highs = []
+        self.lows = []
+        self.values = []
+        self.cache_size = cache_size
+
+        self._unique_table = {}
+        self._terminal_table = {}
+        self._operation_cache = OrderedDict()
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # keyed by identity, as equal handles share the same node
+        self._handles = weakref.WeakValueDictionary()
+        self._garbage_collection_threshold = DEFAULT_GARBAGE_COLLECTION_THRESHOLD
+
+    def number_of_nodes(self):
+        return len(self.variables)
+
+    def constant(self, value):
+        """Returns the terminal node of a value, creating it if needed."""
+        value = float(value)
+        node = self._terminal_table.get(value)
+
+        if node is None:
+            node = len(self.variables)
+            self.variables.append(TERMINAL_LEVEL)
+            self.highs.append(-1)
+            self.lows.append(-1)
+            self.values.append(value)
+            self._terminal_table[value] = node
+
+        return node
+
+    def node(self, variable, high, low):
+        """Returns the reduced node that tests a variable, creating it if needed.
+
+        The variable must be smaller than the variables tested by high and low (see if_then_else otherwise).
+        """
+        if high == low:
+            return high # the test is redundant
+
+        key = (variable, high, low)
+        node = self._unique_table.get(key)
+
+        if node is None:
+            node = len(self.variables)
+            self.variables.append(variable)
+            self.highs.append(high)
+            self.lows.append(low)
+            self.values.append(None)
+            self._unique_table[key] = node
+
+        return node
+
+    def variable(self, variable):
+        """Returns the node of the function that is 1 when the variable is true and 0 otherwise."""
+        if variable < 0:
+            raise ValueError(f"The variable index must be non-negative, but received {variable}")
+
+        return self.node(variable, self.constant(1.0), self.constant(0.0))
+
+    def is_terminal(self, node):
+        return self.variables[node] == TERMINAL_LEVEL
+
+    def value(self, node):
+        if not self.is_terminal(node):
+            raise ValueError(f"The node [{node}] is not a terminal node")
+
+        return self.values[node]
+
+    def cofactors(self, node, variable):
+        """Returns the nodes reached by a node when the variable is true and false, the node itself twice when the
+           variable is not tested at its root."""
+        if self.variables[node] != variable:
+            return node, node
+
+        return self.highs[node], self.lows[node]
+
+    def if_then_else(self, variable, high, low):
+        """Returns the node of the function that is high when the variable is true and low otherwise, even if high
+           or low test variables that should be above it."""
+        if variable < self.variables[high] and variable < self.variables[low]:
+            return self.node(variable, high, low)
+
+        indicator = self.variable(variable)
+        complement = self.apply("difference", self.constant(1.0), indicator)
+
+        return self.apply("sum", self.apply("product", indicator, high), self.apply("product", complement, low))
+
+    def apply(self, operation, first_node, second_node):
+        """Combines two ADDs with a binary operation (see OPERATIONS), visiting each pair of nodes once."""
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown ADD operation [{operation}]")
+
+        return self._apply(operation, OPERATIONS[operation], first_node, second_node)
+
+    def _apply(self, operation, function, first_node, second_node):
+        variables = self.variables
+        first_variable = variables[first_node]
+        second_variable = variables[second_node]
+
+        if first_variable == TERMINAL_LEVEL and second_variable == TERMINAL_LEVEL:
+            return self.constant(function(self.values[first_node], self.values[second_node]))
+
+        shortcut = self._apply_shortcut(operation, first_node, second_node)
+        if shortcut is not None:
+            return shortcut
+
+        if operation in COMMUTATIVE_OPERATIONS and second_node < first_node:
+            first_node, second_node = second_node, first_node
+            first_variable, second_variable = second_variable, first_variable
+
+        key = (operation, first_node, second_node)
+        operation_cache = self._operation_cache
+        result = operation_cache.get(key)
+
+        if result is not None:
+            operation_cache.move_to_end(key)
+            self.cache_hits = self.cache_hits + 1
+            return result
+
+        self.cache_misses = self.cache_misses + 1
+
+        # expand the pair on the variable that is closer to the root
+        highs = self.highs
+        lows = self.lows
+
+        if first_variable <= second_variable:
+            variable = first_variable
+            first_high, first_low = highs[first_node], lows[first_node]
+        else:
+            variable = second_variable
+            first_high = first_low = first_node
+
+        if second_variable == variable:
+            second_high, second_low = highs[second_node], lows[second_node]
+        else:
+            second_high = second_low = second_node
+
+        result = self.node(
+            variable,
+            self._apply(operation, function, first_high, second_high),
+            self._apply(operation, function, first_low, second_low)
+        )
+
+        if self.cache_size > 0:
+            operation_cache[key] = result
+
+            if len(operation_cache) > self.cache_size:
+                operation_cache.popitem(last=False) # evict the least recently used result
+
+        return result
+
+    def _apply_shortcut(self, operation, first_node, second_node):
+        # results that do not depend on the other operand
+        if operation == "sum":
+            if self.values[first_node] == 0.0:
+                return second_node
+            if self.values[second_node] == 0.0:
+                return first_node
+        elif operation == "product":
+            if self.values[first_node] == 0.0 or self.values[second_node] == 1.0:
+                return first_node
+            if self.values[second_node] == 0.0 or self.values[first_node] == 1.0:
+                return second_node
+        elif operation == "difference":
+            if self.values[second_node] == 0.0:
+                return first_node
+        elif operation in ("maximum", "minimum"):
+            if first_node == second_node:
+                return first_node
+
+        return None
+
+    def clear_cache(self):
+        self._operation_cache.clear()
+
+    def register(self, add):
+        self._handles[id(add)] = add
+
+    def collect_garbage(self):
+        """Removes the nodes that are not reached by any live ADD handle, updating the nodes of the live handles.
+
+        It must not be called while an operation of this manager runs, as the node numbers change (and so the hashes
+        of the live handles). A child is always created before its parents, so keeping the order of the nodes keeps the
+        children before the parents.
+
+        Returns:
+            removed_nodes (int): number of removed nodes
+        """
+        handles = list(self._handles.values())
+        number_of_nodes = len(self.variables)
+
+        reachable = bytearray(number_of_nodes)
+        nodes_to_visit = [ handle.node for handle in handles ]
+
+        while nodes_to_visit:
+            node = nodes_to_visit.pop()
+
+            if reachable[node]:
+                continue
+
+            reachable[node] = 1
+
+            if self.variables[node] != TERMINAL_LEVEL:
+                nodes_to_visit.append(self.highs[node])
+                nodes_to_visit.append(self.lows[node])
+
+        new_nodes = [-1] * number_of_nodes
+        variables, highs, lows, values = [], [], [], []
+
+        for node in range(number_of_nodes):
+            if not reachable[node]:
+                continue
+
+            new_nodes[node] = len(variables)
+            variables.append(self.variables[node])
+            values.append(self.values[node])
+
+            if self.variables[node] == TERMINAL_LEVEL:
+                highs.append(-1)
+                lows.append(-1)
+            else:
+                highs.append(new_nodes[self.highs[node]])
+                lows.append(new_nodes[self.lows[node]])
+
+        self.variables, self.highs, self.lows, self.values = variables, highs, lows, values
+
+        self._unique_table = {}
+        self._terminal_table = {}
+
+        for node, variable in enumerate(variables):
+            if variable == TERMINAL_LEVEL:
+                self._terminal_table[values[node]] = node
+            else:
+                self._unique_table[(variable, highs[node], lows[node])] = node
+
+        self._operation_cache.clear()
+
+        for handle in handles:
+            handle.node = new_nodes[handle.node]
+
+        return number_of_nodes - len(variables)
+
+    def collect_garbage_if_needed(self):
+        """Collects the garbage when the number of nodes doubled since the last collection (see collect_garbage)."""
+        if len(self.variables) < self._garbage_collection_threshold:
+            return 0
+
+        removed_nodes = self.collect_garbage()
+        self._garbage_collection_threshold = max(DEFAULT_GARBAGE_COLLECTION_THRESHOLD, 2 * len(self.variables))
+
+        return removed_nodes
+
+    def map_terminals(self, node, function):
+        """Returns the ADD obtained by applying a function to every terminal value of an ADD."""
+        mapped_nodes = {}
+
+        def map_node(node):
+            mapped_node = mapped_nodes.get(node)
+
+            if mapped_node is None:
+                if self.variables[node] == TERMINAL_LEVEL:
+                    mapped_node = self.constant(function(self.values[node]))
+                else:
+                    mapped_node = self.node(self.variables[node], map_node(self.highs[node]), map_node(self.lows[node]))
+
+                mapped_nodes[node] = mapped_node
+
+            return mapped_node
+
+        return map_node(node)
+
+    def merge_terminals(self, node, tolerance):
+        """Returns the ADD obtained by merging the terminal values of an ADD that are within a tolerance, as in APRICODD.
+
+        The sorted terminal values are split into groups whose values differ by at most the tolerance and each value is
+        replaced by the middle of its group, so the inner nodes that only differed in those values become equal and are
+        reduced away.
+
+        Parameters:
+            node (int): root node of the ADD
+            tolerance (float): maximum difference between the values of a group
+
+        Returns:
+            merged_node (int): root node of the merged ADD
+            error (float): maximum difference between a value of the ADD and its merged value (at most tolerance / 2)
+        """
+        if tolerance < 0:
+            raise ValueError(f"The tolerance must be non-negative, but received {tolerance}")
+
+        values = sorted({ self.values[reachable_node] for reachable_node in self.reachable_nodes(node)
+                          if self.variables[reachable_node] == TERMINAL_LEVEL })
+
+        merged_values = {}
+        error = 0.0
+        group_start = 0
+
+        for index in range(1, len(values) + 1):
+            if index < len(values) and values[index] - values[group_start] <= tolerance:
+                continue
+
+            group = values[group_start:index]
+            middle = (group[0] + group[-1]) / 2
+
+            for value in group:
+                merged_values[value] = middle
+
+            error = max(error, (group[-1] - group[0]) / 2)
+            group_start = index
+
+        if error == 0.0:
+            return node, 0.0
+
+        return self.map_terminals(node, merged_values.__getitem__), error
+
+    def memory_usage(self):
+        """Estimates the bytes used by the nodes, the unique table and the operation cache of this manager.
+
+        Only the containers and their keys are counted, as the integers and floats they hold are mostly shared.
+        """
+        key_size = sys.getsizeof((0, 0, 0))
+
+        return (
+            sum(sys.getsizeof(array) for array in (self.variables, self.highs, self.lows, self.values)) +
+            sys.getsizeof(self._unique_table) + len(self._unique_table) * key_size +
+            sys.getsizeof(self._terminal_table) +
+            sys.getsizeof(self._operation_cache) + len(self._operation_cache) * key_size
+        )
+
+    def shift_variables(self, node, offset):
+        """Returns the ADD obtained by adding an offset to every variable of an ADD (e.g. to prime the state
+           variables). The order of the variables is kept, so the nodes are linked without applying operations."""
+        shifted_nodes = {}
+
+        def shift_node(node):
+            shifted_node = shifted_nodes.get(node)
+
+            if shifted_node is None:
+                if self.variables[node] == TERMINAL_LEVEL:
+                    shifted_node = node
+                else:
+                    shifted_node = self.node(self.variables[node] + offset, shift_node(self.highs[node]), shift_node(self.lows[node]))
+
+                shifted_nodes[node] = shifted_node
+
+            return shifted_node
+
+        return shift_node(node)
+
+    def restrict(self, node, variable, value):
+        """Returns the ADD obtained by fixing a variable to a truth value."""
+        restricted_nodes = {}
+
+        def restrict_node(node):
+            node_variable = self.variables[node]
+
+            if node_variable > variable:
+                return node # the variable is not tested below this node
+
+            if node_variable == variable:
+                return self.highs[node] if value else self.lows[node]
+
+            restricted_node = restricted_nodes.get(node)
+
+            if restricted_node is None:
+                restricted_node = self.node(node_variable, restrict_node(self.highs[node]), restrict_node(self.lows[node]))
+                restricted_nodes[node] = restricted_node
+
+            return restricted_node
+
+        return restrict_node(node)
+
+    def eliminate(self, node, variable, operation):
+        """Returns operation(f(x = true), f(x = false)), combining the cofactors of a variable where it is tested,
+           without building the restricted ADDs."""
+        function = OPERATIONS[operation]
+        eliminated_nodes = {}
+
+        def eliminate_node(node):
+            node_variable = self.variables[node]
+
+            if node_variable > variable:
+                # the variable is not tested below this node, so both cofactors are the node itself
+                return self._apply(operation, function, node, node)
+
+            if node_variable == variable:
+                return self._apply(operation, function, self.highs[node], self.lows[node])
+
+            eliminated_node = eliminated_nodes.get(node)
+
+            if eliminated_node is None:
+                eliminated_node = self.node(node_variable, eliminate_node(self.highs[node]), eliminate_node(self.lows[node]))
+                eliminated_nodes[node] = eliminated_node
+
+            return eliminated_node
+
+        return eliminate_node(node)
+
+    def sum_out(self, node, variable):
+        """Returns f(x = true) + f(x = false), eliminating a variable by summation."""
+        return self.eliminate(node, variable, "sum")
+
+    def max_out(self, node, variable):
+        """Returns max(f(x = true), f(x = false)), eliminating a variable by maximization."""
+        return self.eliminate(node, variable, "maximum")
+
+    def evaluate(self, node, assignment):
+        """Returns the value of an ADD given the truth value of its variables.
+
+        Parameters:
+            node (int): root node of the ADD
+            assignment (dict or list): maps each variable index to its truth value
+
+        Returns:
+            value (float): the value reached by the assignment
+        """
+        variables = self.variables
+
+        while variables[node] != TERMINAL_LEVEL:
+            node = self.highs[node] if assignment[variables[node]] else self.lows[node]
+
+        return self.values[node]
+
+    def reachable_nodes(self, node):
+        """Returns the list of nodes of an ADD, without recursion."""
+        visited_nodes = {node}
+        nodes_to_visit = [node]
+
+        while nodes_to_visit:
+            node = nodes_to_visit.pop()
+
+            if self.variables[node] == TERMINAL_LEVEL:
+                continue
+
+            for child in (self.highs[node], self.lows[node]):
+                if child not in visited_nodes:
+                    visited_nodes.add(child)
+                    nodes_to_visit.append(child)
+
+        return list(visited_nodes)
+
+    def support(self, node):
+        """Returns the sorted variables tested by an ADD."""
+        return sorted({ self.variables[reachable_node] for reachable_node in self.reachable_nodes(node)
+                        if self.variables[reachable_node] != TERMINAL_LEVEL })
+
+# manager of the ADDs created without an explicit manager
+default_manager = ADDManager()
+
+class ADD:
+    """Handle to the root node of an ADD kept in an ADDManager, with arithmetic operators.
+
+    Attributes:
+        manager (ADDManager): manager that stores the nodes of this ADD
+        node (int): root node of this ADD
+    """
+
+    __slots__ = ("manager", "node", "__weakref__")
+
+    def __init__(self, manager, node):
+        self.manager = manager
+        self.node = node
+        manager.register(self)
+
+    @classmethod
+    def constant(cls, value, manager = None):
+        if manager is None:
+            manager = default_manager
+
+        return cls(manager, manager.constant(value))
+
+    @classmethod
+    def variable(cls, variable, manager = None):
+        if manager is None:
+            manager = default_manager
+
+        return cls(manager, manager.variable(variable))
+
+    @classmethod
+    def if_then_else(cls, variable, high, low):
+        if high.manager is not low.manager:
+            raise ValueError("The ADDs must belong to the same manager")
+
+        return cls(high.manager, high.manager.if_then_else(variable, high.node, low.node))
+
+    def _operand(self, other):
+        if isinstance(other, ADD):
+            if other.manager is not self.manager:
+                raise ValueError("The ADDs must belong to the same manager")
+
+            return other.node
+
+        return self.manager.constant(other)
+
+    def _apply(self, operation, other):
+        return ADD(self.manager, self.manager.apply(operation, self.node, self._operand(other)))
+
+    def _reflected_apply(self, operation, other):
+        return ADD(self.manager, self.manager.apply(operation, self._operand(other), self.node))
+
+    def __add__(self, other):
+        return self._apply("sum", other)
+
+    def __radd__(self, other):
+        return self._reflected_apply("sum", other)
+
+    def __sub__(self, other):
+        return self._apply("difference", other)
+
+    def __rsub__(self, other):
+        return self._reflected_apply("difference", other)
+
+    def __mul__(self, other):
+        return self._apply("product", other)
+
+    def __rmul__(self, other):
+        return self._reflected_apply("product", other)
+
+    def __truediv__(self, other):
+        return self._apply("quotient", other)
+
+    def __neg__(self):
+        return ADD(self.manager, self.manager.map_terminals(self.node, operator.neg))
+
+    def __invert__(self):
+        # complement of a 0/1 function
+        return self._reflected_apply("difference", 1.0)
+
+    def maximum(self, other):
+        return self._apply("maximum", other)
+
+    def minimum(self, other):
+        return self._apply("minimum", other)
+
+    def map_terminals(self, function):
+        return ADD(self.manager, self.manager.map_terminals(self.node, function))
+
+    def approximate(self, tolerance = 0.0, maximum_size = None):
+        """Merges the terminal values of this ADD within a tolerance (see ADDManager.merge_terminals).
+
+        If the merged ADD still has more than maximum_size nodes, the tolerance is doubled until it fits, which
+        always happens, as an ADD with a single value has one node, and then narrowed by bisection.
+
+        Parameters:
+            tolerance (float): maximum difference between the merged values
+            maximum_size (int): (optional) maximum number of nodes of the approximated ADD
+
+        Returns:
+            approximation (ADD): the approximated ADD
+            error (float): maximum difference between this ADD and its approximation
+        """
+        if maximum_size is not None and maximum_size < 1:
+            raise ValueError(f"The maximum size must be positive, but received {maximum_size}")
+
+        node, error = self.manager.merge_terminals(self.node, tolerance)
+
+        if maximum_size is not None and len(self.manager.reachable_nodes(node)) > maximum_size:
+            values = self.terminal_values()
+            fits = lambda merged_node: len(self.manager.reachable_nodes(merged_node)) <= maximum_size
+
+            # start from the tolerance that would spread the values evenly over maximum_size groups
+            smaller_tolerance = tolerance
+            tolerance = max(tolerance, (values[-1] - values[0]) / maximum_size)
+            node, error = self.manager.merge_terminals(self.node, tolerance)
+
+            while not fits(node):
+                smaller_tolerance = tolerance
+                tolerance = 2 * tolerance
+                node, error = self.manager.merge_terminals(self.node, tolerance)
+
+            # the doubling may overshoot, so look for a smaller tolerance that still fits
+            for _ in range(APPROXIMATION_BISECTION_STEPS):
+                middle_tolerance = (smaller_tolerance + tolerance) / 2
+                middle_node, middle_error = self.manager.merge_terminals(self.node, middle_tolerance)
+
+                if fits(middle_node):
+                    tolerance, node, error = middle_tolerance, middle_node, middle_error
+                else:
+                    smaller_tolerance = middle_tolerance
+
+        return ADD(self.manager, node), error
+
+    def shift_variables(self, offset):
+        return ADD(self.manager, self.manager.shift_variables(self.node, offset))
+
+    def greater(self, other):
+        """Returns the 0/1 ADD that is 1 where this ADD is greater than the other one."""
+        return self._apply("greater", other)
+
+    def restrict(self, variable, value):
+        return ADD(self.manager, self.manager.restrict(self.node, variable, value))
+
+    def sum_out(self, variables):
+        """Eliminates one variable or an iterable of variables by summation."""
+        node = self.node
+
+        for variable in ([variables] if isinstance(variables, int) else variables):
+            node = self.manager.sum_out(node, variable)
+
+        return ADD(self.manager, node)
+
+    def max_out(self, variables):
+        """Eliminates one variable or an iterable of variables by maximization."""
+        node = self.node
+
+        for variable in ([variables] if isinstance(variables, int) else variables):
+            node = self.manager.max_out(node, variable)
+
+        return ADD(self.manager, node)
+
+    def evaluate(self, assignment):
+        return self.manager.evaluate(self.node, assignment)
+
+    def is_terminal(self):
+        return self.manager.is_terminal(self.node)
+
+    @property
+    def value(self):
+        return self.manager.value(self.node)
+
+    @property
+    def variable_index(self):
+        return self.manager.variables[self.node]
+
+    @property
+    def high(self):
+        return ADD(self.manager, self.manager.highs[self.node])
+
+    @property
+    def low(self):
+        return ADD(self.manager, self.manager.lows[self.node])
+
+    def support(self):
+        return self.manager.support(self.node)
+
+    def size(self):
+        """Number of nodes of this ADD, including the terminal nodes."""
+        return len(self.manager.reachable_nodes(self.node))
+
+    def terminal_values(self):
+        return sorted({ self.manager.values[node] for node in self.manager.reachable_nodes(self.node)
+                        if self.manager.is_terminal(node) })
+
+    def __eq__(self, other):
+        # nodes are unique, so equal functions have the same node
+        return isinstance(other, ADD) and self.manager is other.manager and self.node == other.node
+
+    def __hash__(self):
+        return hash((id(self.manager), self.node))
+
+    def __repr__(self):
+        if self.is_terminal():
+            return f"ADD(value={self.value})"
+
+        return f"ADD(variable={self.variable_index}, size={self.size()})"
@@ -0,0 +1,221 @@
+"""Module with classes to support a structure that represents
+   a Bounded-parameter Markov Decision Process in Probabilistic Planning."""
+
+from .enumerative_mdp import build_action_list, build_reward_function, build_state_list
+from .enumerative_transition_function import build_interval_transition_arrays, find_state_index
+from .enumerative_value_function import EnumerativeValueFunction
+from ...helpers import validate_defined_argument
+
+import numpy as np
+
+def build_interval_transition_function(transition_function, indexed_states):
+    """Build and validate a transition function with probability bounds given as dicts."""
+
+    validate_defined_argument(transition_function, "transition function")
+
+    # the ids are the indexes of the sorted states
+    state_names = list(indexed_states)
+
+    transition_arrays = {}
+    for action, transitions in transition_function.items():
+        from_state_ids = [ find_state_index(indexed_states, from_state) for from_state, _ in transitions.keys() ]
+        to_state_ids = [ find_state_index(indexed_states, to_state) for _, to_state in transitions.keys() ]
+        lower_probabilities = [ lower_probability for lower_probability, _ in transitions.values() ]
+        upper_probabilities = [ upper_probability for _, upper_probability in transitions.values() ]
+
+        transition_arrays[action] = (state_names, from_state_ids, to_state_ids, lower_probabilities, upper_probabilities)
+
+    return build_interval_transition_function_from_arrays(transition_arrays, indexed_states)
+
+def build_interval_transition_function_from_arrays(transition_arrays, indexed_states):
+    """Build and validate a transition function with probability bounds given as coordinate arrays per action.
+
+    Returns:
+        indexed_actions (dict): maps each action to its index
+        stacked_arrays (tuple): CSR arrays (indptr, indices, lower probabilities, upper probabilities) of the
+                                (|A|.|S|)x|S| stacked matrices, where the row of (state, action) is
+                                action_index * |S| + state_index
+    """
+
+    validate_defined_argument(transition_arrays, "transition function")
+
+    if len(transition_arrays) == 0:
+        raise ValueError("The transition function must have at least one action transition matrix")
+
+    indexed_actions = {}
+    row_lengths = []
+    to_state_indexes = []
+    lower_probabilities = []
+    upper_probabilities = []
+
+    for index, action in enumerate(sorted(transition_arrays)):
+        state_names, from_state_ids, to_state_ids, action_lower_probabilities, action_upper_probabilities = transition_arrays[action]
+
+        # ids index the state names read with this action, map them to the indexes of the sorted states
+        state_indexes = np.array([ find_state_index(indexed_states, state) for state in state_names ], dtype=np.int64)
+
+        action_arrays = build_interval_transition_arrays(
+            indexed_states,
+            state_indexes[np.asarray(from_state_ids, dtype=np.int64)],
+            state_indexes[np.asarray(to_state_ids, dtype=np.int64)],
+            action_lower_probabilities,
+            action_upper_probabilities,
+            action
+        )
+
+        indexed_actions[action] = index
+        row_lengths.append(action_arrays[0])
+        to_state_indexes.append(action_arrays[1])
+        lower_probabilities.append(action_arrays[2])
+        upper_probabilities.append(action_arrays[3])
+
+    indptr = np.concatenate(([0], np.cumsum(np.concatenate(row_lengths))))
+
+    stacked_arrays = (
+        indptr,
+        np.concatenate(to_state_indexes),
+        np.concatenate(lower_probabilities),
+        np.concatenate(upper_probabilities)
+    )
+
+    return indexed_actions, stacked_arrays
+
+class EnumerativeBMDP:
+    """Represents an enumerative Bounded-parameter Markov Decision Process, where each transition probability is
+       only known to lie within a lower and an upper bound.
+
+    Attributes:
+        states (set): states that are modelled in this BMDP
+        reward_function (dict): maps a state to its numeric reward
+        actions (set): actions that are modelled in this BMDP
+        initial_states (set): (optional) initial states modelled in this BMDP
+        goal_states (set): (optional) goal states modelled in this BMDP
+    """
+
+    def __init__(self, states, reward_function, transition_function,
+                 initial_states=None, goal_states=None):
+        """Initializes a new representation of an enumerative Bounded-parameter Markov Decision Process.
+
+        Parameters:
+            states (list): named states for this BMDP
+            reward_function (dict): maps named states to the respective numeric reward
+            transition_function (dict): maps an action string to another dict that maps a tuple of origin and destination states to a tuple of lower and upper transition probabilities
+            initial_states (list): named states considered initial states for this BMDP
+            goal_states (list): named states considered goal states for this BMDP
+
+        Returns:
+            instance (EnumerativeBMDP): an enumerative Bounded-parameter Markov Decision Process
+        """
+        self._set_states_and_rewards(states, reward_function)
+
+        indexed_actions, stacked_arrays = build_interval_transition_function(transition_function, self._indexed_states)
+        self._set_transition_arrays(indexed_actions, stacked_arrays)
+
+        self._set_initial_and_goal_states(initial_states, goal_states)
+
+    @classmethod
+    def from_transition_arrays(cls, states, reward_function, transition_arrays,
+                               initial_states=None, goal_states=None):
+        """Creates an enumerative Bounded-parameter Markov Decision Process from transitions in coordinate format.
+
+        Parameters:
+            states (list): named states for this BMDP
+            reward_function (dict): maps named states to the respective numeric reward
+            transition_arrays (dict): maps an action string to a tuple (state_names, from_state_ids, to_state_ids,
+                                      lower_probabilities, upper_probabilities), where the ids are positions in
+                                      state_names
+            initial_states (list): named states considered initial states for this BMDP
+            goal_states (list): named states considered goal states for this BMDP
+
+        Returns:
+            instance (EnumerativeBMDP): an enumerative Bounded-parameter Markov Decision Process
+        """
+        bmdp = cls.__new__(cls)
+
+        bmdp._set_states_and_rewards(states, reward_function)
+
+        indexed_actions, stacked_arrays = build_interval_transition_function_from_arrays(transition_arrays, bmdp._indexed_states)
+        bmdp._set_transition_arrays(indexed_actions, stacked_arrays)
+
+        bmdp._set_initial_and_goal_states(initial_states, goal_states)
+
+        return bmdp
+
+    def _set_states_and_rewards(self, states, reward_function):
+        self.states = build_state_list(states, "states")
+
+        self._indexed_states = {}
+        for index, state in enumerate(self.states):
+            self._indexed_states[state] = index
+
+        self.reward_function = build_reward_function(reward_function, self.states)
+        self._reward_array = np.array(self.reward_function, dtype=np.float64)
+
+    def _set_transition_arrays(self, indexed_actions, stacked_arrays):
+        self.actions = build_action_list(indexed_actions.keys())
+        self._indexed_actions = indexed_actions
+
+        self._indptr, self._indices, self._lower_probabilities, self._upper_probabilities = stacked_arrays
+
+        # row of each transition, used to reduce the transitions of all (state, action) pairs at once
+        self._rows = np.repeat(np.arange(len(self._indptr) - 1), np.diff(self._indptr))
+
+    def _set_initial_and_goal_states(self, initial_states, goal_states):
+        if initial_states:
+            self.initial_states = build_state_list(initial_states, "initial states", self.states)
+        else:
+            self.initial_states = list()
+
+        if goal_states:
+            self.goal_states = build_state_list(goal_states, "goal states", self.states)
+        else:
+            self.goal_states = list()
+
+    def reward_array(self):
+        return self._reward_array
+
+    def stacked_transition_bounds(self):
+        """Returns the transitions of all (state, action) pairs as paired CSR arrays, where the row of
+           (state, action) is action_index * |S| + state_index.
+
+        Returns:
+            indptr (numpy.ndarray): position of the first transition of each row, plus the total at the end
+            indices (numpy.ndarray): destination state of each transition, sorted inside each row
+            lower_probabilities (numpy.ndarray): lower bound of each transition
+            upper_probabilities (numpy.ndarray): upper bound of each transition
+        """
+        return self._indptr, self._indices, self._lower_probabilities, self._upper_probabilities
+
+    def transition_rows(self):
+        return self._rows
+
+    def reward(self, state):
+        state_index = self._indexed_states[state]
+        return self.reward_function[state_index]
+
+    def transition_bounds(self, from_state, action, to_state):
+        from_state_index = find_state_index(self._indexed_states, from_state)
+        to_state_index = find_state_index(self._indexed_states, to_state)
+
+        if action not in self._indexed_actions:
+            raise ValueError(f"Action [{action}] not found")
+
+        row = self._indexed_actions[action] * len(self.states) + from_state_index
+        row_start = self._indptr[row]
+        row_end = self._indptr[row + 1]
+
+        position = row_start + np.searchsorted(self._indices[row_start:row_end], to_state_index)
+
+        if position == row_end or self._indices[position] != to_state_index:
+            return 0.0, 0.0
+
+        return self._lower_probabilities[position], self._upper_probabilities[position]
+
+    def create_value_function(self, values=None):
+        return EnumerativeValueFunction(self.states, values, self._indexed_states)
+
+    def state_index(self, state):
+        return self._indexed_states[state]
+
+    def action_index(self, action):
+        return self._indexed_actions[action]
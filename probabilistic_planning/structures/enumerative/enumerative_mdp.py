@@ -1,10 +1,12 @@
 """Module with classes to support a structure that represents
    a Markov Decision Process in Probabilistic Planning."""
 
-from .enumerative_transition_function import EnumerativeTransitionFunction
+from .enumerative_transition_function import EnumerativeTransitionFunction, build_transition_matrix_from_arrays, find_state_index
+from .enumerative_value_function import EnumerativeValueFunction
 from ...helpers import validate_defined_argument
 
 import numpy as np
+import scipy.sparse
 
 def build_state_list(state_indentifiers, state_list_name, base_state_list=None):
     """Build and validate a state set."""
@@ -18,6 +20,8 @@ def build_state_list(state_indentifiers, state_list_name, base_state_list=None):
         raise ValueError(f"There is a repeated state identifier in the {state_list_name}")
 
     if base_state_list is not None:
+        base_state_list = set(base_state_list)
+
         for state in state_indentifiers:
             if state not in base_state_list:
                 raise ValueError(f"Unrecognized state [{state}] in {state_list_name}")
@@ -32,8 +36,10 @@ def build_reward_function(reward_function, states):
     if len(reward_function) != len(states):
         raise ValueError("The reward function must be have a value for each state")
 
+    state_set = set(states)
+
     for state in reward_function.keys():
-        if state not in states:
+        if state not in state_set:
             raise ValueError(f"Invalid state [{state}] defined in reward function")
 
     indexed_reward_function = []
@@ -54,10 +60,51 @@ def build_transition_funtion(transition_function, states):
     transition_matrices = []
     for index, action in enumerate(transition_function_object.actions):
         indexed_actions[action] = index
-        transition_matrices.append(transition_function_object.get_transition_matrix(action))
+        transition_matrices.append(transition_function_object.get_sparse_transition_matrix(action))
 
     return transition_matrices, indexed_actions
 
+def build_transition_function_from_arrays(transition_arrays, indexed_states):
+    """Build and validate a transition function given as coordinate arrays per action."""
+
+    validate_defined_argument(transition_arrays, "transition function")
+
+    if len(transition_arrays) == 0:
+        raise ValueError("The transition function must have at least one action transition matrix")
+
+    indexed_actions = {}
+    transition_matrices = []
+    for index, action in enumerate(sorted(transition_arrays)):
+        state_names, from_state_ids, to_state_ids, probabilities = transition_arrays[action]
+
+        # ids index the state names read with this action, map them to the indexes of the sorted states
+        state_indexes = np.array([ find_state_index(indexed_states, state) for state in state_names ], dtype=np.int64)
+
+        indexed_actions[action] = index
+        transition_matrices.append(build_transition_matrix_from_arrays(
+            indexed_states,
+            state_indexes[np.asarray(from_state_ids, dtype=np.int64)],
+            state_indexes[np.asarray(to_state_ids, dtype=np.int64)],
+            probabilities,
+            action
+        ))
+
+    return transition_matrices, indexed_actions
+
+def build_cumulative_probabilities(transition_matrix):
+    """Build the cumulative probabilities of each row of a CSR transition matrix, aligned with its data array."""
+
+    row_starts = transition_matrix.indptr[:-1]
+    row_lengths = np.diff(transition_matrix.indptr)
+    cumulative_probabilities = transition_matrix.data.copy()
+
+    # rows are short (few successors), so accumulate one column position at a time for all rows together
+    for position in range(1, row_lengths.max(initial=0)):
+        positions = row_starts[row_lengths > position] + position
+        cumulative_probabilities[positions] += cumulative_probabilities[positions - 1]
+
+    return cumulative_probabilities
+
 def build_action_list(actions):
     """Build and validate an action set."""
 
@@ -71,8 +118,6 @@ class EnumerativeMDP:
         states (set): states that are modelled in this MDP
         reward_function (dict): maps a state to its numeric reward
         actions (set): actions that are modelled in this MDP
-        transition_function (`TransitionFunction`): an object that given an origin state, an action and a destination states returns the transition
-                                                    probability from origin state to destination state
         initial_states (set): (optional) initial states modelled in this MDP
         goal_states (set): (optional) goal states modelled in this MDP
     """
@@ -91,6 +136,42 @@ class EnumerativeMDP:
         Returns:
             instance (EnumerativeMDP): an enumerative Markov Decision Process
         """
+        self._set_states_and_rewards(states, reward_function)
+
+        transition_matrices, indexed_actions = build_transition_funtion(transition_function, self.states)
+        self._set_transition_matrices(transition_matrices, indexed_actions)
+
+        self._set_initial_and_goal_states(initial_states, goal_states)
+
+    @classmethod
+    def from_transition_arrays(cls, states, reward_function, transition_arrays,
+                               initial_states=None, goal_states=None):
+        """Creates an enumerative Markov Decision Process from transitions in coordinate format, as produced by a
+           streaming reader, without building a dict entry per transition.
+
+        Parameters:
+            states (list): named states for this MDP
+            reward_function (dict): maps named states to the respective numeric reward
+            transition_arrays (dict): maps an action string to a tuple (state_names, from_state_ids, to_state_ids,
+                                      probabilities), where the ids are positions in state_names
+            initial_states (list): named states considered initial states for this MDP
+            goal_states (list): named states considered goal states for this MDP
+
+        Returns:
+            instance (EnumerativeMDP): an enumerative Markov Decision Process
+        """
+        mdp = cls.__new__(cls)
+
+        mdp._set_states_and_rewards(states, reward_function)
+
+        transition_matrices, indexed_actions = build_transition_function_from_arrays(transition_arrays, mdp._indexed_states)
+        mdp._set_transition_matrices(transition_matrices, indexed_actions)
+
+        mdp._set_initial_and_goal_states(initial_states, goal_states)
+
+        return mdp
+
+    def _set_states_and_rewards(self, states, reward_function):
         self.states = build_state_list(states, "states")
 
         self._indexed_states = {}
@@ -99,12 +180,18 @@ class EnumerativeMDP:
 
         self.reward_function = build_reward_function(reward_function, self.states)
 
-        transition_matrices, indexed_actions = build_transition_funtion(transition_function, self.states)
-        self.transition_matrices = transition_matrices
-
+    def _set_transition_matrices(self, transition_matrices, indexed_actions):
         self.actions = build_action_list(indexed_actions.keys())
         self._indexed_actions = indexed_actions
 
+        # all actions stacked into a single (|A|.|S|)x|S| matrix, where the row of (state, action) is
+        # action_index * |S| + state_index. It is used to compute every Q(s, a) with one product and its rows
+        # are the successor lists of each (state, action)
+        stacked_transition_matrix = scipy.sparse.vstack(transition_matrices, format="csr")
+        stacked_transition_matrix.sort_indices()
+        self._set_indexed_arrays(np.array(self.reward_function, dtype=np.float64), stacked_transition_matrix)
+
+    def _set_initial_and_goal_states(self, initial_states, goal_states):
         if initial_states:
             self.initial_states = build_state_list(initial_states, "initial states", self.states)
         else:
@@ -115,62 +202,298 @@ class EnumerativeMDP:
         else:
             self.goal_states = list()
 
+    @classmethod
+    def from_indexed_arrays(cls, states, actions, rewards, stacked_transition_matrix,
+                            initial_state_indexes=None, goal_state_indexes=None):
+        """Creates an enumerative Markov Decision Process from arrays already indexed and validated, skipping
+           the construction from dicts (used, for instance, to load compiled problem files).
+
+        Parameters:
+            states (list): named states for this MDP, sorted
+            actions (list): action names for this MDP, sorted
+            rewards (numpy.ndarray): reward of each state, following the states order
+            stacked_transition_matrix (scipy.sparse.csr_matrix): (|A|.|S|)x|S| matrix with sorted indexes, where the
+                                                                 row action_index * |S| + state_index holds the
+                                                                 transition probabilities of (state, action)
+            initial_state_indexes (list): (optional) indexes of the initial states
+            goal_state_indexes (list): (optional) indexes of the goal states
+
+        Returns:
+            instance (EnumerativeMDP): an enumerative Markov Decision Process
+        """
+        mdp = cls.__new__(cls)
+
+        mdp.states = list(states)
+        mdp._indexed_states = dict(zip(mdp.states, range(len(mdp.states))))
+        mdp.reward_function = np.asarray(rewards, dtype=np.float64).tolist()
+
+        mdp.actions = list(actions)
+        mdp._indexed_actions = dict(zip(mdp.actions, range(len(mdp.actions))))
+
+        mdp._set_indexed_arrays(np.asarray(rewards, dtype=np.float64), stacked_transition_matrix)
+
+        if initial_state_indexes is None:
+            initial_state_indexes = []
+
+        if goal_state_indexes is None:
+            goal_state_indexes = []
+
+        mdp.initial_states = [ mdp.states[state_index] for state_index in initial_state_indexes ]
+        mdp.goal_states = [ mdp.states[state_index] for state_index in goal_state_indexes ]
+
+        return mdp
+
+    def _set_indexed_arrays(self, reward_array, stacked_transition_matrix):
+        self._reward_array = reward_array
+        self._stacked_transition_matrix = stacked_transition_matrix
+        self._cumulative_probabilities = build_cumulative_probabilities(stacked_transition_matrix)
+        self._predecessor_matrix = None # built on the first call to predecessors
+        self._state_major_arrays = None # built on the first call to compute_infinite_horizon_state_qualities
+
+    def reward_array(self):
+        return self._reward_array
+
+    def stacked_transition_matrix(self):
+        return self._stacked_transition_matrix
+
     def reward(self, state):
         state_index = self._indexed_states[state]
         return self.reward_function[state_index]
 
     def transition(self, from_state, action, to_state):
-        action_index = self._indexed_actions[action]
-        from_state_index = self._indexed_states[from_state]
+        next_state_indexes, probabilities, _ = self.successors(self._indexed_states[from_state], self._indexed_actions[action])
         to_state_index = self._indexed_states[to_state]
 
-        return self.transition_matrices[action_index][from_state_index, to_state_index]
+        # successors are sorted by state index, so the destination state is found by binary search
+        position = np.searchsorted(next_state_indexes, to_state_index)
+
+        if position < len(next_state_indexes) and next_state_indexes[position] == to_state_index:
+            return probabilities[position]
+
+        return 0.0
 
     def reward_matrix(self):
         return np.matrix(list(map(lambda state: [ self.reward(state) ], self.states)))
 
     def transition_matrix(self, action):
-        return self.transition_function.get_transition_matrix(action)
+        action_index = self._indexed_actions[action]
+        number_of_states = len(self.states)
 
-    def compute_infinite_horizon_quality(self, state, action, gamma, value_function):
-        value_function_matrix = value_function.to_matrix()
+        return self._stacked_transition_matrix[action_index * number_of_states:(action_index + 1) * number_of_states]
 
-        action_index = self._indexed_actions[action]
-        state_index = self._indexed_states[state]
+    def create_value_function(self, values=None):
+        """Creates a value function that shares the state index of this MDP.
 
-        transition_matrix = self.transition_matrices[action_index]
-        pondered_sum = transition_matrix[state_index].dot(value_function_matrix)
+        Parameters:
+            values (callable, EnumerativeValueFunction or numpy.ndarray): (optional) initial values, 0 (zero) if ommited
 
-        return self.reward_function[state_index] + gamma * pondered_sum
+        Returns:
+            value_function (EnumerativeValueFunction): value function indexed as the states of this MDP
+        """
+        return EnumerativeValueFunction(self.states, values, self._indexed_states)
 
-    def reachable_states(self, state, action):
-        states = []
+    def state_index(self, state):
+        return self._indexed_states[state]
 
-        action_index = self._indexed_actions[action]
+    def action_index(self, action):
+        return self._indexed_actions[action]
+
+    def successors(self, state_index, action_index):
+        """Returns the successor list of a (state, action) pair, built once when the MDP is loaded.
+
+        Parameters:
+            state_index (int): index of the origin state
+            action_index (int): index of the action
+
+        Returns:
+            next_state_indexes (numpy.ndarray): indexes of the states reachable with nonzero probability, sorted
+            probabilities (numpy.ndarray): transition probability to each of these states
+            cumulative_probabilities (numpy.ndarray): running sum of these probabilities
+        """
+        row = action_index * len(self.states) + state_index
+        row_start = self._stacked_transition_matrix.indptr[row]
+        row_end = self._stacked_transition_matrix.indptr[row + 1]
+
+        return (
+            self._stacked_transition_matrix.indices[row_start:row_end],
+            self._stacked_transition_matrix.data[row_start:row_end],
+            self._cumulative_probabilities[row_start:row_end]
+        )
+
+    def predecessors(self, state_index):
+        """Returns the states that reach a state with nonzero probability under some action.
+
+        Parameters:
+            state_index (int): index of the destination state
+
+        Returns:
+            predecessor_state_indexes (numpy.ndarray): sorted indexes of the predecessor states
+            maximum_probabilities (numpy.ndarray): for each predecessor s, the maximum of P(state | s, a) over the actions
+        """
+        if self._predecessor_matrix is None:
+            number_of_states = len(self.states)
+
+            # transposed matrices of all actions together, so row s' lists every s with P(s' | s, a) > 0
+            predecessor_matrix = scipy.sparse.csr_matrix((number_of_states, number_of_states))
+            for action_index in range(len(self.actions)):
+                action_transition_matrix = self._stacked_transition_matrix[action_index * number_of_states:(action_index + 1) * number_of_states]
+                predecessor_matrix = predecessor_matrix.maximum(action_transition_matrix.T)
+
+            predecessor_matrix = predecessor_matrix.tocsr()
+            predecessor_matrix.sort_indices()
+
+            self._predecessor_matrix = predecessor_matrix
+
+        row_start = self._predecessor_matrix.indptr[state_index]
+        row_end = self._predecessor_matrix.indptr[state_index + 1]
+
+        return (
+            self._predecessor_matrix.indices[row_start:row_end],
+            self._predecessor_matrix.data[row_start:row_end]
+        )
+
+    def compute_infinite_horizon_quality_by_index(self, state_index, action_index, gamma, values):
+        next_state_indexes, probabilities, _ = self.successors(state_index, action_index)
+        pondered_sum = probabilities.dot(values[next_state_indexes])
+
+        return self._reward_array[state_index] + gamma * pondered_sum
+
+    def compute_infinite_horizon_quality(self, state, action, gamma, value_function):
         state_index = self._indexed_states[state]
-        transition_matrix = self.transition_matrices[action_index]
+        action_index = self._indexed_actions[action]
 
-        first_indexes, second_indexes = np.nonzero(transition_matrix[state_index,:] > 0)
+        return self.compute_infinite_horizon_quality_by_index(state_index, action_index, gamma, value_function.values)
 
-        for next_state_index in second_indexes:
-            states.append(self.states[next_state_index])
+    def compute_infinite_horizon_qualities(self, gamma, values):
+        """Computes Q(s, a) = R(s) + gamma * sum_s' P(s' | s, a) * V(s') for every state and action at once.
 
-        return states
+        Parameters:
+            gamma (float): discount factor
+            values (numpy.ndarray): 1-D array with V(s) for each state, following the states order
 
-    def sample_state(self, state, action):
+        Returns:
+            qualities (numpy.ndarray): |A|x|S| array where row i holds the qualities of the i-th action
+        """
+        pondered_sums = self._stacked_transition_matrix.dot(values)
+        pondered_sums = pondered_sums.reshape(len(self.actions), len(self.states))
+
+        return self._reward_array + gamma * pondered_sums
+
+    def _build_state_major_arrays(self):
+        number_of_states = len(self.states)
+        number_of_actions = len(self.actions)
+
+        # rows of the stacked transition matrix reordered so the rows of all actions of a state are contiguous
+        rows = (np.arange(number_of_states)[:, np.newaxis] + np.arange(number_of_actions) * number_of_states).ravel()
+        state_major_matrix = self._stacked_transition_matrix[rows]
+
+        state_row_starts = state_major_matrix.indptr[::number_of_actions]
+        entry_action_indexes = np.repeat(
+            np.tile(np.arange(number_of_actions), number_of_states), np.diff(state_major_matrix.indptr)
+        )
+
+        return state_row_starts, state_major_matrix.indices, state_major_matrix.data, entry_action_indexes
+
+    def compute_infinite_horizon_state_qualities(self, state_index, gamma, values):
+        """Computes Q(s, a) for a single state and all actions, from the transitions of all actions of this state
+           stored together.
+
+        Parameters:
+            state_index (int): index of the state
+            gamma (float): discount factor
+            values (numpy.ndarray): 1-D array with V(s) for each state, following the states order
+
+        Returns:
+            qualities (numpy.ndarray): array with the quality of each action, following the actions order
+        """
+        if self._state_major_arrays is None:
+            self._state_major_arrays = self._build_state_major_arrays()
+
+        state_row_starts, next_state_indexes, probabilities, entry_action_indexes = self._state_major_arrays
+        entries = slice(state_row_starts[state_index], state_row_starts[state_index + 1])
+
+        pondered_sums = np.bincount(
+            entry_action_indexes[entries],
+            weights=probabilities[entries] * values[next_state_indexes[entries]],
+            minlength=len(self.actions)
+        )
+
+        return self._reward_array[state_index] + gamma * pondered_sums
+
+    def compute_infinite_horizon_qualities_for_states(self, state_indexes, gamma, values):
+        """Computes Q(s, a) for a batch of states and all actions at once.
+
+        Parameters:
+            state_indexes (numpy.ndarray): indexes of the states
+            gamma (float): discount factor
+            values (numpy.ndarray): 1-D array with V(s) for each state, following the states order
+
+        Returns:
+            qualities (numpy.ndarray): |A|xk array where column j holds the qualities of the j-th given state
+        """
+        if self._state_major_arrays is None:
+            self._state_major_arrays = self._build_state_major_arrays()
+
+        state_row_starts, next_state_indexes, probabilities, entry_action_indexes = self._state_major_arrays
+        number_of_actions = len(self.actions)
+
+        state_indexes = np.asarray(state_indexes, dtype=np.int64)
+        starts = state_row_starts[state_indexes]
+        lengths = state_row_starts[state_indexes + 1] - starts
+
+        # entries of all given states, and the (state position, action) bin of each one
+        entry_offsets = np.cumsum(lengths) - lengths
+        entries = np.repeat(starts - entry_offsets, lengths) + np.arange(lengths.sum())
+        bins = np.repeat(np.arange(len(state_indexes)), lengths) * number_of_actions + entry_action_indexes[entries]
+
+        pondered_sums = np.bincount(
+            bins, weights=probabilities[entries] * values[next_state_indexes[entries]],
+            minlength=len(state_indexes) * number_of_actions
+        )
+        pondered_sums = pondered_sums.reshape(len(state_indexes), number_of_actions).T
+
+        return self._reward_array[state_indexes] + gamma * pondered_sums
+
+    def reachable_states(self, state, action):
+        next_state_indexes, _, _ = self.successors(self._indexed_states[state], self._indexed_actions[action])
+
+        return [ self.states[next_state_index] for next_state_index in next_state_indexes ]
+
+    def sample_state_index(self, state_index, action_index):
+        next_state_indexes, _, cumulative_probabilities = self.successors(state_index, action_index)
         sampled_probability = np.random.random_sample()
-        cummulative_probability = 0.0
 
-        action_index = self._indexed_actions[action]
-        state_index = self._indexed_states[state]
-        transition_matrix = self.transition_matrices[action_index]
+        # binary search of the first successor whose cumulative probability is greater than the sampled one
+        position = np.searchsorted(cumulative_probabilities, sampled_probability, side="right")
+        position = min(position, len(next_state_indexes) - 1)
 
-        first_indexes, second_indexes = np.nonzero(transition_matrix[state_index,:] > 0)
+        return next_state_indexes[position]
 
-        for next_state_index in second_indexes:
-            probability = transition_matrix[state_index, next_state_index]
-            cummulative_probability = cummulative_probability + probability
-            if sampled_probability < cummulative_probability:
-                return self.states[next_state_index]
+    def sample_state_indexes(self, state_indexes, action_indexes):
+        """Samples one next state for each (state, action) pair at once.
 
-        return self.states[second_indexes[-1]]
+        Parameters:
+            state_indexes (numpy.ndarray): indexes of the origin states
+            action_indexes (numpy.ndarray): index of the action applied in each origin state
+
+        Returns:
+            next_state_indexes (numpy.ndarray): index of the sampled next state of each pair
+        """
+        rows = np.asarray(action_indexes) * len(self.states) + np.asarray(state_indexes)
+        row_starts = self._stacked_transition_matrix.indptr[rows]
+        row_lengths = self._stacked_transition_matrix.indptr[rows + 1] - row_starts
+        sampled_probabilities = np.random.random_sample(len(rows))
+
+        # position of the first successor whose cumulative probability is greater than the sampled one, counting
+        # the cumulative probabilities below it one column position at a time for all pairs together
+        positions = np.zeros(len(rows), dtype=np.int64)
+        for position in range(row_lengths.max(initial=1) - 1):
+            in_row = position < row_lengths - 1
+            below = self._cumulative_probabilities[row_starts[in_row] + position] <= sampled_probabilities[in_row]
+            positions[in_row] += below
+
+        return self._stacked_transition_matrix.indices[row_starts + positions]
+
+    def sample_state(self, state, action):
+        next_state_index = self.sample_state_index(self._indexed_states[state], self._indexed_actions[action])
+        return self.states[next_state_index]
@@ -1,49 +1,147 @@
 import numpy as np
+import scipy.sparse
+
+# rounding allowed on the sums of probability bounds, as the bounds are usually written with a few decimals
+INTERVAL_TOLERANCE = 1e-9
 
 def find_state_index(state_list, state):
     try:
         index = state_list[state]
         return index
-    except ValueError:
+    except KeyError:
         raise ValueError(f"State [{state}] not found in state set")
 
 def build_transition_matrix(state_list, transition_function, action):
     transition_matrix_as_dict = transition_function[action]
+    state_transitions = transition_matrix_as_dict.keys()
 
-    number_of_states = len(state_list)
-    transition_matrix = np.zeros((number_of_states, number_of_states))
+    number_of_transitions = len(state_transitions)
+    from_state_indexes = np.zeros(number_of_transitions, dtype=np.int64)
+    to_state_indexes = np.zeros(number_of_transitions, dtype=np.int64)
+    transition_probabilities = np.zeros(number_of_transitions)
 
-    state_transitions = transition_matrix_as_dict.keys()
+    for transition_index, state_tuple in enumerate(state_transitions):
+        from_state, to_state = state_tuple
+
+        from_state_indexes[transition_index] = find_state_index(state_list, from_state)
+        to_state_indexes[transition_index] = find_state_index(state_list, to_state)
+        transition_probabilities[transition_index] = transition_matrix_as_dict[state_tuple]
+
+    return build_transition_matrix_from_arrays(state_list, from_state_indexes, to_state_indexes, transition_probabilities, action)
+
+def build_transition_matrix_from_arrays(state_list, from_state_indexes, to_state_indexes, transition_probabilities, action):
+    """Build and validate the sparse transition matrix of an action from its transitions in coordinate format.
+       When a transition is repeated, the last probability read is kept."""
 
-    if len(state_transitions) == 0:
+    number_of_states = len(state_list)
+    number_of_transitions = len(transition_probabilities)
+
+    if number_of_transitions == 0:
         raise ValueError(f"The action [{action}] should have at least one transition defined")
 
-    for state_tuple in state_transitions:
-        from_state, to_state = state_tuple
-        transition_probability = transition_matrix_as_dict[state_tuple]
+    from_state_indexes = np.asarray(from_state_indexes, dtype=np.int64)
+    to_state_indexes = np.asarray(to_state_indexes, dtype=np.int64)
+    transition_probabilities = np.asarray(transition_probabilities, dtype=np.float64)
 
-        from_state_index = find_state_index(state_list, from_state)
-        to_state_index = find_state_index(state_list, to_state)
+    # stable sort by (from, to), keeping only the last occurrence of each transition
+    transition_keys = from_state_indexes * number_of_states + to_state_indexes
+    order = np.argsort(transition_keys, kind="stable")
+    sorted_keys = transition_keys[order]
+    last_occurrences = order[np.append(sorted_keys[1:] != sorted_keys[:-1], True)]
 
-        transition_matrix[from_state_index][to_state_index] = transition_probability
+    # only the nonzero transitions are stored, so memory grows with the number of transitions instead of |S|^2
+    transition_matrix = scipy.sparse.csr_matrix(
+        (transition_probabilities[last_occurrences], (from_state_indexes[last_occurrences], to_state_indexes[last_occurrences])),
+        shape=(number_of_states, number_of_states)
+    )
+    transition_matrix.eliminate_zeros()
+    transition_matrix.sort_indices()
 
     validate_state_transition_probability_distribution(transition_matrix, state_list, action)
 
     return transition_matrix
 
 def validate_state_transition_probability_distribution(transition_matrix, state_list, action):
-    for from_state in state_list:
-        from_state_index = find_state_index(state_list, from_state)
-        probability_sum = sum(transition_matrix[from_state_index])
+    probability_sums = np.asarray(transition_matrix.sum(axis=1)).ravel()
+    invalid_state_indexes = np.flatnonzero(probability_sums != 1.0)
+
+    if len(invalid_state_indexes) == 0:
+        return
+
+    # state_list maps each state to its index, in index order
+    from_state = next(state for state, index in state_list.items() if index == invalid_state_indexes[0])
+
+    raise ValueError(
+        (f"Invalid probability distribution on [{from_state}] transition"
+         f" in action [{action}]. The sum of all transitions probabilities"
+         " from this state to others must be 1 (one)")
+    )
+
+def build_interval_transition_arrays(state_list, from_state_indexes, to_state_indexes, lower_probabilities,
+                                    upper_probabilities, action):
+    """Build and validate the transitions of an action with probability bounds, in CSR layout. The lower and upper
+       bounds share the same sparsity pattern (every transition with a nonzero upper bound), so a lower bound of
+       zero is kept. When a transition is repeated, the last bounds read are kept.
+
+    Returns:
+        row_lengths (numpy.ndarray): number of transitions from each state
+        to_state_indexes (numpy.ndarray): destination of each transition, sorted by origin and destination
+        lower_probabilities (numpy.ndarray): lower bound of each transition
+        upper_probabilities (numpy.ndarray): upper bound of each transition
+    """
+
+    number_of_states = len(state_list)
+
+    if len(upper_probabilities) == 0:
+        raise ValueError(f"The action [{action}] should have at least one transition defined")
 
-        if probability_sum == 1.0:
-            continue
+    from_state_indexes = np.asarray(from_state_indexes, dtype=np.int64)
+    to_state_indexes = np.asarray(to_state_indexes, dtype=np.int64)
+    lower_probabilities = np.asarray(lower_probabilities, dtype=np.float64)
+    upper_probabilities = np.asarray(upper_probabilities, dtype=np.float64)
 
-        raise ValueError(
-            (f"Invalid probability distribution on [{from_state}] transition"
-             f" in action [{action}]. The sum of all transitions probabilities"
-             " from this state to others must be 1 (one)")
-        )
+    # stable sort by (from, to), keeping only the last occurrence of each transition
+    transition_keys = from_state_indexes * number_of_states + to_state_indexes
+    order = np.argsort(transition_keys, kind="stable")
+    sorted_keys = transition_keys[order]
+    last_occurrences = order[np.append(sorted_keys[1:] != sorted_keys[:-1], True)]
+    last_occurrences = last_occurrences[upper_probabilities[last_occurrences] != 0.0]
+
+    from_state_indexes = from_state_indexes[last_occurrences]
+    to_state_indexes = to_state_indexes[last_occurrences]
+    lower_probabilities = lower_probabilities[last_occurrences]
+    upper_probabilities = upper_probabilities[last_occurrences]
+
+    row_lengths = np.bincount(from_state_indexes, minlength=number_of_states)
+
+    validate_interval_probability_distribution(
+        from_state_indexes, lower_probabilities, upper_probabilities, number_of_states, state_list, action
+    )
+
+    return row_lengths, to_state_indexes, lower_probabilities, upper_probabilities
+
+def validate_interval_probability_distribution(from_state_indexes, lower_probabilities, upper_probabilities,
+                                               number_of_states, state_list, action):
+    invalid_bounds = (lower_probabilities < 0.0) | (lower_probabilities > upper_probabilities) | (upper_probabilities > 1.0)
+
+    # some distribution within the bounds should exist: sum of lower bounds <= 1 <= sum of upper bounds
+    lower_sums = np.bincount(from_state_indexes, weights=lower_probabilities, minlength=number_of_states)
+    upper_sums = np.bincount(from_state_indexes, weights=upper_probabilities, minlength=number_of_states)
+    invalid_sums = (lower_sums > 1.0 + INTERVAL_TOLERANCE) | (upper_sums < 1.0 - INTERVAL_TOLERANCE)
+
+    invalid_state_indexes = np.union1d(from_state_indexes[invalid_bounds], np.flatnonzero(invalid_sums))
+
+    if len(invalid_state_indexes) == 0:
+        return
+
+    # state_list maps each state to its index, in index order
+    from_state = next(state for state, index in state_list.items() if index == invalid_state_indexes[0])
+
+    raise ValueError(
+        (f"Invalid probability bounds on [{from_state}] transition"
+         f" in action [{action}]. Each bound must satisfy 0 <= lower <= upper <= 1"
+         " and the sums of the lower and upper bounds from this state must enclose 1 (one)")
+    )
 
 def build_transition_matrix_per_action(transition_function, actions, states):
     """Build and validate a transition function."""
@@ -95,11 +193,14 @@ class EnumerativeTransitionFunction:
         from_state_index = find_state_index(self.states, from_state)
         to_state_index = find_state_index(self.states, to_state)
 
-        return transition_matrix[from_state_index][to_state_index]
+        return transition_matrix[from_state_index, to_state_index]
 
-    def get_transition_matrix(self, action):
+    def get_sparse_transition_matrix(self, action):
         if action not in self.actions:
             raise ValueError(f"Action [{action}] not found")
 
-        transition_matrix = self.transition_matrix_per_action[action]
-        return np.matrix(transition_matrix)
+        return self.transition_matrix_per_action[action]
+
+    def get_transition_matrix(self, action):
+        # dense copy, meant for inspection of small problems only
+        return np.matrix(self.get_sparse_transition_matrix(action).toarray())
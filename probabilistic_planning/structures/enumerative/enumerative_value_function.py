@@ -1,48 +1,87 @@
 import numpy as np
 
+def build_indexed_states(states):
+    indexed_states = {}
+
+    for index, state in enumerate(states):
+        indexed_states[state] = index
+
+    return indexed_states
+
 class EnumerativeValueFunction:
-    def __init__(self, states, values = None):
-        heuristic_function = None
-        internal_values_setted = False
+    """Represents a value function over enumerated states, backed by a 1-D float64 array.
+
+    Attributes:
+        values (numpy.ndarray): raw buffer with one value per state, indexed by the state position. It can be
+                                read and updated in place by algorithms that work with integer state ids.
+    """
+
+    def __init__(self, states, values = None, indexed_states = None):
+        """Initializes a new value function.
+
+        Parameters:
+            states (list): named states of this value function
+            values (callable, EnumerativeValueFunction or numpy.ndarray): (optional) a function that maps a state to its
+                                                                          initial value, another value function to copy
+                                                                          or an array with one value per state. If
+                                                                          ommited, all states start with 0 (zero).
+            indexed_states (dict): (optional) maps each state to its position. When informed (e.g. the index of an
+                                   EnumerativeMDP), it is shared instead of being rebuilt.
+
+        Returns:
+            instance (EnumerativeValueFunction): a value function
+        """
+        if type(values) == EnumerativeValueFunction:
+            self._states = values._states
+            self._indexed_states = values._indexed_states
+            self.values = values.values.copy()
+            return
+
+        if indexed_states is None:
+            indexed_states = build_indexed_states(states)
+
+        self._states = states
+        self._indexed_states = indexed_states
 
         if values is None:
-            heuristic_function = lambda state : 0
+            self.values = np.zeros(len(states))
         elif callable(values):
-            heuristic_function = values
-        elif type(values) == EnumerativeValueFunction:
-            self._indexed_states = values._indexed_states
-            self._internal_matrix = values._internal_matrix.copy()
-            internal_values_setted = True
+            self.values = np.zeros(len(states))
+            for state, index in indexed_states.items():
+                self.values[index] = values(state)
+        elif isinstance(values, np.ndarray):
+            if values.shape != (len(states),):
+                raise ValueError("values array should have one value per state")
+            self.values = values.astype(np.float64, copy=False)
         else:
-            raise ValueError("values should be a function or a EnumerativeValueFunction")
-
-        if not internal_values_setted:
-            self._internal_matrix = np.zeros(( len(states), 1 ))
-            self._indexed_states = {}
-            for index, state in enumerate(states):
-                self._indexed_states[state] = index
-                self._internal_matrix[index] = heuristic_function(state)
+            raise ValueError("values should be a function, an array or a EnumerativeValueFunction")
 
     def __getitem__(self, state):
-        state_index = self._indexed_states[state]
-        return self._internal_matrix[state_index, 0]
+        return self.values[self._indexed_states[state]]
 
     def __setitem__(self, state, value):
-        state_index = self._indexed_states[state]
-        self._internal_matrix[state_index, 0] = value
+        self.values[self._indexed_states[state]] = value
 
     def __repr__(self):
         dict_representation = {}
 
-        for state in self._indexed_states.keys():
-            state_index = self._indexed_states[state]
-            dict_representation[state] = self._internal_matrix[state_index]
+        for state, state_index in self._indexed_states.items():
+            dict_representation[state] = self.values[state_index]
 
         return repr(dict_representation)
 
     def copy(self):
-        states = list(self._indexed_states.keys())
-        return EnumerativeValueFunction(states, self)
+        # only the buffer is copied, states and their index are shared
+        copied_value_function = EnumerativeValueFunction.__new__(EnumerativeValueFunction)
+        copied_value_function._states = self._states
+        copied_value_function._indexed_states = self._indexed_states
+        copied_value_function.values = self.values.copy()
+
+        return copied_value_function
+
+    def state_index(self, state):
+        return self._indexed_states[state]
 
     def to_matrix(self):
-        return self._internal_matrix
+        # (|S|, 1) view over the same buffer
+        return self.values.reshape(-1, 1)
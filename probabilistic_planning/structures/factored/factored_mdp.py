@@ -1,10 +1,12 @@
 """Module with classes to support a structure that represents
    a factored Markov Decision Process in Probabilistic Planning."""
 
+from .factored_transition_function import FactoredTransitionFunction, current_variable
+from ..decision_diagram import ADD
 from ...helpers import validate_defined_argument
 
-def build_state_variables_set(state_variable_indentifiers, state_variables_set_name, base_state_variables_set=None):
-    """Build and validate a state set."""
+def build_state_variables_list(state_variable_indentifiers, state_variables_set_name, base_state_variables_set=None):
+    """Build and validate a state variable list, keeping the order of the ADD variables."""
 
     validate_defined_argument(state_variable_indentifiers, state_variables_set_name)
 
@@ -20,53 +22,103 @@ def build_state_variables_set(state_variable_indentifiers, state_variables_set_n
             if state_variable not in base_state_variables_set:
                 raise ValueError(f"Unrecognized state variable [{state_variable}] in {state_variables_set_name}")
 
-    return state_variables_as_set
+    return list(state_variable_indentifiers)
+
+def build_reward_function(reward_function, state_variables):
+    """Validate a reward ADD over the current state variables."""
+
+    validate_defined_argument(reward_function, "reward function")
+
+    if not isinstance(reward_function, ADD):
+        raise ValueError("The reward function must be an ADD")
+
+    if any(variable % 2 != 0 or variable >= current_variable(len(state_variables)) for variable in reward_function.support()):
+        raise ValueError("The reward function must only depend on the current state variables")
+
+    return reward_function
+
+def build_factored_state_list(factored_states, factored_states_name, state_variables):
+    """Build and validate a list of factored states, each one a set of the state variables that are true."""
+
+    factored_state_list = []
+
+    for factored_state in factored_states:
+        for state_variable in factored_state:
+            if state_variable not in state_variables:
+                raise ValueError(f"Unrecognized state variable [{state_variable}] in {factored_states_name}")
+
+        factored_state_list.append(frozenset(factored_state))
+
+    if len(set(factored_state_list)) != len(factored_state_list):
+        raise ValueError(f"There is a repeated state in the {factored_states_name}")
+
+    return factored_state_list
 
 class FactoredMDP:
     """Represents a factored Markov Decision Process.
 
+    A factored state is the set of its state variables that are true. In the ADDs, the i-th state variable is the
+    variable 2i and its value in the next state (primed variable) is the variable 2i + 1.
+
     Attributes:
-        state_variables (set): variables used to model a state in this MDP representation
-        reward_function (pyddlib.add.ADD): algebraic decision diagram representing reward given the states variables representation
-        actions (set): actions that are modelled in this MDP
-        transition_function (`FactoredTransitionFunction`): an object that given an origin state variable, an action and a destination state variable returns the transition
-                                                            probability from origin state variable to destination state variable
-        initial_states (set): (optional) initial factored states modelled in this MDP
-        goal_states (set): (optional) goal factored states modelled in this MDP
+        state_variables (list): variables used to model a state in this MDP representation, in the order of the ADD variables
+        reward_function (ADD): algebraic decision diagram representing reward given the states variables representation
+        actions (list): actions that are modelled in this MDP
+        transition_function (`FactoredTransitionFunction`): an object that holds, for each action and state variable,
+                                                            the ADD of the probability of the state variable being true
+                                                            in the next state
+        initial_states (list): (optional) initial factored states modelled in this MDP
+        goal_states (list): (optional) goal factored states modelled in this MDP
+        manager (ADDManager): manager that stores the nodes of the ADDs of this MDP
     """
 
     def __init__(self, state_variables, reward_function, transition_function,
                  initial_states=None, goal_states=None):
-        """Initializes a new representation of an enumerative Markov Decision Process.
+        """Initializes a new representation of a factored Markov Decision Process.
 
         Parameters:
             state_variables (list): named state variables for this MDP
             reward_function (ADD): ADD that maps a state variable configuration to the respective numeric reward
             transition_function (dict): maps an action string to another dict that maps a state variable to an ADD defining
-                                        transition probabilities with respect to other state variables
+                                        the probability of the state variable being true in the next state, given the
+                                        current state variables. Ommited state variables keep their values
             initial_states (list): list of initial factored states for this MDP
-            goal_states (list): list of initial factored states for this MDP
+            goal_states (list): list of goal factored states for this MDP
 
         Returns:
             instance (FactoredMDP): a factored Markov Decision Process
         """
-        self.state_variables = build_state_variables_set(state_variables, "state variables")
-        # self.reward_function = build_reward_function(reward_function, self.state_variables)
-        # self.transition_function = build_transition_funtion(transition_function, self.state_variables)
-        # self.actions = build_action_set(self.transition_function.actions)
+        self.state_variables = build_state_variables_list(state_variables, "state variables")
+        self.reward_function = build_reward_function(reward_function, self.state_variables)
+        self.manager = self.reward_function.manager
 
-        # if initial_states:
-        #     self.initial_states = build_state_set(initial_states, "initial states", self.state_variables)
-        # else:
-        #     self.initial_states = set()
+        validate_defined_argument(transition_function, "transition function")
+        self.transition_function = FactoredTransitionFunction(transition_function, transition_function.keys(),
+                                                              self.state_variables, self.manager)
+        self.actions = self.transition_function.actions
 
-        # if goal_states:
-        #     self.goal_states = build_state_set(goal_states, "goal states", self.state_variables)
-        # else:
-        #     self.goal_states = set()
+        if initial_states:
+            self.initial_states = build_factored_state_list(initial_states, "initial states", self.state_variables)
+        else:
+            self.initial_states = list()
+
+        if goal_states:
+            self.goal_states = build_factored_state_list(goal_states, "goal states", self.state_variables)
+        else:
+            self.goal_states = list()
+
+    def number_of_states(self):
+        return 2 ** len(self.state_variables)
+
+    def assignment(self, state):
+        """Returns the truth value of each state variable in a factored state, to evaluate the ADDs of this MDP."""
+        return self.transition_function.assignment(state)
 
     def reward(self, state):
-        return self.reward_function[state]
+        return self.reward_function.evaluate(self.assignment(state))
 
     def transition(self, from_state, action, to_state):
         return self.transition_function.get_transition_probability(from_state, action, to_state)
+
+    def create_value_function(self, value = 0.0):
+        return ADD.constant(value, self.manager)
@@ -1,53 +1,69 @@
-import numpy as np
-
+from ..decision_diagram import ADD
+from ..decision_diagram.algebraic_decision_diagram import default_manager
 from ...helpers import validate_defined_argument
 
-def find_state_index(state_list, state):
+def current_variable(state_variable_index):
+    """ADD variable of a state variable in the current state."""
+    return 2 * state_variable_index
+
+def next_variable(state_variable_index):
+    """ADD variable of a state variable in the next state (primed variable), right below its current variable."""
+    return 2 * state_variable_index + 1
+
+def find_state_variable_index(state_variables, state_variable):
     try:
-        index = state_list.index(state)
+        index = state_variables.index(state_variable)
         return index
     except ValueError:
-        raise ValueError(f"State [{state}] not found in state set")
+        raise ValueError(f"State variable [{state_variable}] not found in state variables")
 
-def build_transition_add(state_variables_list, transition_function, action):
-    transition_matrix_as_dict = transition_function[action]
+def validate_transition_add(transition_add, state_variable, action, number_of_state_variables):
+    if not isinstance(transition_add, ADD):
+        raise ValueError(f"The transition of state variable [{state_variable}] in action [{action}] must be an ADD")
 
-    number_of_state_variables = len(state_variables_list)
-    # transition_matrix = np.zeros((number_of_states, number_of_states))
+    for probability in transition_add.terminal_values():
+        if probability < 0.0 or probability > 1.0:
+            raise ValueError(
+                (f"Invalid probability distribution on [{state_variable}] transition"
+                 f" in action [{action}]. The probability of the state variable being true must be in [0, 1]")
+            )
 
-    # state_transitions = transition_matrix_as_dict.keys()
+    if any(variable % 2 != 0 or variable >= current_variable(number_of_state_variables) for variable in transition_add.support()):
+        raise ValueError(
+            (f"The transition of state variable [{state_variable}] in action [{action}]"
+             " must only depend on the current state variables")
+        )
 
-    # if len(state_transitions) == 0:
-    #     raise ValueError(f"The action [{action}] should have at least one transition defined")
+def build_transition_add(state_variables_list, transition_function, action, manager):
+    """Build the ADDs of P(x' = true | s) for all state variables of an action. A state variable whose transition is
+       ommited keeps its current value."""
+    transition_adds_as_dict = transition_function[action]
 
-    # for state_tuple in state_transitions:
-    #     from_state, to_state = state_tuple
-    #     transition_probability = transition_matrix_as_dict[state_tuple]
+    if len(transition_adds_as_dict) == 0:
+        raise ValueError(f"The action [{action}] should have at least one transition defined")
 
-    #     from_state_index = find_state_index(state_list, from_state)
-    #     to_state_index = find_state_index(state_list, to_state)
+    for state_variable in transition_adds_as_dict.keys():
+        if state_variable not in state_variables_list:
+            raise ValueError(f"Unrecognized state variable [{state_variable}] in action [{action}]")
 
-    #     transition_matrix[from_state_index][to_state_index] = transition_probability
+    transition_adds = []
 
-    # validate_state_transition_probability_distribution(transition_matrix, state_list, action)
+    for index, state_variable in enumerate(state_variables_list):
+        transition_add = transition_adds_as_dict.get(state_variable)
 
-    return transition_matrix
+        if transition_add is None:
+            transition_add = ADD.variable(current_variable(index), manager)
 
-def validate_state_transition_probability_distribution(transition_matrix, state_list, action):
-    for from_state in state_list:
-        from_state_index = find_state_index(state_list, from_state)
-        probability_sum = sum(transition_matrix[from_state_index])
+        validate_transition_add(transition_add, state_variable, action, len(state_variables_list))
 
-        if probability_sum == 1.0:
-            continue
+        if transition_add.manager is not manager:
+            raise ValueError(f"The transition of state variable [{state_variable}] in action [{action}] must belong to the MDP manager")
 
-        raise ValueError(
-            (f"Invalid probability distribution on [{from_state}] transition"
-             f" in action [{action}]. The sum of all transitions probabilities"
-             " from this state to others must be 1 (one)")
-        )
+        transition_adds.append(transition_add)
+
+    return transition_adds
 
-def build_transition_add_per_action(transition_function, actions, state_variables):
+def build_transition_add_per_action(transition_function, actions, state_variables, manager):
     """Build and validate a transition function."""
 
     validate_defined_argument(transition_function, "transition function")
@@ -66,35 +82,97 @@ def build_transition_add_per_action(transition_function, actions, state_variable
         if action not in actions:
             raise ValueError(f"The {action} action is not defined in action list")
 
-        transition_matrix = build_transition_add(state_variables, transition_function, action)
-        transition_add_per_action[action] = transition_matrix
+        transition_add_per_action[action] = build_transition_add(state_variables, transition_function, action, manager)
 
     return transition_add_per_action
 
+def build_state_variable_list(list_value, list_name):
+    validate_defined_argument(list_value, list_name)
+    return list(list_value)
+
 def build_sorted_list(list_value, list_name):
     validate_defined_argument(list_value, list_name)
     return list(sorted(list_value))
 
+def find_manager(transition_function):
+    for transition_adds in transition_function.values():
+        if not isinstance(transition_adds, dict):
+            continue
+
+        for transition_add in transition_adds.values():
+            if isinstance(transition_add, ADD):
+                return transition_add.manager
+
+    return default_manager
+
 class FactoredTransitionFunction:
-    def __init__(self, transition_function, actions, state_variables):
-        self.state_variables = build_sorted_list(state_variables, "state variables")
+    """Transition function of a factored MDP, where each state variable changes independently given the current state.
+
+    For each action, the i-th state variable has an ADD over the current state variables with P(x_i' = true | s),
+    and the i-th state variable is the ADD variable 2i in the current state and 2i + 1 in the next state. Keeping each
+    primed variable next to its current variable keeps small the ADDs that mix both, as in the regression of a value
+    function.
+    """
+
+    def __init__(self, transition_function, actions, state_variables, manager = None):
+        """Initializes a new factored transition function.
+
+        Parameters:
+            transition_function (dict): maps an action string to another dict that maps a state variable to the ADD of
+                                        the probability of it being true in the next state
+            actions (list): actions of this transition function
+            state_variables (list): state variables, in the order of the ADD variables
+            manager (ADDManager): manager of the ADDs. If ommited, the manager of the transition ADDs is used
+
+        Returns:
+            instance (FactoredTransitionFunction): a factored transition function
+        """
+        self.state_variables = build_state_variable_list(state_variables, "state variables")
         self.actions = build_sorted_list(actions, "actions")
-        self.transition_add_per_action = build_transition_add_per_action(transition_function, self.actions, self.state_variables)
 
-    def get_transition_probability(self, from_state, action, to_state):
-        if action not in self.actions:
+        validate_defined_argument(transition_function, "transition function")
+        self.manager = manager if manager is not None else find_manager(transition_function)
+
+        self.transition_add_per_action = build_transition_add_per_action(transition_function, self.actions, self.state_variables, self.manager)
+        self._transition_adds = {}
+
+    def get_transition_add(self, action, state_variable):
+        if action not in self.transition_add_per_action:
             raise ValueError(f"Action [{action}] not found")
 
-        transition_matrix = self.transition_matrix_per_action[action]
+        state_variable_index = find_state_variable_index(self.state_variables, state_variable)
+        return self.transition_add_per_action[action][state_variable_index]
 
-        from_state_index = find_state_index(self.states, from_state)
-        to_state_index = find_state_index(self.states, to_state)
+    def get_transition_adds(self, action, state_variable_index):
+        """Returns the ADDs of P(x_i' = true | s) and P(x_i' = false | s), built once per action and state variable."""
+        key = (action, state_variable_index)
+        transition_adds = self._transition_adds.get(key)
 
-        return transition_matrix[from_state_index][to_state_index]
+        if transition_adds is None:
+            transition_add = self.transition_add_per_action[action][state_variable_index]
+            transition_adds = (transition_add, 1.0 - transition_add)
+            self._transition_adds[key] = transition_adds
 
-    def get_transition_matrix(self, action):
-        if action not in self.actions:
+        return transition_adds
+
+    def get_transition_probability(self, from_state, action, to_state):
+        """Returns P(to_state | from_state, action), where a factored state is the collection of its true state variables."""
+        if action not in self.transition_add_per_action:
             raise ValueError(f"Action [{action}] not found")
 
-        transition_matrix = self.transition_matrix_per_action[action]
-        return np.matrix(transition_matrix)
+        assignment = self.assignment(from_state)
+        next_assignment = self.assignment(to_state)
+
+        probability = 1.0
+        for index, transition_add in enumerate(self.transition_add_per_action[action]):
+            next_value = next_assignment[current_variable(index)]
+            true_probability = transition_add.evaluate(assignment)
+            probability = probability * (true_probability if next_value else 1.0 - true_probability)
+
+        return probability
+
+    def assignment(self, state):
+        for state_variable in state:
+            find_state_variable_index(self.state_variables, state_variable)
+
+        return { current_variable(index): state_variable in state for index, state_variable in enumerate(self.state_variables) }
@@ -0,0 +1,51 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.rtdp import enumerative_brtdp
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+PROBLEM_FILE = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative", "river_traversal_01.net")
+
+GAMMA = 0.9
+EPSILON = 1e-3
+
+class EnumerativeBRTDPTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mdp = reader.read_problem_file(PROBLEM_FILE)
+        _, self.optimal_value_function, _ = enumerative_value_iteration(self.mdp, gamma=GAMMA, epsilon=1e-10, vectorized=True)
+
+    def test_enumerative_brtdp_bounds_the_optimal_value_of_the_initial_state(self):
+        rewards = self.mdp.reward_array()
+        lower_value_function = self.mdp.create_value_function(lambda state: rewards.min() / (1 - GAMMA))
+        upper_value_function = self.mdp.create_value_function(lambda state: rewards.max() / (1 - GAMMA))
+
+        _, value_function, statistics = enumerative_brtdp(self.mdp, GAMMA, 100, EPSILON, 10, lower_value_function,
+                                                          upper_value_function, seed=42)
+
+        for initial_state in self.mdp.initial_states:
+            optimal_value = self.optimal_value_function[initial_state]
+
+            self.assertLessEqual(value_function[initial_state], optimal_value + 1e-8)
+            self.assertGreaterEqual(upper_value_function[initial_state], optimal_value - 1e-8)
+            self.assertLessEqual(upper_value_function[initial_state] - value_function[initial_state], EPSILON)
+
+        self.assertGreater(statistics["iterations"], 0)
+        self.assertGreater(statistics["bellman_backups_done"], 0)
+
+    def test_enumerative_brtdp_with_default_bounds(self):
+        policy, value_function, _ = enumerative_brtdp(self.mdp, GAMMA, 100, EPSILON, 10, seed=42)
+
+        # the returned lower bound is within epsilon of the optimal value, as the upper bound is above it
+        for initial_state in self.mdp.initial_states:
+            optimal_value = self.optimal_value_function[initial_state]
+
+            self.assertLessEqual(value_function[initial_state], optimal_value + 1e-8)
+            self.assertGreaterEqual(value_function[initial_state], optimal_value - EPSILON)
+
+        self.assertEqual(set(policy.keys()), set(self.mdp.states))
+
+if __name__ == "__main__":
+    unittest.main()
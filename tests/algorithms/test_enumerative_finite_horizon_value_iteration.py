@@ -0,0 +1,68 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+
+PROBLEM_FILE = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative", "navigation01.net")
+
+GAMMA = 0.9
+HORIZON = 6
+
+def dense_backward_induction(mdp, gamma, horizon):
+    rewards = np.array([ mdp.reward(state) for state in mdp.states ])
+    transition_matrices = [
+        np.array([ [ mdp.transition(state, action, next_state) for next_state in mdp.states ] for state in mdp.states ])
+        for action in mdp.actions
+    ]
+
+    stage_values = np.zeros((horizon + 1, len(mdp.states)))
+    stage_qualities = np.zeros((horizon, len(mdp.actions), len(mdp.states)))
+
+    for stage in reversed(range(horizon)):
+        stage_qualities[stage] = np.array([ rewards + gamma * transition_matrix @ stage_values[stage + 1]
+                                            for transition_matrix in transition_matrices ])
+        stage_values[stage] = stage_qualities[stage].max(axis=0)
+
+    return stage_values, stage_qualities
+
+class EnumerativeFiniteHorizonValueIterationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mdp = reader.read_problem_file(PROBLEM_FILE)
+
+    def test_enumerative_finite_horizon_value_iteration_matches_dense_backward_induction(self):
+        expected_stage_values, expected_stage_qualities = dense_backward_induction(self.mdp, GAMMA, HORIZON)
+
+        policy, value_function, statistics = enumerative_value_iteration(self.mdp, gamma=GAMMA, horizon=HORIZON)
+
+        np.testing.assert_allclose(statistics["stage_values"], expected_stage_values, atol=1e-12)
+        np.testing.assert_allclose(value_function.values, expected_stage_values[0], atol=1e-12)
+        self.assertEqual(statistics["stage_policies"].shape, (HORIZON, len(self.mdp.states)))
+
+        # the action of each stage is a best one on the dense qualities (ties may pick any of the best actions)
+        state_indexes = np.arange(len(self.mdp.states))
+
+        for stage in range(HORIZON):
+            chosen_qualities = expected_stage_qualities[stage][statistics["stage_policies"][stage], state_indexes]
+            np.testing.assert_allclose(chosen_qualities, expected_stage_values[stage], atol=1e-12)
+
+        # the returned policy is the one of the first stage
+        self.assertEqual(policy, { state: self.mdp.actions[action_index]
+                                   for state, action_index in zip(self.mdp.states, statistics["stage_policies"][0]) })
+
+        self.assertEqual(statistics["iterations"], HORIZON)
+        self.assertEqual(statistics["bellman_backups_done"], HORIZON * len(self.mdp.states))
+
+    def test_enumerative_finite_horizon_value_iteration_with_zero_horizon(self):
+        policy, value_function, statistics = enumerative_value_iteration(self.mdp, gamma=GAMMA, horizon=0)
+
+        self.assertEqual(policy, {})
+        np.testing.assert_array_equal(value_function.values, np.zeros(len(self.mdp.states)))
+        self.assertEqual(statistics["stage_values"].shape, (1, len(self.mdp.states)))
+
+if __name__ == "__main__":
+    unittest.main()
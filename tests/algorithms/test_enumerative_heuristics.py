@@ -0,0 +1,84 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.rtdp import determinized_heuristic, reward_bound_heuristic
+from probabilistic_planning.algorithms.rtdp import enumerative_heuristics
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import compiled_cache, reader
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "triangle_tireworld_03.net") ]
+
+GAMMA = 0.9
+
+class EnumerativeHeuristicsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_directory)
+
+    def test_heuristics_are_admissible(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+            _, optimal_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=1e-10, vectorized=True)
+
+            for heuristic in (determinized_heuristic, reward_bound_heuristic):
+                with self.subTest(problem_file=os.path.basename(problem_file), heuristic=heuristic.__name__):
+                    value_function = heuristic(mdp, GAMMA)
+                    self.assertTrue(np.all(value_function.values >= optimal_value_function.values - 1e-8))
+
+    def test_determinized_heuristic_is_tighter_than_reward_bound_heuristic(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+
+            with self.subTest(problem_file=os.path.basename(problem_file)):
+                determinized_values = determinized_heuristic(mdp, GAMMA).values
+                reward_bound_values = reward_bound_heuristic(mdp, GAMMA).values
+
+                self.assertTrue(np.all(determinized_values <= reward_bound_values + 1e-8))
+
+    def test_heuristics_return_a_fresh_value_function_on_each_call(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+
+        for heuristic in (determinized_heuristic, reward_bound_heuristic):
+            with self.subTest(heuristic=heuristic.__name__):
+                first_value_function = heuristic(mdp, GAMMA)
+                expected_values = first_value_function.values.copy()
+                first_value_function.values[:] = 0.0 # the algorithms update the value function in place
+
+                second_value_function = heuristic(mdp, GAMMA)
+
+                self.assertIsNot(second_value_function, first_value_function)
+                np.testing.assert_array_equal(second_value_function.values, expected_values)
+
+    def test_heuristics_are_cached_per_problem_file(self):
+        first_mdp = reader.read_problem_file(PROBLEM_FILES[1])
+        expected_values = determinized_heuristic(first_mdp, GAMMA, PROBLEM_FILES[1], self.cache_directory).values
+
+        compiled_problem_directory = compiled_cache.get_compiled_problem_directory(PROBLEM_FILES[1], self.cache_directory)
+        self.assertIsNotNone(compiled_cache.read_compiled_values(compiled_problem_directory, f"determinized.{GAMMA!r}"))
+
+        # another MDP read from the same file, here through its compiled problem, reuses the stored values
+        second_mdp = reader.read_problem_file(PROBLEM_FILES[1], use_cache=True, cache_directory=self.cache_directory)
+
+        with mock.patch.object(enumerative_heuristics, "compute_goal_distances", side_effect=AssertionError("recomputed")):
+            value_function = determinized_heuristic(second_mdp, GAMMA, PROBLEM_FILES[1], self.cache_directory)
+
+        np.testing.assert_array_equal(value_function.values, expected_values)
+
+    def test_heuristics_with_invalid_discount_factor(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+
+        with self.assertRaisesRegex(ValueError, "The heuristics need a discount factor in \\[0, 1\\)"):
+            determinized_heuristic(mdp, 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "triangle_tireworld_03.net") ]
+
+GAMMA = 0.9
+EPSILON = 1e-8
+
+class EnumerativeInfiniteHorizonValueIterationTests(unittest.TestCase):
+
+    def test_enumerative_value_iteration_vectorized_matches_per_state_sweep(self):
+        for problem_file in PROBLEM_FILES + [ os.path.join(ENUMERATIVE_FILES, "river_traversal_01.net") ]:
+            mdp = reader.read_problem_file(problem_file)
+
+            with self.subTest(problem_file=os.path.basename(problem_file)):
+                expected_policy, expected_value_function, expected_statistics = enumerative_value_iteration(
+                    mdp, gamma=GAMMA, epsilon=EPSILON, vectorized=False
+                )
+                policy, value_function, statistics = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON, vectorized=True)
+
+                np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-12)
+                self.assertEqual(policy, expected_policy)
+
+                # both modes run the same Jacobi sweeps, so they stop at the same iteration with the same residuals
+                self.assertEqual(statistics["iterations"], expected_statistics["iterations"])
+                np.testing.assert_allclose(statistics["maximum_residuals"], expected_statistics["maximum_residuals"], rtol=1e-9)
+                self.assertEqual(statistics["bellman_backups_done"], expected_statistics["bellman_backups_done"])
+
+    def test_enumerative_value_iteration_vectorized_and_in_place_together(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+
+        with self.assertRaisesRegex(ValueError, "The vectorized and in place modes can not be used together"):
+            enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON, vectorized=True, in_place=True)
+
+    def test_enumerative_value_iteration_in_place_matches_default_sweep(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+            expected_policy, expected_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON)
+
+            for state_order in (None, "reverse_topological", list(reversed(mdp.states))):
+                with self.subTest(problem_file=os.path.basename(problem_file), state_order=str(state_order)[:30]):
+                    policy, value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON, in_place=True,
+                                                                            state_order=state_order)
+
+                    np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-6)
+                    self.assertEqual(policy, expected_policy)
+
+    def test_enumerative_value_iteration_in_place_with_invalid_state_order(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+
+        with self.assertRaisesRegex(ValueError, "Unknown state order \\[invalid-order\\]"):
+            enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON, in_place=True, state_order="invalid-order")
+
+        with self.assertRaisesRegex(ValueError, "The state order should have each state of the MDP exactly once"):
+            enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON, in_place=True, state_order=mdp.states[1:])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.rtdp import enumerative_lrtdp
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import importlib
+import os
+import unittest
+from unittest import mock
+
+# the rtdp package exports the function with the same name of its module
+lrtdp_module = importlib.import_module("probabilistic_planning.algorithms.rtdp.enumerative_lrtdp")
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "river_traversal_01.net") ]
+
+GAMMA = 0.9
+EPSILON = 1e-3
+
+class EnumerativeLRTDPTests(unittest.TestCase):
+
+    def test_enumerative_lrtdp_solves_the_initial_states(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+            _, optimal_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=1e-10)
+
+            with self.subTest(problem_file=os.path.basename(problem_file)):
+                created_labels = []
+                labeling_arrays = lrtdp_module.LabelingArrays
+
+                def create_labels(number_of_states):
+                    labels = labeling_arrays(number_of_states)
+                    created_labels.append(labels)
+                    return labels
+
+                with mock.patch.object(lrtdp_module, "LabelingArrays", side_effect=create_labels):
+                    policy, value_function, statistics = enumerative_lrtdp(mdp, GAMMA, 100, EPSILON, seed=3)
+
+                for initial_state in mdp.initial_states:
+                    self.assertAlmostEqual(value_function[initial_state], optimal_value_function[initial_state], delta=EPSILON)
+                    self.assertTrue(created_labels[0].solved[mdp.state_index(initial_state)])
+
+                self.assertEqual(len(statistics["maximum_residuals"]), statistics["iterations"])
+                self.assertLessEqual(statistics["maximum_residuals"][-1], EPSILON)
+                self.assertEqual(set(policy.keys()), set(mdp.states))
+
+    def test_check_solved_labels_the_greedy_states_of_a_converged_value_function(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+        _, optimal_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=1e-10)
+
+        initial_state_index = mdp.state_index(mdp.initial_states[0])
+        labels = lrtdp_module.LabelingArrays(len(mdp.states))
+        values = optimal_value_function.values.copy()
+
+        solved, bellman_backups_done = lrtdp_module.check_solved(initial_state_index, EPSILON, labels, mdp, GAMMA, values)
+
+        self.assertTrue(solved)
+        self.assertEqual(bellman_backups_done, 0)
+        self.assertTrue(labels.solved[initial_state_index])
+
+    def test_check_solved_backs_up_the_states_of_an_unconverged_value_function(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+
+        initial_state_index = mdp.state_index(mdp.initial_states[0])
+        labels = lrtdp_module.LabelingArrays(len(mdp.states))
+        values = mdp.create_value_function().values
+
+        solved, bellman_backups_done = lrtdp_module.check_solved(initial_state_index, EPSILON, labels, mdp, GAMMA, values)
+
+        self.assertFalse(solved)
+        self.assertGreater(bellman_backups_done, 0)
+        self.assertFalse(labels.solved.any())
+
+if __name__ == "__main__":
+    unittest.main()
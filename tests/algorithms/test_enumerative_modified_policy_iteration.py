@@ -0,0 +1,60 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.policy_iteration import enumerative_modified_policy_iteration, enumerative_policy_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "triangle_tireworld_03.net") ]
+
+GAMMA = 0.9
+EPSILON = 1e-10
+M = 20
+
+class EnumerativeModifiedPolicyIterationTests(unittest.TestCase):
+
+    def assert_statistics_are_consistent(self, mdp, statistics):
+        number_of_states = len(mdp.states)
+
+        self.assertEqual(len(statistics["evaluation_backups"]), statistics["iterations"])
+        self.assertEqual(len(statistics["improvement_backups"]), statistics["iterations"])
+        self.assertEqual(statistics["improvement_backups"], [number_of_states] * statistics["iterations"])
+
+        # the last improvement converges, so it is not followed by an evaluation
+        self.assertEqual(statistics["evaluation_backups"][-1], 0)
+
+        for evaluation_backups in statistics["evaluation_backups"][:-1]:
+            self.assertEqual(evaluation_backups % number_of_states, 0)
+            self.assertGreaterEqual(evaluation_backups, number_of_states)
+            self.assertLessEqual(evaluation_backups, M * number_of_states)
+
+    def test_enumerative_modified_policy_iteration_matches_enumerative_policy_iteration(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+            expected_policy, expected_value_function, _ = enumerative_policy_iteration(mdp, GAMMA)
+
+            for adaptive in (False, True):
+                with self.subTest(problem_file=os.path.basename(problem_file), adaptive=adaptive):
+                    policy, value_function, statistics = enumerative_modified_policy_iteration(mdp, GAMMA, EPSILON, M, adaptive=adaptive)
+
+                    np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-8)
+                    self.assertEqual(policy, expected_policy)
+                    self.assert_statistics_are_consistent(mdp, statistics)
+
+    def test_enumerative_modified_policy_iteration_with_fixed_m_evaluates_m_times(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[0])
+        _, _, statistics = enumerative_modified_policy_iteration(mdp, GAMMA, EPSILON, M)
+
+        self.assertEqual(statistics["evaluation_backups"][:-1], [M * len(mdp.states)] * (statistics["iterations"] - 1))
+
+    def test_enumerative_modified_policy_iteration_with_adaptive_mode_stops_evaluations_early(self):
+        mdp = reader.read_problem_file(PROBLEM_FILES[1])
+        _, _, statistics = enumerative_modified_policy_iteration(mdp, GAMMA, EPSILON, M, adaptive=True)
+
+        self.assertLess(min(statistics["evaluation_backups"][:-1]), M * len(mdp.states))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.policy_iteration import enumerative_policy_iteration
+from probabilistic_planning.algorithms.enumerative_kernels import build_policy, compute_qualities
+from probabilistic_planning.algorithms.policy_iteration.enumerative_policy_iteration import evaluate_policy, improve_policy
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILE = os.path.join(ENUMERATIVE_FILES, "navigation01.net")
+
+GAMMA = 0.9
+
+def full_policy_iteration(mdp, gamma):
+    # improves every state after each evaluation, with the qualities of all states computed again
+    policy_action_indexes = np.zeros(len(mdp.states), dtype=np.int64)
+    all_state_indexes = np.arange(len(mdp.states))
+
+    while True:
+        value_function = evaluate_policy(policy_action_indexes, mdp, gamma)
+        qualities = compute_qualities(mdp, gamma, value_function.values)
+
+        if improve_policy(policy_action_indexes, qualities, all_state_indexes) == 0:
+            return build_policy(mdp, policy_action_indexes), value_function
+
+class EnumerativePolicyIterationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mdp = reader.read_problem_file(PROBLEM_FILE)
+
+    def test_evaluate_policy_with_krylov_solvers_matches_direct_solver(self):
+        policy_action_indexes = np.arange(len(self.mdp.states)) % len(self.mdp.actions)
+        direct_value_function = evaluate_policy(policy_action_indexes, self.mdp, GAMMA, "direct")
+
+        for solver in ("gmres", "bicgstab"):
+            with self.subTest(solver=solver):
+                value_function = evaluate_policy(policy_action_indexes, self.mdp, GAMMA, solver, 1e-12)
+                np.testing.assert_allclose(value_function.values, direct_value_function.values, atol=1e-8)
+
+    def test_enumerative_policy_iteration_with_krylov_solvers_matches_direct_solver(self):
+        direct_policy, direct_value_function, _ = enumerative_policy_iteration(self.mdp, GAMMA, solver="direct")
+
+        for solver in ("gmres", "bicgstab"):
+            with self.subTest(solver=solver):
+                policy, value_function, _ = enumerative_policy_iteration(self.mdp, GAMMA, solver=solver, tolerance=1e-12)
+
+                self.assertEqual(policy, direct_policy)
+                np.testing.assert_allclose(value_function.values, direct_value_function.values, atol=1e-8)
+
+    def test_enumerative_policy_iteration_matches_full_policy_improvement(self):
+        for file_name in ("navigation01.net", "triangle_tireworld_03.net", "river_traversal_01.net"):
+            mdp = reader.read_problem_file(os.path.join(ENUMERATIVE_FILES, file_name))
+            expected_policy, expected_value_function = full_policy_iteration(mdp, GAMMA)
+
+            with self.subTest(file_name=file_name):
+                policy, value_function, statistics = enumerative_policy_iteration(mdp, GAMMA)
+
+                self.assertEqual(policy, expected_policy)
+                np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-10)
+
+                # every state is new on the first evaluation, and fewer states change as the policy converges
+                changed_states = statistics["changed_states"]
+
+                self.assertEqual(len(changed_states), statistics["iterations"])
+                self.assertEqual(changed_states[0], len(mdp.states))
+                self.assertEqual(changed_states[-1], min(changed_states))
+                self.assertLess(changed_states[-1], len(mdp.states) // 2)
+
+    def test_enumerative_policy_iteration_with_change_threshold(self):
+        mdp = reader.read_problem_file(os.path.join(ENUMERATIVE_FILES, "river_traversal_01.net"))
+        _, expected_value_function = full_policy_iteration(mdp, GAMMA)
+
+        _, value_function, statistics = enumerative_policy_iteration(mdp, GAMMA, change_threshold=1e-6)
+
+        np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-4)
+        self.assertLessEqual(statistics["changed_states"][-1], 2)
+
+    def test_enumerative_policy_iteration_with_invalid_solver(self):
+        with self.assertRaisesRegex(ValueError, "Invalid policy evaluation solver \\[invalid-solver\\]"):
+            enumerative_policy_iteration(self.mdp, GAMMA, solver="invalid-solver")
+
+if __name__ == "__main__":
+    unittest.main()
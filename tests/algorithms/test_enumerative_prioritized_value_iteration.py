@@ -0,0 +1,32 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.value_iteration import enumerative_prioritized_value_iteration, enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "triangle_tireworld_03.net") ]
+
+GAMMA = 0.9
+EPSILON = 1e-8
+
+class EnumerativePrioritizedValueIterationTests(unittest.TestCase):
+
+    def test_enumerative_prioritized_value_iteration_matches_enumerative_value_iteration(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+
+            with self.subTest(problem_file=os.path.basename(problem_file)):
+                _, expected_value_function, expected_statistics = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON)
+                _, value_function, statistics = enumerative_prioritized_value_iteration(mdp, GAMMA, EPSILON)
+
+                np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-6)
+
+                # only the states whose successors changed are backed up, instead of every state in each sweep
+                self.assertLess(statistics["bellman_backups_done"], expected_statistics["bellman_backups_done"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.enumerative_kernels import compute_bellman_backup, compute_residual
+from probabilistic_planning.algorithms.rtdp import enumerative_rtdp
+from probabilistic_planning.algorithms.value_iteration import enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import importlib
+import math
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# the rtdp package exports the function with the same name of its module
+rtdp_module = importlib.import_module("probabilistic_planning.algorithms.rtdp.enumerative_rtdp")
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+
+GAMMA = 0.9
+BATCH_SIZE = 8
+
+class EnumerativeRTDPTests(unittest.TestCase):
+
+    def test_enumerative_rtdp_with_batch_size_approaches_the_optimal_value_of_the_initial_state(self):
+        for file_name, tolerance in (("navigation01.net", 1e-3), ("river_traversal_01.net", 1e-2)):
+            mdp = reader.read_problem_file(os.path.join(ENUMERATIVE_FILES, file_name))
+            _, optimal_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=1e-10)
+
+            with self.subTest(file_name=file_name):
+                _, value_function, statistics = enumerative_rtdp(mdp, GAMMA, 100, 100, seed=7, batch_size=BATCH_SIZE)
+
+                for initial_state in mdp.initial_states:
+                    optimal_value = optimal_value_function[initial_state]
+
+                    # the rewards are not positive, so the initial zero values are an upper bound that is only lowered
+                    self.assertGreaterEqual(value_function[initial_state], optimal_value - 1e-8)
+                    self.assertLessEqual(value_function[initial_state], optimal_value + tolerance)
+
+                # the last batch is cut to the trials left, so max_trials is never exceeded
+                self.assertEqual(statistics["iterations"], 100)
+                self.assertEqual(len(statistics["maximum_residuals"]), math.ceil(100 / BATCH_SIZE))
+                self.assertGreater(statistics["trials_per_second"], 0)
+
+class ResidualCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mdp = reader.read_problem_file(os.path.join(ENUMERATIVE_FILES, "navigation01.net"))
+        self.values = self.mdp.create_value_function().values
+        self.residual_cache = rtdp_module.ResidualCache(self.mdp)
+
+    def back_up(self, state_index):
+        computed_value = compute_bellman_backup(state_index, self.mdp, GAMMA, self.values)
+        value_changed = computed_value != self.values[state_index]
+        self.values[state_index] = computed_value
+
+        self.residual_cache.record_backup(state_index, value_changed,
+                                          compute_residual(state_index, self.mdp, GAMMA, self.values))
+
+    def assert_residuals_are_fresh(self):
+        for state_index in range(len(self.mdp.states)):
+            self.assertEqual(self.residual_cache.residual(state_index, GAMMA, self.values),
+                             compute_residual(state_index, self.mdp, GAMMA, self.values))
+
+    def test_residuals_after_a_sequence_of_backups(self):
+        random_state = np.random.RandomState(11)
+
+        for state_index in random_state.randint(len(self.mdp.states), size=60):
+            self.back_up(state_index)
+            self.assert_residuals_are_fresh()
+
+    def test_residuals_are_kept_while_the_values_do_not_change(self):
+        for state_index in range(len(self.mdp.states)):
+            self.back_up(state_index)
+
+        self.assert_residuals_are_fresh()
+
+        with mock.patch.object(rtdp_module, "compute_residual", side_effect=AssertionError("recomputed")):
+            for state_index in range(len(self.mdp.states)):
+                self.residual_cache.residual(state_index, GAMMA, self.values)
+
+    def test_changing_a_successor_value_recomputes_the_residual(self):
+        for state_index in range(len(self.mdp.states)):
+            self.back_up(state_index)
+
+        self.assert_residuals_are_fresh()
+
+        state_index = self.mdp.state_index(self.mdp.initial_states[0])
+        successor_state_index = next(dependency for dependency in self.residual_cache.dependencies(state_index)
+                                     if dependency != state_index)
+        computed_stamp = self.residual_cache.computed_stamps[state_index]
+        previous_residual = self.residual_cache.residual(state_index, GAMMA, self.values)
+
+        self.values[successor_state_index] = self.values[successor_state_index] + 10.0
+        self.residual_cache.record_changes(np.array([ successor_state_index ]))
+
+        residual = self.residual_cache.residual(state_index, GAMMA, self.values)
+
+        self.assertNotEqual(residual, previous_residual)
+        self.assertEqual(residual, compute_residual(state_index, self.mdp, GAMMA, self.values))
+        self.assertGreater(self.residual_cache.computed_stamps[state_index], computed_stamp)
+
+        self.assert_residuals_are_fresh()
+
+if __name__ == "__main__":
+    unittest.main()
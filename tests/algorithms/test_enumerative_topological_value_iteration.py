@@ -0,0 +1,40 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.value_iteration import enumerative_topological_value_iteration, enumerative_value_iteration
+from probabilistic_planning.problems import reader
+
+import os
+import unittest
+
+import numpy as np
+import scipy.sparse.csgraph
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+PROBLEM_FILES = [ os.path.join(ENUMERATIVE_FILES, file_name) for file_name in ("navigation01.net", "triangle_tireworld_03.net") ]
+
+GAMMA = 0.9
+EPSILON = 1e-8
+
+def count_strongly_connected_components(mdp):
+    state_graph = sum(mdp.transition_matrix(action) for action in mdp.actions)
+    number_of_components, _ = scipy.sparse.csgraph.connected_components(state_graph, directed=True, connection="strong")
+
+    return number_of_components
+
+class EnumerativeTopologicalValueIterationTests(unittest.TestCase):
+
+    def test_enumerative_topological_value_iteration_matches_enumerative_value_iteration(self):
+        for problem_file in PROBLEM_FILES:
+            mdp = reader.read_problem_file(problem_file)
+
+            with self.subTest(problem_file=os.path.basename(problem_file)):
+                expected_policy, expected_value_function, _ = enumerative_value_iteration(mdp, gamma=GAMMA, epsilon=EPSILON)
+                policy, value_function, statistics = enumerative_topological_value_iteration(mdp, GAMMA, EPSILON)
+
+                np.testing.assert_allclose(value_function.values, expected_value_function.values, atol=1e-6)
+                self.assertEqual(policy, expected_policy)
+
+                self.assertGreater(statistics["strongly_connected_components"], 1)
+                self.assertEqual(statistics["strongly_connected_components"], count_strongly_connected_components(mdp))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.algorithms.factored_kernels import compute_bellman_backup
+from probabilistic_planning.algorithms.value_iteration import factored_value_iteration
+from probabilistic_planning.problems import factored_reader
+
+import itertools
+import os
+import unittest
+
+import numpy as np
+
+PROBLEM_FILE = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "factored", "bi_ring_IP_5.net")
+
+GAMMA = 0.9
+
+def compute_maximum_distance(mdp, first_value_function, second_value_function):
+    return max(abs(first_value_function.evaluate(mdp.assignment(state)) - second_value_function.evaluate(mdp.assignment(state)))
+               for state in enumerate_states(mdp))
+
+def enumerate_states(mdp):
+    for values in itertools.product([True, False], repeat=len(mdp.state_variables)):
+        yield { state_variable for state_variable, value in zip(mdp.state_variables, values) if value }
+
+class FactoredValueIterationTests(unittest.TestCase):
+
+    def setUp(self):
+        parameters = { f"p{index}": 0.9 for index in range(1, 11) }
+        self.mdp = factored_reader.read_factored_problem_file(PROBLEM_FILE, parameters)
+
+    def test_factored_value_iteration_matches_enumerative_value_iteration(self):
+        states = list(enumerate_states(self.mdp))
+        rewards = np.array([ self.mdp.reward(state) for state in states ])
+        transition_matrices = [
+            np.array([ [ self.mdp.transition(state, action, next_state) for next_state in states ] for state in states ])
+            for action in self.mdp.actions
+        ]
+
+        values = np.zeros(len(states))
+
+        while True:
+            qualities = np.array([ rewards + GAMMA * transition_matrix @ values for transition_matrix in transition_matrices ])
+            residual = np.abs(qualities.max(axis=0) - values).max()
+            values = qualities.max(axis=0)
+
+            if residual < 1e-11:
+                break
+
+        policy, value_function, statistics = factored_value_iteration(self.mdp, GAMMA, 1e-10)
+
+        for state, value in zip(states, values):
+            self.assertAlmostEqual(value_function.evaluate(self.mdp.assignment(state)), value, places=8)
+
+        self.assertEqual(statistics["approximation_errors"], [0.0] * statistics["iterations"])
+        self.assertEqual(len(statistics["manager_nodes"]), statistics["iterations"])
+
+    def test_approximate_factored_value_iteration_is_within_its_error_bound(self):
+        _, exact_value_function, _ = factored_value_iteration(self.mdp, GAMMA, 1e-10)
+        _, value_function, statistics = factored_value_iteration(self.mdp, GAMMA, 1e-3, approximation_tolerance=0.1)
+
+        distance = compute_maximum_distance(self.mdp, value_function, exact_value_function)
+
+        self.assertLessEqual(distance, statistics["error_bound"])
+        self.assertLessEqual(max(statistics["approximation_errors"]), 0.05)
+
+        # the approximation must not stop before the residual gets small
+        swept_value_function = self.mdp.create_value_function()
+
+        for _ in range(40):
+            swept_value_function = compute_bellman_backup(self.mdp, GAMMA, swept_value_function)
+
+        self.assertLessEqual(distance, compute_maximum_distance(self.mdp, swept_value_function, exact_value_function))
+
+    def test_approximate_factored_value_iteration_with_maximum_value_function_size(self):
+        _, value_function, statistics = factored_value_iteration(self.mdp, GAMMA, 1e-3, maximum_value_function_size=15)
+
+        self.assertLessEqual(max(statistics["value_function_sizes"]), 15)
+        self.assertLessEqual(value_function.size(), 15)
+
+    def test_approximate_factored_value_iteration_without_discount(self):
+        with self.assertRaisesRegex(ValueError, "The approximate value iteration needs a discount factor below 1"):
+            factored_value_iteration(self.mdp, 1.0, 1e-3, approximation_tolerance=0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.problems import compiled_cache, reader
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+PROBLEM_FILE = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative", "navigation01.net")
+
+class CompiledCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_directory)
+
+    def test_get_compiled_problem_directory_is_stable(self):
+        first_directory = compiled_cache.get_compiled_problem_directory(PROBLEM_FILE, self.cache_directory)
+        second_directory = compiled_cache.get_compiled_problem_directory(PROBLEM_FILE, self.cache_directory)
+
+        self.assertEqual(first_directory, second_directory)
+        self.assertTrue(first_directory.startswith(self.cache_directory))
+
+    def test_read_problem_file_with_cache_creates_compiled_problem(self):
+        reader.read_problem_file(PROBLEM_FILE, use_cache=True, cache_directory=self.cache_directory)
+
+        compiled_problem_directory = compiled_cache.get_compiled_problem_directory(PROBLEM_FILE, self.cache_directory)
+        self.assertTrue(os.path.isdir(compiled_problem_directory))
+
+    def test_read_problem_file_with_cache_matches_parsed_problem(self):
+        parsed_mdp = reader.read_problem_file(PROBLEM_FILE)
+        reader.read_problem_file(PROBLEM_FILE, use_cache=True, cache_directory=self.cache_directory)
+        cached_mdp = reader.read_problem_file(PROBLEM_FILE, use_cache=True, cache_directory=self.cache_directory)
+
+        self.assertEqual(parsed_mdp.states, cached_mdp.states)
+        self.assertEqual(parsed_mdp.actions, cached_mdp.actions)
+        self.assertEqual(parsed_mdp.initial_states, cached_mdp.initial_states)
+        self.assertEqual(parsed_mdp.goal_states, cached_mdp.goal_states)
+        np.testing.assert_array_equal(parsed_mdp.reward_array(), cached_mdp.reward_array())
+
+        for action in parsed_mdp.actions:
+            np.testing.assert_array_equal(parsed_mdp.transition_matrix(action).toarray(), cached_mdp.transition_matrix(action).toarray())
+
+    def test_read_problem_file_with_cache_keeps_files_with_the_same_name(self):
+        problem_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, problem_directory)
+
+        problem_files = []
+
+        for directory_name in ("a", "b"):
+            os.makedirs(os.path.join(problem_directory, directory_name))
+            problem_files.append(os.path.join(problem_directory, directory_name, "navigation01.net"))
+            shutil.copy(PROBLEM_FILE, problem_files[-1])
+
+        backup_file = problem_files[0] + ".bak"
+        shutil.copy(PROBLEM_FILE, backup_file)
+
+        for problem_file in problem_files + [backup_file]:
+            reader.read_problem_file(problem_file, use_cache=True, cache_directory=self.cache_directory)
+
+        for problem_file in problem_files + [backup_file]:
+            compiled_problem_directory = compiled_cache.get_compiled_problem_directory(problem_file, self.cache_directory)
+            self.assertTrue(os.path.isdir(compiled_problem_directory))
+
+        self.assertEqual(len(os.listdir(self.cache_directory)), 3)
+
+    def test_read_problem_file_with_cache_removes_stale_compiled_problem(self):
+        problem_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, problem_directory)
+
+        problem_file = os.path.join(problem_directory, "navigation01.net")
+        shutil.copy(PROBLEM_FILE, problem_file)
+        reader.read_problem_file(problem_file, use_cache=True, cache_directory=self.cache_directory)
+        stale_directory = compiled_cache.get_compiled_problem_directory(problem_file, self.cache_directory)
+
+        with open(problem_file, "a") as file:
+            file.write("\n")
+
+        reader.read_problem_file(problem_file, use_cache=True, cache_directory=self.cache_directory)
+
+        self.assertFalse(os.path.isdir(stale_directory))
+        self.assertTrue(os.path.isdir(compiled_cache.get_compiled_problem_directory(problem_file, self.cache_directory)))
+
+if __name__ == "__main__":
+    unittest.main()
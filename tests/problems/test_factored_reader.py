@@ -0,0 +1,111 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.problems import factored_reader
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+FACTORED_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "factored")
+
+PROBLEM_LINES = [
+    "variables (c1 c2 )",
+    "action stay",
+    "\tc1 (c1 ([1.00]) ([0.00]))",
+    "\tc2 (c2 (c1 ([1*p1]) ([0.5*p1])) ([0.00]))",
+    "endaction",
+    "action reboot",
+    "\tc1 ([1.00])",
+    "endaction",
+    "reward ",
+    "   (c1 (c2 (2) (1) ) (0) )",
+    "constraints",
+    "   (",
+    "       (p1 > = 0.85 )",
+    "   )",
+    "discount 0.900000",
+    "tolerance 0.010000",
+    "initial",
+    "(c1 c2)",
+    "endinitial",
+    "goal",
+    "(c2)",
+    "endgoal"
+]
+
+def write_lines(file_path, lines):
+    with open(file_path, "w") as file:
+        file.write("\n".join(lines))
+
+class FactoredReaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.problem_directory = tempfile.mkdtemp()
+        self.problem_file = os.path.join(self.problem_directory, "problem.net")
+
+    def tearDown(self):
+        shutil.rmtree(self.problem_directory)
+
+    def test_read_factored_problem_file_call_with_all_sections(self):
+        write_lines(self.problem_file, PROBLEM_LINES)
+
+        mdp = factored_reader.read_factored_problem_file(self.problem_file, { "p1": 0.9 })
+
+        self.assertEqual(mdp.state_variables, ["c1", "c2"])
+        self.assertEqual(mdp.actions, ["reboot", "stay"])
+        self.assertEqual(mdp.reward({"c1", "c2"}), 2.0)
+        self.assertEqual(mdp.reward({"c1"}), 1.0)
+        self.assertAlmostEqual(mdp.transition({"c1", "c2"}, "stay", {"c1", "c2"}), 0.9)
+        self.assertAlmostEqual(mdp.transition({"c2"}, "stay", {"c2"}), 0.45)
+        self.assertAlmostEqual(mdp.transition({"c2"}, "reboot", {"c1"}), 0.0)
+        self.assertAlmostEqual(mdp.transition({"c2"}, "reboot", {"c1", "c2"}), 1.0)
+        self.assertEqual(mdp.initial_states, [frozenset({"c1", "c2"})])
+        self.assertEqual(mdp.goal_states, [frozenset({"c2"})])
+
+    def test_read_factored_problem_file_call_without_parameter_value(self):
+        write_lines(self.problem_file, PROBLEM_LINES)
+
+        with self.assertRaisesRegex(ValueError, "The parameter \\[p1\\] in leaf \\[1\\*p1\\] should have a value"):
+            factored_reader.read_factored_problem_file(self.problem_file)
+
+    def test_read_factored_problem_file_call_with_unknown_section(self):
+        write_lines(self.problem_file, PROBLEM_LINES[:2] + ["unknown"])
+
+        with self.assertRaisesRegex(ValueError, "Unrecognized state variable \\[unknown\\] in action \\[stay\\]"):
+            factored_reader.read_factored_problem_file(self.problem_file, { "p1": 0.9 })
+
+        write_lines(self.problem_file, PROBLEM_LINES[:1] + ["unknown"])
+
+        with self.assertRaisesRegex(ValueError, "Unknown section \\[unknown\\]"):
+            factored_reader.read_factored_problem_file(self.problem_file)
+
+    def test_read_factored_problem_file_call_with_unclosed_decision_diagram(self):
+        write_lines(self.problem_file, PROBLEM_LINES[:2] + ["\tc1 (c1 ([1.00]) ([0.00])"])
+
+        with self.assertRaisesRegex(ValueError, "Unexpected end of file"):
+            factored_reader.read_factored_problem_file(self.problem_file)
+
+    def test_read_factored_problem_file_call_with_bi_ring_file(self):
+        parameters = { f"p{index}": 0.9 for index in range(1, 11) }
+
+        mdp = factored_reader.read_factored_problem_file(os.path.join(FACTORED_FILES, "bi_ring_IP_5.net"), parameters)
+
+        self.assertEqual(mdp.state_variables, ["c1", "c2", "c3", "c4", "c5"])
+        self.assertEqual(len(mdp.actions), 6)
+        self.assertEqual(mdp.reward({"c1", "c2", "c3", "c4", "c5"}), 1.0)
+        self.assertAlmostEqual(mdp.transition_function.get_transition_add("reboot1", "c1").value, 1.0)
+
+    def test_read_tokens_call_with_tokens_across_chunks(self):
+        file = io.StringIO("c1 ([0.666667*p1]) (c2 (1))")
+
+        tokens = list(factored_reader.read_tokens(file, chunk_size=4))
+
+        self.assertEqual(tokens, ["c1", "(", "[0.666667*p1]", ")", "(", "c2", "(", "1", ")", ")"])
+
+    def test_evaluate_leaf_expression(self):
+        parameters = { "p1": 0.5, "p2": 0.25 }
+
+        self.assertEqual(factored_reader.evaluate_leaf_expression("0.5*p1", parameters), 0.25)
+        self.assertEqual(factored_reader.evaluate_leaf_expression("1 - p1 + 2*p2", parameters), 1.0)
+        self.assertEqual(factored_reader.evaluate_leaf_expression("1e-1", parameters), 0.1)
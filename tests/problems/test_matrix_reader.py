@@ -0,0 +1,69 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.problems import matrix_reader, reader
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+ENUMERATIVE_FILES = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative")
+
+def write_lines(file_path, lines):
+    with open(file_path, "w") as file:
+        file.write("\n".join(lines))
+
+class MatrixReaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.problem_directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.problem_directory)
+
+    def test_read_matrix_problem_directory_call_with_valid_files(self):
+        write_lines(os.path.join(self.problem_directory, "Cost.txt"), [ "1.0", "0.0" ])
+        write_lines(os.path.join(self.problem_directory, "Action_Stay.txt"), [ "1 1 1.0", "2 2 1.0" ])
+        write_lines(os.path.join(self.problem_directory, "Action_Move.txt"), [ "1 1 0.25", "1 2 0.75", "2 2 1.0" ])
+
+        mdp = matrix_reader.read_matrix_problem_directory(self.problem_directory)
+
+        self.assertEqual(mdp.states, [ "state1", "state2" ])
+        self.assertEqual(mdp.actions, [ "Move", "Stay" ])
+        self.assertEqual(mdp.reward("state1"), -1.0)
+        self.assertEqual(mdp.transition("state1", "Move", "state2"), 0.75)
+
+    def test_read_matrix_problem_directory_call_with_state_index_out_of_range(self):
+        write_lines(os.path.join(self.problem_directory, "Cost.txt"), [ "1.0", "0.0" ])
+        write_lines(os.path.join(self.problem_directory, "Action_Stay.txt"), [ "1 1 1.0", "2 3 1.0" ])
+
+        with self.assertRaisesRegex(ValueError, "should only have state indexes between 1 and 2"):
+            matrix_reader.read_matrix_problem_directory(self.problem_directory)
+
+    def test_read_matrix_problem_directory_call_with_invalid_probability_distribution(self):
+        write_lines(os.path.join(self.problem_directory, "Cost.txt"), [ "1.0", "0.0" ])
+        write_lines(os.path.join(self.problem_directory, "Action_Stay.txt"), [ "1 1 0.5", "2 2 1.0" ])
+
+        with self.assertRaisesRegex(ValueError, "Invalid probability distribution on \\[state1\\]"):
+            matrix_reader.read_matrix_problem_directory(self.problem_directory)
+
+    def test_read_river_traversal_directory_matches_problem_file(self):
+        matrix_mdp = matrix_reader.read_river_traversal_directory(os.path.join(ENUMERATIVE_FILES, "river_traversal", "Ambiente1"), 5)
+        file_mdp = reader.read_problem_file(os.path.join(ENUMERATIVE_FILES, "river_traversal_01.net"))
+
+        self.assertEqual(matrix_mdp.states, file_mdp.states)
+        self.assertEqual(matrix_mdp.actions, file_mdp.actions)
+        self.assertEqual(matrix_mdp.initial_states, file_mdp.initial_states)
+        self.assertEqual(matrix_mdp.goal_states, file_mdp.goal_states)
+        np.testing.assert_array_equal(matrix_mdp.reward_array(), file_mdp.reward_array())
+
+        for action in matrix_mdp.actions:
+            np.testing.assert_array_equal(matrix_mdp.transition_matrix(action).toarray(), file_mdp.transition_matrix(action).toarray())
+
+    def test_read_river_traversal_directory_call_with_invalid_width(self):
+        with self.assertRaisesRegex(ValueError, "should be a multiple of the width"):
+            matrix_reader.read_river_traversal_directory(os.path.join(ENUMERATIVE_FILES, "river_traversal", "Ambiente1"), 7)
+
+if __name__ == "__main__":
+    unittest.main()
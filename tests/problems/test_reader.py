@@ -1,9 +1,14 @@
 from ..context import probabilistic_planning
 from probabilistic_planning.problems import reader
 
+import os
 import unittest
 from unittest import mock
 
+import numpy as np
+
+PROBLEM_FILE = os.path.join(os.path.dirname(probabilistic_planning.__file__), "problems", "files", "enumerative", "navigation01.net")
+
 def mock_file_content(lines):
     file_content = "\n".join(lines)
     mock_open = mock.mock_open(read_data=file_content)
@@ -188,3 +193,113 @@ class ProblemReaderTests(unittest.TestCase):
 
             self.assertSetEqual(mdp.initial_states, {"state01"})
             self.assertSetEqual(mdp.goal_states, {"state01"})
+
+    def test_read_problem_file_call_with_transition_to_undeclared_state(self):
+        file_content = [
+            "states",
+            "   state01",
+            "endstates",
+            "reward",
+            "\tstate01 1.0",
+            "endreward",
+            "action first-action",
+            "\tstate01 state02 1.0",
+            "endaction"
+        ]
+
+        with mock_file_content(file_content), \
+             self.assertRaisesRegex(ValueError, "State \\[state02\\] not found in state set"):
+            reader.read_problem_file("some_file.txt")
+
+    def test_read_problem_file_call_with_repeated_transition_keeps_last_probability(self):
+        file_content = [
+            "states",
+            "   state01, state02",
+            "endstates",
+            "reward",
+            "\tstate01 1.0",
+            "\tstate02 0.0",
+            "endreward",
+            "action first-action",
+            "\tstate01 state02 0.3",
+            "\tstate01 state01 1.0",
+            "\tstate01 state01 0.7",
+            "\tstate02 state02 1.0",
+            "endaction"
+        ]
+
+        with mock_file_content(file_content):
+            mdp = reader.read_problem_file("some_file.txt")
+
+            self.assertEqual(mdp.transition("state01", "first-action", "state01"), 0.7)
+            self.assertEqual(mdp.transition("state01", "first-action", "state02"), 0.3)
+
+    def test_read_problem_file_with_workers_matches_serial_read(self):
+        serial_mdp = reader.read_problem_file(PROBLEM_FILE)
+        parallel_mdp = reader.read_problem_file(PROBLEM_FILE, workers=2)
+
+        self.assertEqual(serial_mdp.states, parallel_mdp.states)
+        self.assertEqual(serial_mdp.actions, parallel_mdp.actions)
+        self.assertEqual(serial_mdp.initial_states, parallel_mdp.initial_states)
+        self.assertEqual(serial_mdp.goal_states, parallel_mdp.goal_states)
+        np.testing.assert_array_equal(serial_mdp.reward_array(), parallel_mdp.reward_array())
+
+        for action in serial_mdp.actions:
+            np.testing.assert_array_equal(serial_mdp.transition_matrix(action).toarray(), parallel_mdp.transition_matrix(action).toarray())
+
+    def test_read_interval_problem_file_call_with_bounded_transitions(self):
+        file_content = [
+            "states",
+            "   state01, state02",
+            "endstates",
+            "",
+            "action first-action",
+            "\tstate01 state01 0.2 0.5",
+            "\tstate01 state02 0.5 0.8",
+            "\tstate02 state02 1.0 1.0",
+            "endaction",
+            "",
+            "reward",
+            "\tstate01 -1",
+            "\tstate02 0",
+            "endreward",
+            "",
+            "cost",
+            "\tfirst-action 0",
+            "endcost",
+            "",
+            "discount factor 0.900000",
+            "",
+            "initialstate",
+            "   state01",
+            "endinitialstate",
+            "",
+            "goalstate",
+            "   state02",
+            "endgoalstate"
+        ]
+
+        with mock_file_content(file_content):
+            bmdp = reader.read_interval_problem_file("some_file.txt")
+
+            self.assertListEqual(bmdp.states, ["state01", "state02"])
+            self.assertTupleEqual(bmdp.transition_bounds("state01", "first-action", "state01"), (0.2, 0.5))
+            self.assertTupleEqual(bmdp.transition_bounds("state01", "first-action", "state02"), (0.5, 0.8))
+            self.assertTupleEqual(bmdp.transition_bounds("state02", "first-action", "state01"), (0.0, 0.0))
+
+            self.assertListEqual(bmdp.initial_states, ["state01"])
+            self.assertListEqual(bmdp.goal_states, ["state02"])
+
+    def test_read_interval_problem_file_call_with_point_probabilities(self):
+        file_content = [
+            "states",
+            "   state01",
+            "endstates",
+            "action first-action",
+            "\tstate01 state01 1.0",
+            "endaction"
+        ]
+
+        with mock_file_content(file_content), \
+             self.assertRaisesRegex(ValueError, "It should have an origin, a destination, a lower and an upper probability"):
+            reader.read_interval_problem_file("some_file.txt")
@@ -0,0 +1,116 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.structures.decision_diagram import ADD, ADDManager
+from probabilistic_planning.structures.decision_diagram.add import read_add_from_tuples
+
+import unittest
+
+class AlgebraicDecisionDiagramTests(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = ADDManager()
+
+    def test_equal_functions_share_the_same_node(self):
+        first_variable = ADD.variable(0, self.manager)
+        second_variable = ADD.variable(1, self.manager)
+
+        first_sum = first_variable * 2 + second_variable
+        second_sum = second_variable + 2 * first_variable
+
+        self.assertEqual(first_sum.node, second_sum.node)
+        self.assertEqual(first_sum.terminal_values(), [0.0, 1.0, 2.0, 3.0])
+
+    def test_redundant_test_is_reduced(self):
+        variable = ADD.variable(0, self.manager)
+
+        self.assertTrue((variable + ~variable).is_terminal())
+        self.assertEqual((variable + ~variable).value, 1.0)
+
+    def test_if_then_else_with_branches_testing_earlier_variables(self):
+        high = ADD.variable(0, self.manager) * 2
+        low = ADD.constant(5, self.manager)
+
+        diagram = ADD.if_then_else(1, high, low)
+
+        self.assertEqual(diagram.support(), [0, 1])
+        self.assertEqual(diagram.evaluate({ 0: True, 1: True }), 2.0)
+        self.assertEqual(diagram.evaluate({ 0: False, 1: True }), 0.0)
+        self.assertEqual(diagram.evaluate({ 0: True, 1: False }), 5.0)
+
+    def test_restrict(self):
+        diagram = ADD.variable(0, self.manager) * 3 + ADD.variable(1, self.manager)
+
+        restricted = diagram.restrict(0, True)
+
+        self.assertEqual(restricted.support(), [1])
+        self.assertEqual(restricted.evaluate({ 1: True }), 4.0)
+        self.assertEqual(restricted.evaluate({ 1: False }), 3.0)
+
+    def test_sum_out_and_max_out(self):
+        diagram = ADD.variable(0, self.manager) * 3 + ADD.variable(1, self.manager)
+
+        summed = diagram.sum_out(0)
+        maximized = diagram.max_out([0, 1])
+
+        self.assertEqual(summed.evaluate({ 1: True }), 5.0)
+        self.assertEqual(summed.evaluate({ 1: False }), 3.0)
+        self.assertTrue(maximized.is_terminal())
+        self.assertEqual(maximized.value, 4.0)
+
+    def test_maximum_and_minimum(self):
+        first = ADD.variable(0, self.manager) * 2
+        second = ADD.variable(1, self.manager)
+
+        self.assertEqual(first.maximum(second).terminal_values(), [0.0, 1.0, 2.0])
+        self.assertEqual(first.minimum(second).terminal_values(), [0.0, 1.0])
+
+    def test_operation_cache_is_bounded(self):
+        manager = ADDManager(cache_size=4)
+        diagram = ADD.constant(0, manager)
+
+        for variable in range(10):
+            diagram = diagram + ADD.variable(variable, manager)
+
+        self.assertLessEqual(len(manager._operation_cache), 4)
+        self.assertEqual(diagram.evaluate([True] * 10), 10.0)
+
+    def test_operands_from_different_managers(self):
+        with self.assertRaisesRegex(ValueError, "The ADDs must belong to the same manager"):
+            ADD.variable(0, self.manager) + ADD.variable(0, ADDManager())
+
+    def test_read_add_from_tuples(self):
+        diagram = read_add_from_tuples(("c1", (("c2", (1, 0.5)), 2)), ["c1", "c2"], self.manager)
+
+        self.assertEqual(diagram.evaluate({ 0: True, 2: True }), 1.0)
+        self.assertEqual(diagram.evaluate({ 0: True, 2: False }), 0.5)
+        self.assertEqual(diagram.evaluate({ 0: False, 2: False }), 2.0)
+
+    def test_read_add_from_tuples_twice(self):
+        first = read_add_from_tuples(("c1", (1, 0)), ["c1"], self.manager)
+        second = read_add_from_tuples(("c1", (1, 0)), ["c1"], self.manager)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.support(), [0])
+
+    def test_approximate_merges_close_terminal_values(self):
+        diagram = ADD.variable(0, self.manager) * 0.1 + ADD.variable(1, self.manager) * 10
+
+        approximation, error = diagram.approximate(0.2)
+
+        self.assertEqual(approximation.support(), [1])
+        self.assertEqual(approximation.terminal_values(), [0.05, 10.05])
+        self.assertAlmostEqual(error, 0.05)
+
+    def test_approximate_with_maximum_size(self):
+        diagram = ADD.constant(0, self.manager)
+
+        for variable in range(4):
+            diagram = diagram + ADD.variable(variable, self.manager) * 2 ** variable
+
+        approximation, error = diagram.approximate(maximum_size=5)
+
+        self.assertLessEqual(approximation.size(), 5)
+        self.assertGreater(error, 0.0)
+        self.assertLessEqual(max(abs(value) for value in (approximation - diagram).terminal_values()), error + 1e-12)
+
+        with self.assertRaisesRegex(ValueError, "The tolerance must be non-negative, but received -1"):
+            diagram.approximate(-1)
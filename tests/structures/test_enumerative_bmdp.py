@@ -0,0 +1,75 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.structures import EnumerativeBMDP
+
+import unittest
+
+class EnumerativeBMDPTests(unittest.TestCase):
+
+    # Constructor tests
+    def test_constructor_call_with_all_parameters_none(self):
+        with self.assertRaisesRegex(ValueError, "The states should be defined"):
+            EnumerativeBMDP(states=None, reward_function=None, transition_function=None, initial_states=None, goal_states=None)
+
+    def test_constructor_call_with_lower_bounds_summing_more_than_one(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1
+        }
+        transition_function = {
+            "first-action": {
+                ("state01", "state01"): (0.6, 0.7),
+                ("state01", "state02"): (0.5, 0.6),
+                ("state02", "state02"): (1.0, 1.0)
+            }
+        }
+
+        with self.assertRaisesRegex(ValueError, "Invalid probability bounds on \\[state01\\] transition in action \\[first-action\\]"):
+            EnumerativeBMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+    def test_constructor_call_with_lower_bound_greater_than_upper_bound(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1
+        }
+        transition_function = {
+            "first-action": {
+                ("state01", "state01"): (0.5, 0.5),
+                ("state01", "state02"): (0.5, 0.5),
+                ("state02", "state01"): (0.6, 0.4),
+                ("state02", "state02"): (0.4, 1.0)
+            }
+        }
+
+        with self.assertRaisesRegex(ValueError, "Invalid probability bounds on \\[state02\\] transition in action \\[first-action\\]"):
+            EnumerativeBMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+    def test_stacked_transition_bounds_call_with_valid_parameters(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 0
+        }
+        transition_function = {
+            "first-action": {
+                ("state01", "state02"): (0.0, 1.0),
+                ("state01", "state01"): (0.0, 1.0),
+                ("state02", "state02"): (1.0, 1.0)
+            },
+            "second-action": {
+                ("state01", "state01"): (1.0, 1.0),
+                ("state02", "state01"): (0.2, 0.4),
+                ("state02", "state02"): (0.6, 0.8)
+            }
+        }
+
+        bmdp = EnumerativeBMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+        indptr, indices, lower_probabilities, upper_probabilities = bmdp.stacked_transition_bounds()
+
+        self.assertListEqual(list(indptr), [0, 2, 3, 4, 6])
+        self.assertListEqual(list(indices), [0, 1, 1, 0, 0, 1])
+        self.assertListEqual(list(lower_probabilities), [0.0, 0.0, 1.0, 1.0, 0.2, 0.6])
+        self.assertListEqual(list(upper_probabilities), [1.0, 1.0, 1.0, 1.0, 0.4, 0.8])
+        self.assertTupleEqual(bmdp.transition_bounds("state02", "second-action", "state01"), (0.2, 0.4))
@@ -3,6 +3,8 @@ from probabilistic_planning.structures import EnumerativeMDP
 
 import unittest
 
+import numpy as np
+
 class EnumerativeMDPTests(unittest.TestCase):
 
     # Constructor tests
@@ -406,3 +408,154 @@ class EnumerativeMDPTests(unittest.TestCase):
         self.assertEqual(mdp.transition("state01", "some-action", "state01"), 0.9)
         self.assertEqual(mdp.transition("state01", "some-action", "state02"), 0.1)
         self.assertEqual(mdp.transition("state02", "some-action", "state02"), 1.0)
+
+    def test_reachable_states_call_with_valid_parameters(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1
+        }
+        transition_function = {
+            "some-action": {
+                ("state01", "state01"): 0.9,
+                ("state01", "state02"): 0.1,
+                ("state02", "state02"): 1.0
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+        self.assertListEqual(mdp.reachable_states("state01", "some-action"), ["state01", "state02"])
+        self.assertListEqual(mdp.reachable_states("state02", "some-action"), ["state02"])
+
+    def test_sample_state_call_with_valid_parameters(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1
+        }
+        transition_function = {
+            "some-action": {
+                ("state01", "state01"): 0.9,
+                ("state01", "state02"): 0.1,
+                ("state02", "state02"): 1.0
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+        self.assertIn(mdp.sample_state("state01", "some-action"), ["state01", "state02"])
+        self.assertEqual(mdp.sample_state("state02", "some-action"), "state02")
+
+    def test_sample_state_indexes_call_matches_sample_state_index(self):
+        states = ["state01", "state02", "state03"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1,
+            "state03": 1
+        }
+        transition_function = {
+            "some-action": {
+                ("state01", "state01"): 0.2,
+                ("state01", "state02"): 0.3,
+                ("state01", "state03"): 0.5,
+                ("state02", "state02"): 1.0,
+                ("state03", "state01"): 0.5,
+                ("state03", "state03"): 0.5
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+        state_indexes = np.array([0, 1, 2, 0, 0, 2, 0, 0])
+
+        np.random.seed(7)
+        sampled_state_indexes = mdp.sample_state_indexes(state_indexes, np.zeros(len(state_indexes), dtype=int))
+
+        np.random.seed(7)
+        expected_state_indexes = [ mdp.sample_state_index(state_index, 0) for state_index in state_indexes ]
+
+        self.assertListEqual(list(sampled_state_indexes), expected_state_indexes)
+
+    def test_successors_call_with_valid_parameters(self):
+        states = ["state01", "state02"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1
+        }
+        transition_function = {
+            "some-action": {
+                ("state01", "state01"): 0.9,
+                ("state01", "state02"): 0.1,
+                ("state02", "state02"): 1.0
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+        next_state_indexes, probabilities, cumulative_probabilities = mdp.successors(0, 0)
+
+        self.assertListEqual(list(next_state_indexes), [0, 1])
+        self.assertListEqual(list(probabilities), [0.9, 0.1])
+        self.assertListEqual(list(cumulative_probabilities), [0.9, 1.0])
+
+    def test_predecessors_call_with_valid_parameters(self):
+        states = ["state01", "state02", "state03"]
+        reward_function = {
+            "state01": 1,
+            "state02": 1,
+            "state03": 1
+        }
+        transition_function = {
+            "first-action": {
+                ("state01", "state01"): 0.5,
+                ("state01", "state02"): 0.5,
+                ("state02", "state02"): 1.0,
+                ("state03", "state03"): 1.0
+            },
+            "second-action": {
+                ("state01", "state01"): 1.0,
+                ("state02", "state02"): 1.0,
+                ("state03", "state02"): 1.0
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+
+        predecessor_state_indexes, maximum_probabilities = mdp.predecessors(1)
+
+        self.assertListEqual(list(mdp.predecessors(0)[0]), [0])
+        self.assertListEqual(list(predecessor_state_indexes), [0, 1, 2])
+        self.assertListEqual(list(maximum_probabilities), [0.5, 1.0, 1.0])
+        self.assertListEqual(list(mdp.predecessors(2)[0]), [2])
+
+    def test_state_qualities_call_matches_all_qualities(self):
+        states = ["state01", "state02", "state03"]
+        reward_function = {
+            "state01": -1,
+            "state02": 0,
+            "state03": 2
+        }
+        transition_function = {
+            "first-action": {
+                ("state01", "state01"): 0.5,
+                ("state01", "state02"): 0.5,
+                ("state02", "state02"): 1.0,
+                ("state03", "state03"): 1.0
+            },
+            "second-action": {
+                ("state01", "state03"): 1.0,
+                ("state02", "state01"): 0.25,
+                ("state02", "state03"): 0.75,
+                ("state03", "state02"): 1.0
+            }
+        }
+
+        mdp = EnumerativeMDP(states=states, reward_function=reward_function, transition_function=transition_function)
+        values = np.array([1.0, 2.0, 4.0])
+
+        qualities = mdp.compute_infinite_horizon_qualities(0.9, values)
+
+        for state_index in range(len(states)):
+            np.testing.assert_allclose(mdp.compute_infinite_horizon_state_qualities(state_index, 0.9, values), qualities[:, state_index])
+
+        np.testing.assert_allclose(mdp.compute_infinite_horizon_qualities_for_states(np.array([2, 0]), 0.9, values), qualities[:, [2, 0]])
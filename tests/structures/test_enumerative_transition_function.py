@@ -213,3 +213,25 @@ class EnumerativeTransitionFunctionTests(unittest.TestCase):
         obtained_matrix = transition_function.get_transition_matrix("some-action")
 
         self.assertListEqual(list(obtained_matrix.flat), list(expected_matrix.flat))
+
+    # get_sparse_transition_matrix method tests
+
+    def test_get_sparse_transition_matrix_call_with_valid_parameters(self):
+        transition_function_as_dict = {
+            "some-action": {
+                ("state01", "state01"): 0.9,
+                ("state01", "state02"): 0.1,
+                ("state02", "state02"): 1.0
+            }
+        }
+        actions = {"some-action"}
+        states = {"state01","state02"}
+
+        transition_function = EnumerativeTransitionFunction(transition_function=transition_function_as_dict, actions=actions, states=states)
+
+        obtained_matrix = transition_function.get_sparse_transition_matrix("some-action")
+
+        self.assertEqual(obtained_matrix.nnz, 3)
+        self.assertListEqual(list(obtained_matrix.indptr), [0, 2, 3])
+        self.assertListEqual(list(obtained_matrix.indices), [0, 1, 1])
+        self.assertListEqual(list(obtained_matrix.data), [0.9, 0.1, 1.0])
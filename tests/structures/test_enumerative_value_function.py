@@ -0,0 +1,62 @@
+from ..context import probabilistic_planning
+from probabilistic_planning.structures import EnumerativeValueFunction
+
+import unittest
+import numpy as np
+
+class EnumerativeValueFunctionTests(unittest.TestCase):
+
+    # Constructor tests
+    def test_constructor_call_with_values_ommited(self):
+        value_function = EnumerativeValueFunction(["state01", "state02"])
+
+        self.assertEqual(value_function["state01"], 0.0)
+        self.assertEqual(value_function["state02"], 0.0)
+
+    def test_constructor_call_with_function_values(self):
+        value_function = EnumerativeValueFunction(["state01", "state02"], lambda state: 1 if state == "state01" else 2)
+
+        self.assertEqual(value_function["state01"], 1.0)
+        self.assertEqual(value_function["state02"], 2.0)
+
+    def test_constructor_call_with_array_values(self):
+        values = np.array([1.0, 2.0])
+        value_function = EnumerativeValueFunction(["state01", "state02"], values)
+
+        self.assertIs(value_function.values, values)
+        self.assertEqual(value_function["state02"], 2.0)
+
+    def test_constructor_call_with_array_values_having_invalid_shape(self):
+        with self.assertRaisesRegex(ValueError, "values array should have one value per state"):
+            EnumerativeValueFunction(["state01", "state02"], np.array([1.0]))
+
+    def test_constructor_call_with_invalid_values(self):
+        with self.assertRaisesRegex(ValueError, "values should be a function, an array or a EnumerativeValueFunction"):
+            EnumerativeValueFunction(["state01", "state02"], "invalid-values")
+
+    def test_constructor_call_with_shared_indexed_states(self):
+        indexed_states = { "state01": 1, "state02": 0 }
+        value_function = EnumerativeValueFunction(["state02", "state01"], np.array([2.0, 1.0]), indexed_states)
+
+        self.assertEqual(value_function["state01"], 1.0)
+        self.assertEqual(value_function.state_index("state01"), 1)
+
+    # __setitem__ method tests
+
+    def test_setitem_call_updates_values_buffer(self):
+        value_function = EnumerativeValueFunction(["state01", "state02"])
+        value_function["state02"] = 3.0
+
+        self.assertListEqual(list(value_function.values), [0.0, 3.0])
+        self.assertListEqual(list(value_function.to_matrix().flat), [0.0, 3.0])
+
+    # copy method tests
+
+    def test_copy_call_copies_only_values_buffer(self):
+        value_function = EnumerativeValueFunction(["state01", "state02"], lambda state: 1)
+        copied_value_function = value_function.copy()
+        copied_value_function["state01"] = 5.0
+
+        self.assertEqual(value_function["state01"], 1.0)
+        self.assertEqual(copied_value_function["state01"], 5.0)
+        self.assertIs(copied_value_function._indexed_states, value_function._indexed_states)
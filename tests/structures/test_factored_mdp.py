@@ -1,5 +1,6 @@
 from ..context import probabilistic_planning
 from probabilistic_planning.structures import FactoredMDP
+from probabilistic_planning.structures.decision_diagram import ADD, ADDManager
 
 import unittest
 
@@ -9,6 +10,63 @@ class FactoredMDPTests(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "The state variables should be defined"):
                 FactoredMDP(state_variables=None, reward_function=None, transition_function=None, initial_states=None, goal_states=None)
 
+    def create_mdp(self, **parameters):
+        manager = ADDManager()
+        first_variable = ADD.variable(0, manager)
+        second_variable = ADD.variable(2, manager)
+
+        reward_function = first_variable * 2 + second_variable
+        transition_function = {
+            "move": {
+                "c1": ADD.constant(0.9, manager),
+                "c2": first_variable * 0.5
+            },
+            "stay": {
+                "c1": first_variable
+            }
+        }
+
+        return FactoredMDP(["c1", "c2"], reward_function, transition_function, **parameters)
+
+    def test_reward_function_depending_on_next_state_variables(self):
+        reward_function = ADD.variable(1)
+        transition_function = { "some-action": { "c1": ADD.variable(0) } }
+
+        with self.assertRaisesRegex(ValueError, "The reward function must only depend on the current state variables"):
+            FactoredMDP(["c1"], reward_function, transition_function)
+
+    def test_transition_function_with_invalid_probability(self):
+        transition_function = { "some-action": { "c1": ADD.variable(0) * 2 } }
+
+        with self.assertRaisesRegex(ValueError, "Invalid probability distribution on \\[c1\\] transition in action \\[some-action\\]"):
+            FactoredMDP(["c1"], ADD.constant(0), transition_function)
+
+    def test_initial_states_having_invalid_state_variables(self):
+        with self.assertRaisesRegex(ValueError, "Unrecognized state variable \\[c3\\] in initial states"):
+            self.create_mdp(initial_states=[{"c1", "c3"}])
+
+    def test_reward_method_call(self):
+        mdp = self.create_mdp()
+
+        self.assertEqual(mdp.actions, ["move", "stay"])
+        self.assertEqual(mdp.reward({"c1", "c2"}), 3.0)
+        self.assertEqual(mdp.reward({"c2"}), 1.0)
+        self.assertEqual(mdp.reward(set()), 0.0)
+
+    def test_transition_method_call(self):
+        mdp = self.create_mdp()
+
+        self.assertAlmostEqual(mdp.transition({"c1"}, "move", {"c1", "c2"}), 0.45)
+        self.assertAlmostEqual(mdp.transition({"c2"}, "move", {"c1"}), 0.9)
+        self.assertAlmostEqual(mdp.transition({"c2"}, "move", {"c1", "c2"}), 0.0)
+
+    def test_transition_method_call_with_ommited_state_variable(self):
+        mdp = self.create_mdp()
+
+        # c2 keeps its value in the stay action
+        self.assertEqual(mdp.transition({"c1", "c2"}, "stay", {"c1", "c2"}), 1.0)
+        self.assertEqual(mdp.transition({"c2"}, "stay", {"c1", "c2"}), 0.0)
+
     #     @it.should("raise error when only state list is None")
     #     def test_states_is_none(self):
     #         reward_function = {